@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import JobApplication, JobPosting, Notification, SavedJob, ApplicationReview
+from .models import JobApplication, JobPosting, Notification, SavedJob, ApplicationReview, OutboundEmail, Skill, SkillAlias, DeferredTask
 
 
 class ApplicationReviewAdmin(admin.ModelAdmin):
@@ -28,12 +28,41 @@ class JobApplicationAdmin(admin.ModelAdmin):
 
 class JobPostingAdmin(admin.ModelAdmin):
     list_display = ('title', 'deadline', 'job_status_column')
+    # Synced from skills_required on save
+    exclude = ('skill_tags',)
 
     def job_status_column(self, obj):
         return obj.verify_job_status()
     
     job_status_column.short_description = 'Job Status'
-    job_status_column.admin_order_field = 'deadline'
+    job_status_column.admin_order_field = 'job_status'
+
+
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'to', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('subject', 'to')
+    # Bodies can hold one-time codes
+    exclude = ('body',)
+    readonly_fields = ('claim_token',)
+
+
+class DeferredTaskAdmin(admin.ModelAdmin):
+    list_display = ('func', 'status', 'attempts', 'next_attempt_at', 'created_at')
+    list_filter = ('status',)
+    search_fields = ('func',)
+    readonly_fields = ('claim_token',)
+
+
+class SkillAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug')
+    search_fields = ('name',)
+
+
+class SkillAliasAdmin(admin.ModelAdmin):
+    list_display = ('alias', 'skill')
+    search_fields = ('alias', 'skill__name')
+    autocomplete_fields = ('skill',)
 
 
 # Register your models here.
@@ -43,4 +72,7 @@ admin.site.register(SavedJob)
 admin.site.register(Notification)
 admin.site.register(ApplicationReview, ApplicationReviewAdmin)
 admin.site.register(JobPosting, JobPostingAdmin)
-
+admin.site.register(OutboundEmail, OutboundEmailAdmin)
+admin.site.register(DeferredTask, DeferredTaskAdmin)
+admin.site.register(Skill, SkillAdmin)
+admin.site.register(SkillAlias, SkillAliasAdmin)
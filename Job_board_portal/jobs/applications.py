@@ -0,0 +1,87 @@
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, NullIf
+from django.urls import reverse
+
+from .models import JobApplication, JobSkill, SeekerSkill
+from .tasks import defer
+from .utils import bulk_create_notifications
+
+
+APPLY_TOKEN_TIMEOUT = 60 * 60 * 24
+PENDING = 'pending'
+
+
+class AlreadyApplied(Exception):
+    pass
+
+
+def score_applications(applications):
+    """
+    Recompute skill_match for every application in the `applications`
+    queryset in a single UPDATE, counting the applicant's skills that the
+    job lists through the skill link tables.
+    """
+    matched = SeekerSkill.objects.filter(
+        content_object=OuterRef('applicant'), tag__job_links__content_object=OuterRef('job'),
+    ).order_by().values('content_object').annotate(n=Count('id')).values('n')
+    listed = JobSkill.objects.filter(
+        content_object=OuterRef('job'),
+    ).order_by().values('content_object').annotate(n=Count('id')).values('n')
+
+    return applications.update(skill_match=Coalesce(
+        Subquery(matched, output_field=IntegerField()) * 100 / NullIf(Subquery(listed, output_field=IntegerField()), 0),
+        Value(0),
+    ))
+
+
+def apply_token_cache_key(seeker_id, token):
+    return f'jobs:apply-token:{seeker_id}:{token}'
+
+
+def submit_application(job, seeker, form, token=None):
+    """
+    Save the application in `form` for `seeker`, returning (application_id, created).
+
+    `job` should come with employer__user selected. A token that was already
+    used, or is in flight in another request, makes this a no-op returning
+    created=False, so double submits get the original outcome back. The
+    (job, applicant) unique constraint decides between concurrent requests
+    with different tokens; the loser gets AlreadyApplied. Notifications for
+    both sides are queued to run after the commit.
+    """
+    key = apply_token_cache_key(seeker.pk, token) if token else None
+    if key and not cache.add(key, PENDING, APPLY_TOKEN_TIMEOUT):
+        application_id = cache.get(key)
+        return (None if application_id == PENDING else application_id), False
+
+    try:
+        with transaction.atomic():
+            application = form.save(commit=False)
+            application.job = job
+            application.applicant = seeker
+            application.save()
+            score_applications(JobApplication.objects.filter(pk=application.pk))
+
+            url = reverse('jobs:view_application_detail', args=[application.id])
+            defer(bulk_create_notifications, [
+                (
+                    seeker.user_id,
+                    f"Your application for the role {job.title} at {job.employer.company_name} has been submtted succesfully",
+                    url,
+                ),
+                (job.employer.user_id, f"{seeker.full_name} has applied for the job {job.title}", url),
+            ])
+    except IntegrityError:
+        if key:
+            cache.delete(key)
+        raise AlreadyApplied(job.pk)
+    except BaseException:
+        if key:
+            cache.delete(key)
+        raise
+
+    if key:
+        cache.set(key, application.pk, APPLY_TOKEN_TIMEOUT)
+    return application.pk, True
@@ -0,0 +1,51 @@
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef
+
+from .models import JobApplication
+
+
+APPLIED_JOBS_TIMEOUT = 60 * 60
+
+# Above this many applications the NOT EXISTS probe is used instead of
+# inlining the ids, keeping well clear of SQLite's bound parameter limit
+APPLIED_IDS_INLINE_LIMIT = 500
+
+
+def applied_jobs_cache_key(seeker_id):
+    return f'jobs:applied-jobs:{seeker_id}'
+
+
+def get_applied_job_ids(seeker_id):
+    """The ids of every job the seeker has applied to, cached until they apply or withdraw."""
+    key = applied_jobs_cache_key(seeker_id)
+    job_ids = cache.get(key)
+    if job_ids is None:
+        job_ids = frozenset(JobApplication.objects.filter(applicant_id=seeker_id).values_list('job_id', flat=True))
+        cache.set(key, job_ids, APPLIED_JOBS_TIMEOUT)
+    return job_ids
+
+
+def invalidate_applied_job_ids(seeker_id):
+    cache.delete(applied_jobs_cache_key(seeker_id))
+
+
+def has_applied(profile):
+    """An Exists() for annotating or filtering jobs on whether the seeker applied."""
+    return Exists(JobApplication.objects.filter(applicant=profile, job=OuterRef('pk')))
+
+
+def exclude_applied(queryset, profile):
+    """
+    Drop the jobs in `queryset` the seeker has already applied to.
+
+    Seekers with a handful of applications get a plain NOT IN over their
+    cached job ids (or no filter at all), which leaves SQLite free to walk
+    the listing's own index. Heavier seekers get a NOT EXISTS probe of the
+    (job, applicant) unique index per candidate row.
+    """
+    job_ids = get_applied_job_ids(profile.pk)
+    if not job_ids:
+        return queryset
+    if len(job_ids) <= APPLIED_IDS_INLINE_LIMIT:
+        return queryset.exclude(pk__in=job_ids)
+    return queryset.filter(~has_applied(profile))
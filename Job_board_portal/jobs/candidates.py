@@ -0,0 +1,78 @@
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.db.models import Count, Exists, OuterRef
+
+from users.models import SeekerProfile
+from .models import JobApplication, JobSkill, SeekerSkill
+from .recommendations import get_match_quality
+
+
+CANDIDATES_TIMEOUT = 60 * 60
+CANDIDATES_LIMIT = 500
+# Seekers state a work arrangement preference (remote, onsite, hybrid)
+SEEKER_JOB_TYPES = SeekerProfile._meta.get_field('job_type').choices
+
+Candidate = namedtuple('Candidate', ['seeker_id', 'match_score'])
+
+
+def candidates_cache_key(job_id, job_type=''):
+    return f'jobs:candidates:{job_id}:{job_type}'
+
+
+def invalidate_candidates(job_id):
+    cache.delete_many([candidates_cache_key(job_id)] + [
+        candidates_cache_key(job_id, job_type) for job_type, _ in SEEKER_JOB_TYPES
+    ])
+
+
+def rank_candidates(job, job_type='', k=CANDIDATES_LIMIT):
+    """
+    The `k` seekers holding the most of the job's skills who have not applied
+    to it, best first, as Candidates; only those preferring `job_type` if
+    given. Seekers are counted straight off the (tag, seeker) index of
+    SeekerSkill, so only seekers sharing a skill with the job are read.
+    """
+    skill_ids = list(JobSkill.objects.filter(content_object=job).values_list('tag_id', flat=True))
+    if not skill_ids:
+        return []
+
+    links = SeekerSkill.objects.filter(tag_id__in=skill_ids).exclude(
+        Exists(JobApplication.objects.filter(job=job, applicant_id=OuterRef('content_object_id')))
+    )
+    if job_type:
+        links = links.filter(content_object__job_type=job_type)
+
+    rows = links.values('content_object_id').annotate(
+        matched=Count('id'),
+    ).order_by('-matched', 'content_object_id')[:k]
+    return [Candidate(row['content_object_id'], row['matched'] * 100 // len(skill_ids)) for row in rows]
+
+
+def unapplied_candidates(job, job_type=''):
+    """rank_candidates() for the job and work preference, cached until its skills or applicants change."""
+    key = candidates_cache_key(job.pk, job_type)
+    ranked = cache.get(key)
+    if ranked is None:
+        ranked = rank_candidates(job, job_type)
+        cache.set(key, ranked, CANDIDATES_TIMEOUT)
+    return ranked
+
+
+def candidate_sort_key(candidate):
+    return (-candidate.match_score, candidate.seeker_id)
+
+
+def load_candidates(candidates):
+    """Fetch the seekers of a page of Candidates, with match data attached."""
+    profiles = SeekerProfile.objects.select_related('user').prefetch_related('skill_tags').in_bulk(
+        [candidate.seeker_id for candidate in candidates]
+    )
+    seekers = []
+    for candidate in candidates:
+        profile = profiles.get(candidate.seeker_id)
+        if profile is not None:
+            profile.match_score = candidate.match_score
+            profile.match_quality = get_match_quality(candidate.match_score)
+            seekers.append(profile)
+    return seekers
@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+
+LOCMEM_CACHE = 'django.core.cache.backends.locmem.LocMemCache'
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    if settings.CACHES['default']['BACKEND'] != LOCMEM_CACHE:
+        return []
+    return [Warning(
+        'The default cache is a LocMemCache, which each process keeps to itself.',
+        hint=(
+            'Invalidations made by one web worker or management command never reach the others, '
+            'so they serve stale counts and recommendations. Set REDIS_URL.'
+        ),
+        id='jobs.W001',
+    )]
+
+
+IN_MEMORY_CHANNEL_LAYER = 'channels.layers.InMemoryChannelLayer'
+
+
+@register(deploy=True)
+def check_channel_layer(app_configs, **kwargs):
+    if settings.CHANNEL_LAYERS['default']['BACKEND'] != IN_MEMORY_CHANNEL_LAYER:
+        return []
+    return [Warning(
+        'The channel layer is an InMemoryChannelLayer, which only reaches sockets on the same process.',
+        hint=(
+            'Notifications created by run_deferred_tasks or by another web worker are never '
+            'pushed to the browser. Set REDIS_URL.'
+        ),
+        id='jobs.W002',
+    )]
+
+
+def process_local_backends():
+    """The configured cache and channel layer, by name, if they only reach the current process."""
+    local = []
+    if settings.CACHES['default']['BACKEND'] == LOCMEM_CACHE:
+        local.append('cache')
+    if settings.CHANNEL_LAYERS['default']['BACKEND'] == IN_MEMORY_CHANNEL_LAYER:
+        local.append('channel layer')
+    return local
@@ -0,0 +1,39 @@
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from .utils import get_unread_notification_count, notification_group_name
+
+
+class NotificationConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Pushes new notifications and unread-count changes to the logged in user.
+    Events are published to the user's group by jobs.utils.
+    """
+
+    async def connect(self):
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated:
+            await self.close()
+            return
+
+        self.group_name = notification_group_name(user.pk)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+        # Catch up on anything that changed since the page was rendered
+        unread_count = await database_sync_to_async(get_unread_notification_count)(user.pk)
+        await self.send_json({'type': 'unread_count', 'unread_count': unread_count})
+
+    async def disconnect(self, code):
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def notification_created(self, event):
+        await self.send_json({
+            'type': 'notification',
+            'notification': event['notification'],
+            'unread_count': event['unread_count'],
+        })
+
+    async def notification_unread_count(self, event):
+        await self.send_json({'type': 'unread_count', 'unread_count': event['unread_count']})
@@ -1,20 +1,19 @@
 from .models import Notification
+from .utils import get_unread_notification_count
+
+
+NOTIFICATION_PREVIEW_SIZE = 5
+
 
 def user_notifications(request):
     if request.user.is_authenticated:
-        notifications = Notification.objects.filter(recipient=request.user).order_by('-created_at')
-        unread_count = notifications.filter(is_read=False, recipient=request.user).count()
+        # The slice stays an unevaluated queryset, so pages that never show
+        # the list never query it
+        notifications = Notification.objects.filter(
+            recipient=request.user
+        ).order_by('-created_at')[:NOTIFICATION_PREVIEW_SIZE]
         return {
             'notifications': notifications,
-            'unread_count': unread_count
+            'unread_count': get_unread_notification_count(request.user.pk)
         }
     return {}
-
-
-# from .models import Notification
-
-# def unread_notification_count(request):
-#     if request.user.is_authenticated:
-#         count = Notification.objects.filter(recipient=request.user, is_read=False).count()
-#         return {'unread_count': count}
-#     return {}
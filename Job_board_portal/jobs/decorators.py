@@ -6,7 +6,7 @@ def applicant_allowed(func):
     @wraps(func)
     def wrapper(request, application_id, *args, **kwargs):
         application = get_object_or_404(JobApplication, id=application_id)
-        if request.user.seekerprofile != application.applicant:
+        if request.profile != application.applicant:
             messages.error(request, 'You are not authorized to access this page!')
             return redirect('jobs:forbidden')
         return func(request, application, application_id, *args, **kwargs)
@@ -16,7 +16,7 @@ def employer_allowed(func):
     @wraps(func)
     def wrapper(request, job_id, *args, **kwargs):
         job = get_object_or_404(JobPosting, id=job_id)
-        if request.user.employerprofile != job.employer:
+        if request.profile != job.employer:
             messages.error(request, 'You are not authorized to access this page!')
             return redirect('jobs:forbidden')
         return func(request, job, job_id, *args, **kwargs)
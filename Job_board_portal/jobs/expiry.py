@@ -0,0 +1,43 @@
+from functools import partial
+
+from django.db import transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import JobPosting, JobStatus
+from .skills import adjust_open_jobs
+
+
+# Sent once per batch closed by close_expired_jobs(), with `job_ids` and the
+# `employer_ids` owning them. QuerySet.update() skips post_save, so anything
+# caching per-job state listens here instead.
+jobs_closed = Signal()
+
+
+def close_expired_jobs(batch_size=1000, today=None):
+    """
+    Close every open job whose deadline has passed, `batch_size` rows per
+    UPDATE. Returns the number of jobs closed.
+    """
+    today = today or timezone.now().date()
+    closed = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                JobPosting.objects.filter(job_status=JobStatus.open, deadline__lt=today)
+                .order_by()
+                .values_list('id', 'employer_id')[:batch_size]
+            )
+            if not batch:
+                return closed
+
+            job_ids = [job_id for job_id, _ in batch]
+            JobPosting.objects.filter(id__in=job_ids, job_status=JobStatus.open).update(job_status=JobStatus.closed)
+            adjust_open_jobs(job_ids, -1)
+            transaction.on_commit(partial(
+                jobs_closed.send,
+                sender=JobPosting,
+                job_ids=job_ids,
+                employer_ids={employer_id for _, employer_id in batch},
+            ))
+        closed += len(job_ids)
@@ -1,6 +1,7 @@
 from taggit.forms import TagWidget
 from django import forms
 from .models import JobApplication, JobPosting
+from .skills import normalize_skills
 
 class PostJobForm(forms.ModelForm):
     class Meta:
@@ -18,9 +19,19 @@ class PostJobForm(forms.ModelForm):
             'deadline': forms.DateInput(attrs={'type': 'date'}),
         }
 
+    def clean_skills_required(self):
+        # Stored in canonical form so saving only has to link known skills
+        skills = normalize_skills(self.cleaned_data['skills_required'])
+        if not skills:
+            raise forms.ValidationError('Enter at least one skill.')
+        return ', '.join(skills)
+
 
 
 class ApplyForJobForm(forms.ModelForm):
+    # Generated when the form is rendered so a double submit is only applied once
+    idempotency_key = forms.CharField(widget=forms.HiddenInput, required=False, max_length=64)
+
     class Meta:
         model = JobApplication
         fields = [
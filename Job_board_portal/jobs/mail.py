@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import MailStatus, OutboundEmail
+from .queue import claim_batch, record_failure
+
+
+MAX_ATTEMPTS = 5
+
+
+def enqueue_mail(subject, message, recipient_list, from_email=None):
+    """
+    Queue an email for the send_queued_mail worker instead of talking to
+    SMTP inside the request. Takes the same arguments as send_mail().
+    """
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(recipient_list),
+    )
+
+
+def send_queued_mail(batch_size=100, connection=None):
+    """
+    Claim one batch of due emails, send them over a single backend connection
+    and record the outcome of each. Bodies of sent emails are cleared since
+    they can hold one-time codes. Failed sends are retried with exponential
+    backoff until MAX_ATTEMPTS, then marked failed. Returns (sent, failed).
+    """
+    batch = claim_batch(OutboundEmail, batch_size)
+    if not batch:
+        return 0, 0
+
+    connection = connection or get_connection()
+    try:
+        connection.open()
+        connect_error = None
+    except Exception as e:
+        # Nothing can go out this round; count it as an attempt for the batch
+        connect_error = e
+
+    sent = failed = 0
+    try:
+        for email in batch:
+            try:
+                if connect_error:
+                    raise connect_error
+                EmailMessage(
+                    email.subject, email.body, email.from_email, email.to, connection=connection
+                ).send()
+            except Exception as e:
+                record_failure(email, e, MAX_ATTEMPTS)
+                failed += 1
+            else:
+                email.attempts += 1
+                email.claim_token = ''
+                email.status = MailStatus.sent
+                email.sent_at = timezone.now()
+                email.body = ''
+                email.last_error = ''
+                sent += 1
+            # Saved one by one so a crash mid-batch does not resend delivered mail
+            email.save(update_fields=[
+                'status', 'attempts', 'next_attempt_at', 'claim_token', 'last_error', 'sent_at', 'body',
+            ])
+    finally:
+        connection.close()
+
+    return sent, failed
@@ -0,0 +1,104 @@
+import random
+from itertools import accumulate
+import sqlite3
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from jobs.applied import APPLIED_IDS_INLINE_LIMIT, has_applied
+from jobs.models import JobApplication, JobPosting
+from users.models import SeekerProfile
+
+
+def create_schema(target):
+    # The tables and indexes the models migrate to, without the FTS triggers
+    with connection.schema_editor(collect_sql=True, atomic=False) as editor:
+        editor.create_model(JobPosting)
+        editor.create_model(JobApplication)
+    for sql in editor.collected_sql:
+        target.execute(sql)
+
+
+def fill(target, rng, jobs, seekers, applications):
+    today = date.today()
+    target.executemany(
+        "INSERT INTO jobs_jobposting (id, employer_id, title, job_type, location, salary, experience_required, "
+        "qualifications, posted_date, deadline, job_category, job_status, skills_required, application_count, "
+        "pending_count, accepted_count, rejected_count) VALUES (?, 1, ?, 'FT', 'Lagos', 100, 1, '', ?, ?, '', ?, '', 0, 0, 0, 0)",
+        (
+            (job_id, f'Job {job_id}', (today - timedelta(days=rng.randint(0, 60))).isoformat(),
+             (today + timedelta(days=rng.randint(-30, 30))).isoformat(), 'open' if rng.random() < 0.9 else 'closed')
+            for job_id in range(1, jobs + 1)
+        ),
+    )
+    # A few very active seekers and a long tail applying to a handful of jobs
+    weights = list(accumulate(rank ** -0.8 for rank in range(1, seekers + 1)))
+    pairs = set()
+    while len(pairs) < applications:
+        pairs.update(zip(
+            (rng.randint(1, jobs) for _ in range(applications - len(pairs))),
+            rng.choices(range(1, seekers + 1), cum_weights=weights, k=applications - len(pairs)),
+        ))
+    target.executemany(
+        "INSERT INTO jobs_jobapplication (job_id, applicant_id, application_date, cover_letter, resume, status) "
+        "VALUES (?, ?, '2024-01-01', '', '', 'pending')",
+        pairs,
+    )
+    target.execute('ANALYZE')
+
+
+def run(target, queryset, repeat):
+    sql, params = queryset.query.sql_with_params()
+    sql = sql.replace('%s', '?')
+    start = time.perf_counter()
+    for _ in range(repeat):
+        target.execute(sql, params).fetchall()
+    return (time.perf_counter() - start) / repeat
+
+
+class Command(BaseCommand):
+    help = 'Compare ways of hiding already applied jobs from seeker listings on a synthetic SQLite database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=100_000)
+        parser.add_argument('--seekers', type=int, default=50_000)
+        parser.add_argument('--applications', type=int, default=1_000_000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.stderr.write('This benchmark copies the SQLite schema and only runs on SQLite')
+            return
+
+        rng = random.Random(options['seed'])
+        target = sqlite3.connect(':memory:')
+        create_schema(target)
+        self.stdout.write(f"Generating {options['applications']:,} applications...")
+        fill(target, rng, options['jobs'], options['seekers'], options['applications'])
+
+        counts = dict(target.execute(
+            'SELECT applicant_id, COUNT(*) FROM jobs_jobapplication GROUP BY applicant_id'
+        ).fetchall())
+        by_count = sorted(counts, key=counts.get)
+        typical, heavy = by_count[len(by_count) // 2], by_count[-1]
+        listing = JobPosting.objects.filter(job_status='open').order_by('-posted_date')
+
+        for label, seeker_id in [('none', options['seekers'] + 1), ('typical', typical), ('heavy', heavy)]:
+            profile = SeekerProfile(pk=seeker_id)
+            applied = [row[0] for row in target.execute(
+                'SELECT job_id FROM jobs_jobapplication WHERE applicant_id = ?', [seeker_id]
+            )]
+            variants = [
+                ('exclude()', listing.exclude(applications__applicant=profile)),
+                ('NOT EXISTS', listing.filter(~has_applied(profile))),
+            ]
+            if len(applied) <= APPLIED_IDS_INLINE_LIMIT:
+                variants.append(('cached ids', listing.exclude(pk__in=applied) if applied else listing))
+
+            self.stdout.write(f"{label} seeker ({len(applied):,} applications):")
+            for name, queryset in variants:
+                page = run(target, queryset[:10], options['repeat'])
+                count = run(target, queryset.values('id'), options['repeat'])
+                self.stdout.write(f"  {name:<11} first page {page * 1000:8.2f} ms | all ids {count * 1000:8.2f} ms")
@@ -0,0 +1,83 @@
+import random
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from jobs.scoring import SkillMatrix
+
+
+def legacy_scores(seeker_skills, postings):
+    # The per-job set intersection dashboard() used before the scoring engine
+    seeker_skills = [s.strip().lower() for s in seeker_skills.split(",") if s.strip()]
+    jobs_with_scores = []
+    for job_id, skills_required in postings:
+        job_skills = [s.strip().lower() for s in skills_required.split(",") if s.strip()]
+        matched_skills = list(set(seeker_skills) & set(job_skills))
+        missing_skills = list(set(job_skills) - set(seeker_skills))
+        percent_match = int((len(matched_skills) / len(job_skills)) * 100)
+        jobs_with_scores.append((job_id, percent_match, len(matched_skills), len(missing_skills)))
+    jobs_with_scores.sort(key=lambda x: x[1], reverse=True)
+    return jobs_with_scores
+
+
+class Command(BaseCommand):
+    help = 'Compare the vectorized skill scoring engine, plain and IDF-weighted, against the old per-job loop on synthetic postings, and time building and patching the matrix'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+        parser.add_argument('--vocabulary', type=int, default=500)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        vocabulary = [f'skill{i}' for i in range(options['vocabulary'])]
+        seeker_skills = ', '.join(rng.sample(vocabulary, 8))
+
+        for size in options['sizes']:
+            postings = [
+                (job_id, ', '.join(rng.sample(vocabulary, rng.randint(3, 8))))
+                for job_id in range(1, size + 1)
+            ]
+            start = time.perf_counter()
+            matrix = SkillMatrix.from_rows(
+                (job_id, skill.strip()) for job_id, skills in postings for skill in skills.split(',')
+            )
+            build_time = time.perf_counter() - start
+            candidate_ids = list(range(1, size + 1))
+
+            # What a process pays to catch up with one edited job
+            changed_id = rng.randint(1, size)
+            start = time.perf_counter()
+            matrix.replace_rows({changed_id}, [(changed_id, skill) for skill in rng.sample(vocabulary, 5)])
+            patch_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            expected = legacy_scores(seeker_skills, postings)
+            legacy_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            scores = matrix.score([s.strip() for s in seeker_skills.split(',')], candidate_ids)
+            scores.job_ids[(-scores.percent_match).argsort(kind='stable')]
+            vectorized_time = time.perf_counter() - start
+
+            if dict((job_id, percent) for job_id, percent, _, _ in expected) != dict(
+                zip(scores.job_ids.tolist(), scores.percent_match.tolist())
+            ):
+                self.stderr.write(f"Score mismatch at {size:,} postings")
+                return
+
+            weights = matrix.idf_weights(
+                Counter(skill.strip() for _, skills in postings for skill in skills.split(',')), size
+            )
+            start = time.perf_counter()
+            scores = matrix.score([s.strip() for s in seeker_skills.split(',')], candidate_ids, weights)
+            scores.job_ids[(-scores.percent_match).argsort(kind='stable')]
+            relevance_time = time.perf_counter() - start
+
+            self.stdout.write(
+                f"{size:>9,} postings: loop {legacy_time * 1000:9.1f} ms | "
+                f"vectorized {vectorized_time * 1000:8.1f} ms | "
+                f"relevance {relevance_time * 1000:8.1f} ms | "
+                f"{legacy_time / vectorized_time:5.1f}x faster | "
+                f"build {build_time * 1000:9.1f} ms | patch {patch_time * 1000:7.1f} ms"
+            )
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+from jobs.expiry import close_expired_jobs
+
+
+class Command(BaseCommand):
+    help = 'Close open job postings whose deadline has passed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--loop', action='store_true', help='Keep sweeping instead of exiting, e.g. as a worker')
+        parser.add_argument('--interval', type=int, default=15 * 60, help='Seconds between sweeps with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            closed = close_expired_jobs(options['batch_size'])
+            if closed:
+                self.stdout.write(f"Closed {closed} expired jobs")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
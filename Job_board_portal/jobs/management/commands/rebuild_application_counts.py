@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from jobs.models import JobApplication, JobPosting, Status
+
+
+def count_subquery(**filters):
+    counts = JobApplication.objects.filter(job=OuterRef('pk'), **filters).order_by().values('job').annotate(n=Count('id')).values('n')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized application counters on every job posting'
+
+    def handle(self, *args, **options):
+        updated = JobPosting.objects.update(
+            application_count=count_subquery(),
+            **{f'{status}_count': count_subquery(status=status) for status in Status.values},
+        )
+        self.stdout.write(f"Rebuilt application counts for {updated} jobs")
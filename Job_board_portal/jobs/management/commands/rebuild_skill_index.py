@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from jobs.models import JobPosting, JobSkill, SeekerSkill
+from jobs.scoring import invalidate_skill_matrix
+from jobs.skills import get_or_create_skills, normalize_skills, recount_open_jobs
+from users.models import SeekerProfile
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the job and seeker skill links from the skills_required and skills strings, and the open job count of every skill'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        jobs = self.rebuild(JobSkill, JobPosting.objects.values_list('id', 'skills_required'), batch_size)
+        seekers = self.rebuild(SeekerSkill, SeekerProfile.objects.values_list('id', 'skills'), batch_size)
+        recount_open_jobs()
+        invalidate_skill_matrix()
+        self.stdout.write(f"Linked {jobs} job skills and {seekers} seeker skills")
+
+    def rebuild(self, through, rows, batch_size):
+        through.objects.all().delete()
+
+        skill_ids = {}
+        batch = []
+        total = 0
+        for object_id, skill_data in rows.iterator():
+            names = normalize_skills(skill_data)
+            missing = [name for name in names if name not in skill_ids]
+            if missing:
+                skill_ids.update(get_or_create_skills(missing))
+            batch.extend(through(content_object_id=object_id, tag_id=skill_ids[name]) for name in names)
+            if len(batch) >= batch_size:
+                through.objects.bulk_create(batch)
+                total += len(batch)
+                batch = []
+
+        through.objects.bulk_create(batch)
+        return total + len(batch)
@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from jobs.models import RecommendationRefresh
+from jobs.recommendations import refresh_job_recommendations, refresh_seeker_recommendations
+from users.models import SeekerProfile
+
+
+class Command(BaseCommand):
+    help = 'Drain the recommendation refresh queue into the RecommendedJob table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Recompute every seeker from scratch')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--loop', action='store_true', help='Keep polling the queue')
+        parser.add_argument('--interval', type=int, default=10, help='Seconds between polls with --loop')
+
+    def handle(self, *args, **options):
+        if options['all']:
+            for seeker in SeekerProfile.objects.exclude(skills='').iterator():
+                refresh_seeker_recommendations(seeker)
+            self.stdout.write("Recomputed recommendations for all seekers")
+
+        while True:
+            processed = self.drain(options['batch_size'])
+            if processed:
+                self.stdout.write(f"Processed {processed} refresh requests")
+            if not options['loop']:
+                break
+            if not processed:
+                time.sleep(options['interval'])
+
+    def drain(self, batch_size):
+        processed = 0
+        while True:
+            batch = list(RecommendationRefresh.objects.order_by('id')[:batch_size])
+            if not batch:
+                return processed
+
+            seeker_ids = {task.seeker_id for task in batch if task.seeker_id}
+            job_ids = {task.job_id for task in batch if task.job_id}
+
+            for seeker in SeekerProfile.objects.filter(id__in=seeker_ids):
+                refresh_seeker_recommendations(seeker)
+            if job_ids:
+                refresh_job_recommendations(job_ids)
+
+            # Rows queued again since they were read have a newer created_at
+            RecommendationRefresh.objects.filter(
+                Q(*[Q(id=task.id, created_at=task.created_at) for task in batch], _connector=Q.OR)
+            ).delete()
+            processed += len(batch)
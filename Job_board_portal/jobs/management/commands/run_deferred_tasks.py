@@ -0,0 +1,25 @@
+from django.core.management.base import CommandError
+
+from jobs.checks import process_local_backends
+from jobs.management.drain import DrainQueueCommand
+from jobs.tasks import run_deferred_tasks
+
+
+class Command(DrainQueueCommand):
+    help = 'Run due deferred tasks from the task queue'
+    queue_name = 'task queue'
+    summary = 'Ran {done} tasks, {failed} failed'
+
+    def handle(self, *args, **options):
+        # Tasks push notifications and evict cached counts, which a
+        # process-local backend would keep to this worker
+        local = process_local_backends()
+        if local:
+            raise CommandError(
+                f"The {' and '.join(local)} only reach this process, so the web processes would never "
+                f"see what the tasks publish. Set REDIS_URL to run the worker."
+            )
+        super().handle(*args, **options)
+
+    def process_batch(self, batch_size):
+        return run_deferred_tasks(batch_size)
@@ -0,0 +1,11 @@
+from jobs.mail import send_queued_mail
+from jobs.management.drain import DrainQueueCommand
+
+
+class Command(DrainQueueCommand):
+    help = 'Send due emails from the outbox, one SMTP connection per batch'
+    queue_name = 'outbox'
+    summary = 'Sent {done} emails, {failed} failed'
+
+    def process_batch(self, batch_size):
+        return send_queued_mail(batch_size)
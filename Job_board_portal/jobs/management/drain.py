@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+
+class DrainQueueCommand(BaseCommand):
+    """
+    Base for the worker commands draining one of the jobs.queue queues.
+    Subclasses implement process_batch(batch_size), returning the
+    (done, failed) counts of one batch, and word its log line in `summary`.
+    """
+    queue_name = 'queue'
+    summary = '{done} done, {failed} failed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--loop', action='store_true', help=f'Keep polling the {self.queue_name}')
+        parser.add_argument('--interval', type=int, default=5, help='Seconds between polls with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            processed = self.drain(options['batch_size'])
+            if not options['loop']:
+                break
+            if not processed:
+                time.sleep(options['interval'])
+
+    def drain(self, batch_size):
+        # Failures are rescheduled into the future, so this always ends
+        processed = 0
+        while True:
+            done, failed = self.process_batch(batch_size)
+            if not (done or failed):
+                return processed
+            self.stdout.write(self.summary.format(done=done, failed=failed))
+            processed += done + failed
+
+    def process_batch(self, batch_size):
+        raise NotImplementedError('subclasses of DrainQueueCommand must provide a process_batch() method')
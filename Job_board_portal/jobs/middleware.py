@@ -0,0 +1,15 @@
+from .utils import get_user_profile
+
+
+class ProfileMiddleware:
+    """
+    Resolve the logged in user's profile once per request and expose it as
+    request.profile / request.profile_type ('seeker', 'employer' or None).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.profile, request.profile_type = get_user_profile(request.user)
+        return self.get_response(request)
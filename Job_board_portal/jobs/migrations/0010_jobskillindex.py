@@ -0,0 +1,43 @@
+# Generated by Django 5.2 on 2026-10-17 05:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from jobs.utils import parse_skills
+
+
+def build_skill_index(apps, schema_editor):
+    JobPosting = apps.get_model('jobs', 'JobPosting')
+    JobSkillIndex = apps.get_model('jobs', 'JobSkillIndex')
+    JobSkillIndex.objects.bulk_create(
+        JobSkillIndex(skill=skill, job_id=job_id)
+        for job_id, skills_required in JobPosting.objects.values_list('id', 'skills_required')
+        for skill in parse_skills(skills_required)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0009_alter_jobapplication_status'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='jobapplication',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('accepted', 'Accepted'), ('rejected', 'Rejected')], default='pending', max_length=14),
+        ),
+        migrations.CreateModel(
+            name='JobSkillIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('skill', models.CharField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_index', to='jobs.jobposting')),
+            ],
+            options={
+                'unique_together': {('skill', 'job')},
+            },
+        ),
+        migrations.RunPython(build_skill_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2 on 2026-10-17 05:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0010_jobskillindex'),
+        ('users', '0005_remove_employerprofile_linked_accounts_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecommendationRefresh',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('job', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='jobs.jobposting')),
+                ('seeker', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='users.seekerprofile')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('job',), name='refresh_job_unique'), models.UniqueConstraint(fields=('seeker',), name='refresh_seeker_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RecommendationState',
+            fields=[
+                ('seeker', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='recommendation_state', serialize=False, to='users.seekerprofile')),
+                ('refreshed_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RecommendedJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.PositiveSmallIntegerField()),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to='jobs.jobposting')),
+                ('seeker', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommended_jobs', to='users.seekerprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['seeker', '-score'], name='recommended_seeker_score_idx')],
+                'unique_together': {('seeker', 'job')},
+            },
+        ),
+    ]
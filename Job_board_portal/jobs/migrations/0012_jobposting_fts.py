@@ -0,0 +1,82 @@
+# Generated by Django 5.2 on 2026-10-17 05:58
+
+import django.db.models.deletion
+import jobs.search
+from django.db import migrations, models
+
+
+FTS_COLUMNS = "title, qualifications, skills_required, location, company_name"
+
+COMPANY_NAME = "(SELECT company_name FROM users_employerprofile WHERE id = new.employer_id)"
+
+CREATE_FTS = [
+    f"CREATE VIRTUAL TABLE jobs_jobposting_fts USING fts5({FTS_COLUMNS}, prefix='2 3')",
+    # Titles and skills weigh more than the free text qualifications
+    "INSERT INTO jobs_jobposting_fts(jobs_jobposting_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0, 5.0, 2.0, 3.0)')",
+    f"""CREATE TRIGGER jobs_jobposting_fts_insert AFTER INSERT ON jobs_jobposting BEGIN
+        INSERT INTO jobs_jobposting_fts(rowid, {FTS_COLUMNS})
+        VALUES (new.id, new.title, new.qualifications, new.skills_required, new.location, {COMPANY_NAME});
+    END""",
+    f"""CREATE TRIGGER jobs_jobposting_fts_update AFTER UPDATE ON jobs_jobposting BEGIN
+        DELETE FROM jobs_jobposting_fts WHERE rowid = old.id;
+        INSERT INTO jobs_jobposting_fts(rowid, {FTS_COLUMNS})
+        VALUES (new.id, new.title, new.qualifications, new.skills_required, new.location, {COMPANY_NAME});
+    END""",
+    """CREATE TRIGGER jobs_jobposting_fts_delete AFTER DELETE ON jobs_jobposting BEGIN
+        DELETE FROM jobs_jobposting_fts WHERE rowid = old.id;
+    END""",
+    """CREATE TRIGGER jobs_employerprofile_fts_update AFTER UPDATE OF company_name ON users_employerprofile BEGIN
+        UPDATE jobs_jobposting_fts SET company_name = new.company_name
+        WHERE rowid IN (SELECT id FROM jobs_jobposting WHERE employer_id = new.id);
+    END""",
+    f"""INSERT INTO jobs_jobposting_fts(rowid, {FTS_COLUMNS})
+        SELECT job.id, job.title, job.qualifications, job.skills_required, job.location, employer.company_name
+        FROM jobs_jobposting job INNER JOIN users_employerprofile employer ON employer.id = job.employer_id""",
+]
+
+DROP_FTS = [
+    "DROP TRIGGER IF EXISTS jobs_employerprofile_fts_update",
+    "DROP TRIGGER IF EXISTS jobs_jobposting_fts_delete",
+    "DROP TRIGGER IF EXISTS jobs_jobposting_fts_update",
+    "DROP TRIGGER IF EXISTS jobs_jobposting_fts_insert",
+    "DROP TABLE IF EXISTS jobs_jobposting_fts",
+]
+
+
+def run_on_sqlite(statements):
+    # Other databases fall back to the icontains search backend
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0011_recommendedjob'),
+        ('users', '0005_remove_employerprofile_linked_accounts_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobPostingSearch',
+            fields=[
+                ('job', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_document', serialize=False, to='jobs.jobposting')),
+                ('title', models.TextField()),
+                ('qualifications', models.TextField()),
+                ('skills_required', models.TextField()),
+                ('location', models.TextField()),
+                ('company_name', models.TextField()),
+                ('document', jobs.search.FullTextDocumentField(db_column='jobs_jobposting_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'jobs_jobposting_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(run_on_sqlite(CREATE_FTS), run_on_sqlite(DROP_FTS)),
+    ]
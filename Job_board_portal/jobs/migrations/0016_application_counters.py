@@ -0,0 +1,108 @@
+# Generated by Django 5.2 on 2026-10-17 06:13
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+FTS_COLUMNS = "title, qualifications, skills_required, location, company_name"
+
+COMPANY_NAME = "(SELECT company_name FROM users_employerprofile WHERE id = new.employer_id)"
+
+# SQLite rebuilds jobs_jobposting to add the counter columns, which breaks
+# the full-text triggers that reference it, so they are dropped first and
+# recreated afterwards. The update trigger now only fires for the indexed
+# columns, so counter updates don't rewrite the job's search document.
+DROP_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS jobs_employerprofile_fts_update",
+    "DROP TRIGGER IF EXISTS jobs_jobposting_fts_delete",
+    "DROP TRIGGER IF EXISTS jobs_jobposting_fts_update",
+    "DROP TRIGGER IF EXISTS jobs_jobposting_fts_insert",
+]
+
+CREATE_TRIGGERS = [
+    f"""CREATE TRIGGER jobs_jobposting_fts_insert AFTER INSERT ON jobs_jobposting BEGIN
+        INSERT INTO jobs_jobposting_fts(rowid, {FTS_COLUMNS})
+        VALUES (new.id, new.title, new.qualifications, new.skills_required, new.location, {COMPANY_NAME});
+    END""",
+    f"""CREATE TRIGGER jobs_jobposting_fts_update
+        AFTER UPDATE OF title, qualifications, skills_required, location, employer_id ON jobs_jobposting BEGIN
+        DELETE FROM jobs_jobposting_fts WHERE rowid = old.id;
+        INSERT INTO jobs_jobposting_fts(rowid, {FTS_COLUMNS})
+        VALUES (new.id, new.title, new.qualifications, new.skills_required, new.location, {COMPANY_NAME});
+    END""",
+    """CREATE TRIGGER jobs_jobposting_fts_delete AFTER DELETE ON jobs_jobposting BEGIN
+        DELETE FROM jobs_jobposting_fts WHERE rowid = old.id;
+    END""",
+    """CREATE TRIGGER jobs_employerprofile_fts_update AFTER UPDATE OF company_name ON users_employerprofile BEGIN
+        UPDATE jobs_jobposting_fts SET company_name = new.company_name
+        WHERE rowid IN (SELECT id FROM jobs_jobposting WHERE employer_id = new.id);
+    END""",
+]
+
+
+def run_on_sqlite(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+def count_applications(apps, schema_editor):
+    JobPosting = apps.get_model('jobs', 'JobPosting')
+    JobApplication = apps.get_model('jobs', 'JobApplication')
+
+    def counts(**filters):
+        subquery = JobApplication.objects.filter(job=OuterRef('pk'), **filters).order_by().values('job').annotate(n=Count('id')).values('n')
+        return Coalesce(Subquery(subquery, output_field=IntegerField()), Value(0))
+
+    JobPosting.objects.update(
+        application_count=counts(),
+        pending_count=counts(status='pending'),
+        accepted_count=counts(status='accepted'),
+        rejected_count=counts(status='rejected'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0015_query_indexes'),
+        ('users', '0005_remove_employerprofile_linked_accounts_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_on_sqlite(DROP_TRIGGERS), run_on_sqlite(CREATE_TRIGGERS)),
+        migrations.AddField(
+            model_name='jobposting',
+            name='accepted_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='application_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='pending_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='rejected_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['-application_count', '-posted_date'], name='job_popularity_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['employer', '-application_count'], name='job_employer_popularity_idx'),
+        ),
+        migrations.RunPython(run_on_sqlite(CREATE_TRIGGERS), run_on_sqlite(DROP_TRIGGERS)),
+        migrations.RunPython(count_applications, migrations.RunPython.noop),
+    ]
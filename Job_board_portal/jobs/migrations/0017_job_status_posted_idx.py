@@ -0,0 +1,26 @@
+# Generated by Django 5.2 on 2026-10-17 06:23
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def close_expired_jobs(apps, schema_editor):
+    # Listings now trust job_status alone, so close what the sweeper would
+    JobPosting = apps.get_model('jobs', 'JobPosting')
+    JobPosting.objects.filter(job_status='open', deadline__lt=timezone.now().date()).update(job_status='closed')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0016_application_counters'),
+        ('users', '0005_remove_employerprofile_linked_accounts_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['job_status', '-posted_date'], name='job_status_posted_idx'),
+        ),
+        migrations.RunPython(close_expired_jobs, migrations.RunPython.noop),
+    ]
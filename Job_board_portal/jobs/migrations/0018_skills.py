@@ -0,0 +1,111 @@
+# Generated by Django 5.2 on 2026-10-17 06:27
+
+import django.db.models.deletion
+import taggit.managers
+from django.db import migrations, models
+from django.utils.text import slugify
+
+from jobs.utils import parse_skills
+
+
+def link_skills(apps, schema_editor):
+    # Historical models lack TagBase.save(), so slugs are made unique here
+    Skill = apps.get_model('jobs', 'Skill')
+    JobPosting = apps.get_model('jobs', 'JobPosting')
+    JobSkill = apps.get_model('jobs', 'JobSkill')
+    SeekerProfile = apps.get_model('users', 'SeekerProfile')
+    SeekerSkill = apps.get_model('jobs', 'SeekerSkill')
+
+    jobs = {
+        job_id: [name for name in parse_skills(skills) if len(name) <= 100]
+        for job_id, skills in JobPosting.objects.values_list('id', 'skills_required')
+    }
+    seekers = {
+        seeker_id: [name for name in parse_skills(skills) if len(name) <= 100]
+        for seeker_id, skills in SeekerProfile.objects.values_list('id', 'skills')
+    }
+
+    names = sorted({name for skills in [*jobs.values(), *seekers.values()] for name in skills})
+    slugs = set()
+    skills = []
+    for name in names:
+        base = slugify(name, allow_unicode=True) or 'skill'
+        slug, i = base, 1
+        while slug in slugs:
+            slug, i = f'{base}_{i}', i + 1
+        slugs.add(slug)
+        skills.append(Skill(name=name, slug=slug))
+    Skill.objects.bulk_create(skills, batch_size=1000)
+
+    skill_ids = dict(Skill.objects.values_list('name', 'id'))
+    JobSkill.objects.bulk_create(
+        (JobSkill(content_object_id=job_id, tag_id=skill_ids[name]) for job_id, names in jobs.items() for name in names),
+        batch_size=1000,
+    )
+    SeekerSkill.objects.bulk_create(
+        (SeekerSkill(content_object_id=seeker_id, tag_id=skill_ids[name]) for seeker_id, names in seekers.items() for name in names),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0017_job_status_posted_idx'),
+        ('users', '0005_remove_employerprofile_linked_accounts_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='name')),
+                ('slug', models.SlugField(allow_unicode=True, max_length=100, unique=True, verbose_name='slug')),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SeekerSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_object', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_links', to='users.seekerprofile')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seeker_links', to='jobs.skill')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='JobSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_object', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_links', to='jobs.jobposting')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_links', to='jobs.skill')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='skill_tags',
+            field=taggit.managers.TaggableManager(blank=True, help_text='A comma-separated list of tags.', through='jobs.JobSkill', to='jobs.Skill', verbose_name='skills'),
+        ),
+        migrations.DeleteModel(
+            name='JobSkillIndex',
+        ),
+        migrations.AddIndex(
+            model_name='seekerskill',
+            index=models.Index(fields=['tag', 'content_object'], name='seekerskill_tag_seeker_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='seekerskill',
+            unique_together={('content_object', 'tag')},
+        ),
+        migrations.AddIndex(
+            model_name='jobskill',
+            index=models.Index(fields=['tag', 'content_object'], name='jobskill_tag_job_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='jobskill',
+            unique_together={('content_object', 'tag')},
+        ),
+        migrations.RunPython(link_skills, migrations.RunPython.noop),
+    ]
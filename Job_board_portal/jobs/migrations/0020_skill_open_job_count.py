@@ -0,0 +1,31 @@
+# Generated by Django 5.2 on 2026-10-17 06:36
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_open_jobs(apps, schema_editor):
+    Skill = apps.get_model('jobs', 'Skill')
+    JobSkill = apps.get_model('jobs', 'JobSkill')
+
+    open_links = JobSkill.objects.filter(
+        tag=OuterRef('pk'), content_object__job_status='open',
+    ).order_by().values('tag').annotate(n=Count('id')).values('n')
+    Skill.objects.update(open_job_count=Coalesce(Subquery(open_links, output_field=IntegerField()), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0019_skillalias'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='skill',
+            name='open_job_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_open_jobs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2 on 2026-10-17 06:41
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, NullIf
+
+
+def score_applications(apps, schema_editor):
+    JobApplication = apps.get_model('jobs', 'JobApplication')
+    JobSkill = apps.get_model('jobs', 'JobSkill')
+    SeekerSkill = apps.get_model('jobs', 'SeekerSkill')
+
+    matched = SeekerSkill.objects.filter(
+        content_object=OuterRef('applicant'), tag__job_links__content_object=OuterRef('job'),
+    ).order_by().values('content_object').annotate(n=Count('id')).values('n')
+    listed = JobSkill.objects.filter(
+        content_object=OuterRef('job'),
+    ).order_by().values('content_object').annotate(n=Count('id')).values('n')
+
+    JobApplication.objects.update(skill_match=Coalesce(
+        Subquery(matched, output_field=IntegerField()) * 100 / NullIf(Subquery(listed, output_field=IntegerField()), 0),
+        Value(0),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0020_skill_open_job_count'),
+        ('users', '0006_seekerprofile_skill_tags'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobapplication',
+            name='skill_match',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['job', '-skill_match', '-application_date'], name='application_job_match_idx'),
+        ),
+        migrations.RunPython(score_applications, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,14 @@
+import re
 from django.utils.html import format_html
 from django.utils import timezone
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxLengthValidator, MinLengthValidator
+from taggit.managers import TaggableManager
+from taggit.models import ItemBase, TagBase
 from users.models import EmployerProfile, SeekerProfile, User
+from .search import FullTextDocumentField
 
 # Create your models here.
 
@@ -35,24 +40,173 @@ class JobPosting(models.Model):
     job_category = models.CharField()
     job_status = models.CharField(max_length=50, choices=JobStatus.choices, default=JobStatus.open)
     skills_required = models.CharField(verbose_name="Skills Required", help_text="Enter relevant skills")
+    # Normalized from skills_required on save, see jobs.skills
+    skill_tags = TaggableManager(verbose_name='skills', through='JobSkill', blank=True, related_name='jobs')
+
+    # Denormalized application counters, kept up to date by JobApplication.
+    # Rebuild with `manage.py rebuild_application_counts`.
+    application_count = models.PositiveIntegerField(default=0, editable=False)
+    pending_count = models.PositiveIntegerField(default=0, editable=False)
+    accepted_count = models.PositiveIntegerField(default=0, editable=False)
+    rejected_count = models.PositiveIntegerField(default=0, editable=False)
 
 
     class Meta:
         unique_together = ('employer', 'title')
-        
+        indexes = [
+            # Open jobs newest first (seeker dashboard, recommendations)
+            models.Index(fields=['job_status', '-posted_date'], name='job_status_posted_idx'),
+            # Open jobs past their deadline (close_expired_jobs)
+            models.Index(fields=['job_status', 'deadline', 'posted_date'], name='job_status_deadline_idx'),
+            # Unexpired jobs of any status (seeker all jobs)
+            models.Index(fields=['deadline', 'posted_date'], name='job_deadline_posted_idx'),
+            # An employer's jobs newest first
+            models.Index(fields=['employer', '-posted_date'], name='job_employer_posted_idx'),
+            # Most applied-to jobs (popular jobs)
+            models.Index(fields=['-application_count', '-posted_date'], name='job_popularity_idx'),
+            models.Index(fields=['employer', '-application_count'], name='job_employer_popularity_idx'),
+        ]
+
+    COUNTER_FIELDS = {'application_count', 'pending_count', 'accepted_count', 'rejected_count'}
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'job_status' in instance.__dict__:
+            instance._loaded_status = instance.job_status
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Never write back counters read before an application changed them
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        # The status before this save, for the refresh queue in jobs.signals
+        # and the skill counters in jobs.skills
+        if self._state.adding:
+            self._was_open = False
+        else:
+            status = self.__dict__.get('_loaded_status') or JobPosting.objects.filter(
+                pk=self.pk
+            ).values_list('job_status', flat=True).first()
+            self._was_open = status == JobStatus.open
+        super().save(*args, **kwargs)
+        self._loaded_status = self.job_status
+
     def is_active(self):
-        return self.deadline >= timezone.now().date()
+        return self.job_status == JobStatus.open
     
     def verify_job_status(self):
-        if self.is_active():
+        if self.job_status == JobStatus.open:
             return format_html('<span style="color: green;">Open</span>')
         else:
             return format_html('<span style="color: red;">Closed</span>')
 
     def __str__(self):
         return f'{self.title} at {self.employer.company_name}'
+
+
+# Read-only view of the jobs_jobposting_fts FTS5 table used by jobs.search.
+# The table and the triggers keeping it in sync are created by migration 0012.
+class JobPostingSearch(models.Model):
+    job = models.OneToOneField(JobPosting, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid', related_name='search_document')
+    title = models.TextField()
+    qualifications = models.TextField()
+    skills_required = models.TextField()
+    location = models.TextField()
+    company_name = models.TextField()
+    document = FullTextDocumentField(db_column='jobs_jobposting_fts')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'jobs_jobposting_fts'
+
+
+# Canonical skills. `name` is the lower-cased form produced by
+# jobs.skills.normalize_skills, so every spelling of a skill, including its
+# SkillAlias spellings, maps to one row.
+class Skill(TagBase):
+    # Number of open jobs linked to the skill, the document frequency behind
+    # the relevance scorer. Kept up to date by jobs.skills and
+    # close_expired_jobs; rebuild with `manage.py rebuild_skill_index`.
+    open_job_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
+class SkillAlias(models.Model):
+    """
+    Another spelling of a canonical skill, e.g. "js" for "javascript".
+    `alias` is stored as key_for(spelling), which also folds spaces, hyphens
+    and underscores, so "Java Script" and "java-script" share one row.
+    """
+    alias = models.CharField(max_length=100, unique=True)
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='aliases')
+
+    class Meta:
+        ordering = ['alias']
+        verbose_name_plural = 'skill aliases'
+
+    def __str__(self):
+        return f'{self.alias} -> {self.skill}'
+
+    @staticmethod
+    def key_for(name):
+        return re.sub(r'[\s_-]+', '', name.lower())
+
+    def save(self, *args, **kwargs):
+        self.alias = self.key_for(self.alias)
+        super().save(*args, **kwargs)
+
+
+# Skill links for jobs and seekers, kept in sync with the skills_required and
+# skills strings by the signals in jobs/signals.py. The (tag, object) indexes
+# serve skill -> job/seeker lookups; unique_together covers the reverse.
+class JobSkill(ItemBase):
+    tag = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='job_links')
+    content_object = models.ForeignKey(JobPosting, on_delete=models.CASCADE, related_name='skill_links')
+
+    class Meta:
+        unique_together = ('content_object', 'tag')
+        indexes = [
+            models.Index(fields=['tag', 'content_object'], name='jobskill_tag_job_idx'),
+        ]
+
+
+class SeekerSkill(ItemBase):
+    tag = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='seeker_links')
+    content_object = models.ForeignKey(SeekerProfile, on_delete=models.CASCADE, related_name='skill_links')
+
+    class Meta:
+        unique_together = ('content_object', 'tag')
+        indexes = [
+            models.Index(fields=['tag', 'content_object'], name='seekerskill_tag_seeker_idx'),
+        ]
     
     
+class JobApplicationQuerySet(models.QuerySet):
+
+    def delete(self):
+        # One counter UPDATE per (job, status) instead of one per row in the
+        # post_delete receiver, which skips deletes that start here
+        with transaction.atomic(using=self.db):
+            groups = list(self.order_by().values_list('job_id', 'status').annotate(n=Count('id')))
+            deleted = super().delete()
+            for job_id, status, count in groups:
+                adjust_application_counts(job_id, status, -count)
+        return deleted
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
 class JobApplication(models.Model):
     job = models.ForeignKey(JobPosting, on_delete=models.CASCADE, related_name='applications')
     applicant = models.ForeignKey(SeekerProfile, on_delete=models.CASCADE)
@@ -61,12 +215,53 @@ class JobApplication(models.Model):
     resume = models.FileField(upload_to='resumes/')
     attachments = models.FileField(upload_to='attachments/', blank=True, null=True)
     status = models.CharField(max_length=14, choices=Status.choices, default=Status.pending)
+    # Percentage of the job's skills the applicant has. Scored at apply time
+    # and rescored by jobs.applications.score_applications() when the job's
+    # or the applicant's skills change.
+    skill_match = models.PositiveSmallIntegerField(default=0, editable=False)
+
+    objects = JobApplicationQuerySet.as_manager()
 
     class Meta:
         unique_together = ('job', 'applicant')
+        indexes = [
+            models.Index(fields=['applicant', '-application_date'], name='application_applicant_date_idx'),
+            models.Index(fields=['job', 'status'], name='application_job_status_idx'),
+            # A job's applicants best match first (view_applications)
+            models.Index(fields=['job', '-skill_match', '-application_date'], name='application_job_match_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'job_id' in instance.__dict__ and 'status' in instance.__dict__:
+            instance._counted = (instance.job_id, instance.status)
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Never write back a match score read before it was rescored
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'skill_match'
+            ]
+        # The row and the job's counters are written in the same transaction
+        with transaction.atomic(using=kwargs.get('using') or self._state.db):
+            counted = None
+            if not self._state.adding:
+                counted = getattr(self, '_counted', None) or JobApplication.objects.filter(
+                    pk=self.pk
+                ).values_list('job_id', 'status').first()
+            super().save(*args, **kwargs)
+            current = (self.job_id, self.status)
+            if counted != current:
+                if counted is not None:
+                    adjust_application_counts(*counted, -1)
+                adjust_application_counts(*current, 1)
+        self._counted = current
 
     def clean(self):
-        if self.job_id and self.job.deadline < timezone.now().date():
+        if self.job_id and self.job.job_status != JobStatus.open:
             raise ValidationError('Job application has closed.')
             
 
@@ -76,6 +271,16 @@ class JobApplication(models.Model):
 
 
 
+def adjust_application_counts(job_id, status, delta):
+    """Add `delta` to a job's total and per-status application counters."""
+    if job_id is None:
+        return
+    changes = {'application_count': F('application_count') + delta}
+    if status in Status.values:
+        changes[f'{status}_count'] = F(f'{status}_count') + delta
+    JobPosting.objects.filter(pk=job_id).update(**changes)
+
+
 # application, reviewer, status, employer message, reviewed_at
 class ApplicationReview(models.Model):
     application = models.OneToOneField(JobApplication, on_delete=models.CASCADE)
@@ -101,12 +306,62 @@ class SavedJob(models.Model):
 
     class Meta:
         unique_together = ['job', 'job_saver']  # Prevents duplicates
+        indexes = [
+            models.Index(fields=['job_saver', '-timestamp'], name='savedjob_saver_timestamp_idx'),
+        ]
 
         
     def __str__(self):
         return f'{self.job.title} --- {self.job_saver.full_name}'
 
 
+# Pre-ranked recommendations per seeker, filled by `manage.py refresh_recommendations`
+class RecommendedJob(models.Model):
+    seeker = models.ForeignKey(SeekerProfile, on_delete=models.CASCADE, related_name='recommended_jobs')
+    job = models.ForeignKey(JobPosting, on_delete=models.CASCADE, related_name='recommendations')
+    score = models.PositiveSmallIntegerField()
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('seeker', 'job')
+        indexes = [
+            models.Index(fields=['seeker', '-score'], name='recommended_seeker_score_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.job_id} for {self.seeker_id} ({self.score}%)'
+
+
+# Seekers whose RecommendedJob rows have been fully ranked at least once.
+# Job refreshes only add the jobs they touch, so until then the rows are partial.
+class RecommendationState(models.Model):
+    seeker = models.OneToOneField(
+        SeekerProfile, on_delete=models.CASCADE, primary_key=True, related_name='recommendation_state'
+    )
+    refreshed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f'Recommendations for {self.seeker_id} refreshed at {self.refreshed_at}'
+
+
+# Jobs and seekers whose materialized recommendations need recomputing
+class RecommendationRefresh(models.Model):
+    job = models.ForeignKey(JobPosting, on_delete=models.CASCADE, null=True, blank=True)
+    seeker = models.ForeignKey(SeekerProfile, on_delete=models.CASCADE, null=True, blank=True)
+    # Moved forward when a pending job or seeker is queued again
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        # One pending row per job and per seeker; NULLs don't collide
+        constraints = [
+            models.UniqueConstraint(fields=['job'], name='refresh_job_unique'),
+            models.UniqueConstraint(fields=['seeker'], name='refresh_seeker_unique'),
+        ]
+
+    def __str__(self):
+        return f'Refresh job={self.job_id} seeker={self.seeker_id}'
+
+
 class Notification(models.Model):
     recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
     message = models.CharField(max_length=255)
@@ -114,7 +369,79 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['recipient', 'is_read', '-created_at'], name='notification_unread_idx'),
+            models.Index(fields=['recipient', '-created_at'], name='notification_recipient_idx'),
+        ]
+
     def __str__(self):
         return f'Notification to {self.recipient.username}'
 
 
+# A row of one of the queues drained by a worker command, see jobs/queue.py.
+# Subclasses add a `status` field and name its QUEUED, CLAIMED and FAILED
+# values.
+class QueuedItem(models.Model):
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    # Set by the worker that claimed the row; next_attempt_at is then the
+    # time its claim lapses
+    claim_token = models.CharField(max_length=32, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        abstract = True
+
+
+class MailStatus(models.TextChoices):
+    queued = 'queued', 'Queued'
+    sending = 'sending', 'Sending'
+    sent = 'sent', 'Sent'
+    failed = 'failed', 'Failed'
+
+
+# Outbox drained by `manage.py send_queued_mail`, see jobs/mail.py
+class OutboundEmail(QueuedItem):
+    QUEUED, CLAIMED, FAILED = MailStatus.queued, MailStatus.sending, MailStatus.failed
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255)
+    to = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=MailStatus.choices, default=MailStatus.queued)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbound_email_due_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} to {", ".join(self.to)} ({self.status})'
+
+
+class TaskStatus(models.TextChoices):
+    queued = 'queued', 'Queued'
+    running = 'running', 'Running'
+    failed = 'failed', 'Failed'
+
+
+# Work deferred out of the request, drained by `manage.py run_deferred_tasks`,
+# see jobs/tasks.py. Rows are deleted once their task succeeds.
+class DeferredTask(QueuedItem):
+    QUEUED, CLAIMED, FAILED = TaskStatus.queued, TaskStatus.running, TaskStatus.failed
+
+    func = models.CharField(max_length=255)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=TaskStatus.choices, default=TaskStatus.queued)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='deferred_task_due_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.func} ({self.status})'
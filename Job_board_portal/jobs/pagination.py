@@ -0,0 +1,213 @@
+import base64
+import binascii
+import bisect
+import datetime
+import json
+import math
+from collections.abc import Sequence
+
+from django.db.models import F, Q
+from django.utils.functional import cached_property
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values, number, backwards=False):
+    def default(value):
+        if isinstance(value, (datetime.date, datetime.time)):
+            return value.isoformat()
+        raise TypeError(f'Cannot encode {value!r} in a cursor')
+
+    payload = json.dumps({'v': values, 'n': number, 'b': backwards}, default=default, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        payload = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        data = json.loads(payload)
+        return data['v'], int(data['n']), bool(data['b'])
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise InvalidCursor(token)
+
+
+class CursorPaginator:
+    """
+    Keyset paginator, a drop-in for Paginator in the list templates.
+
+    Pages are fetched with a WHERE on the ordering fields of the last row
+    seen instead of an OFFSET, so every page costs the same however deep it
+    is. `ordering` defaults to the queryset's own ordering; the primary key
+    is appended as a tie-breaker. Ordering fields must not be nullable.
+
+    Page tokens are opaque strings that go in the existing `page` parameter.
+    Pass count=False to skip the COUNT query; paginator.count and num_pages
+    are then None.
+    """
+
+    def __init__(self, queryset, per_page, ordering=None, count=True):
+        ordering = list(ordering or queryset.query.order_by)
+        if not all(isinstance(field, str) for field in ordering):
+            raise ValueError('CursorPaginator only supports plain field orderings')
+        if not {'pk', '-pk', 'id', '-id'} & set(ordering):
+            descending = bool(ordering) and ordering[-1].startswith('-')
+            ordering.append('-pk' if descending else 'pk')
+
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = ordering
+        self.with_count = count
+
+    @cached_property
+    def count(self):
+        if not self.with_count:
+            return None
+        return self.queryset.count()
+
+    @cached_property
+    def num_pages(self):
+        if self.count is None:
+            return None
+        return max(1, math.ceil(self.count / self.per_page))
+
+    def _keyset_filter(self, values, backwards):
+        # (a, b, c) > (x, y, z) expanded as a > x OR (a = x AND b > y) OR ...
+        condition = Q()
+        equal = {}
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            after = field.startswith('-') == backwards
+            condition |= Q(**equal, **{f'{name}__{"gt" if after else "lt"}': value})
+            equal[name] = value
+        return condition
+
+    def get_page(self, token=None):
+        """Return the page for `token`, or the first page when it is missing or invalid."""
+        values, number, backwards = None, 1, False
+        if token:
+            try:
+                values, number, backwards = decode_cursor(token)
+            except InvalidCursor:
+                pass
+            if values is not None and len(values) != len(self.ordering):
+                values, number, backwards = None, 1, False
+
+        ordering = self.ordering
+        if backwards:
+            ordering = [field[1:] if field.startswith('-') else f'-{field}' for field in ordering]
+
+        queryset = self.queryset.annotate(**{
+            f'_cursor_{i}': F(field.lstrip('-')) for i, field in enumerate(self.ordering)
+        }).order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self._keyset_filter(values, backwards))
+
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if backwards:
+            rows.reverse()
+            return CursorPage(rows, number, self, has_next=True, has_previous=has_more)
+        return CursorPage(rows, number, self, has_next=has_more, has_previous=values is not None)
+
+
+class CursorPage(Sequence):
+    def __init__(self, object_list, number, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.number = number
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<Page {self.number}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def _cursor(self, obj):
+        return [getattr(obj, f'_cursor_{i}') for i in range(len(self.paginator.ordering))]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    def next_page_number(self):
+        """The token of the next page, for use as the `page` parameter."""
+        return encode_cursor(self._cursor(self.object_list[-1]), self.number + 1)
+
+    def previous_page_number(self):
+        """The token of the previous page, for use as the `page` parameter."""
+        if self.number <= 2 or not self.object_list:
+            return ''
+        return encode_cursor(self._cursor(self.object_list[0]), self.number - 1, backwards=True)
+
+
+class ListPaginator:
+    """
+    Keyset paginator over an in-memory list sorted by `key`, such as a
+    cached ranking. As with CursorPaginator, page tokens hold the key of the
+    last row seen, found again with a binary search, so paging stays
+    consistent when the list is recomputed between requests. Keys must be
+    tuples of JSON-serializable values.
+
+    `load` turns the items of a page into the objects to display, so only
+    the current page has to be fetched.
+    """
+
+    def __init__(self, items, per_page, key, load=list):
+        self.items = items
+        self.per_page = per_page
+        self.keys = [key(item) for item in items]
+        self.load = load
+        self.count = len(items)
+        self.num_pages = max(1, math.ceil(self.count / per_page))
+
+    def get_page(self, token=None):
+        """Return the page for `token`, or the first page when it is missing or invalid."""
+        values, number, backwards = None, 1, False
+        if token:
+            try:
+                values, number, backwards = decode_cursor(token)
+            except InvalidCursor:
+                pass
+
+        if values is None:
+            start = 0
+            end = min(self.per_page, self.count)
+        elif backwards:
+            end = bisect.bisect_left(self.keys, tuple(values))
+            start = max(0, end - self.per_page)
+        else:
+            start = bisect.bisect_right(self.keys, tuple(values))
+            end = min(start + self.per_page, self.count)
+
+        return ListPage(
+            self.load(self.items[start:end]), number, self,
+            has_next=end < self.count, has_previous=start > 0, keys=self.keys[start:end],
+        )
+
+
+class ListPage(CursorPage):
+    def __init__(self, object_list, number, paginator, has_next, has_previous, keys):
+        super().__init__(object_list, number, paginator, has_next, has_previous)
+        self.keys = keys
+
+    def next_page_number(self):
+        return encode_cursor(list(self.keys[-1]), self.number + 1)
+
+    def previous_page_number(self):
+        if self.number <= 2 or not self.keys:
+            return ''
+        return encode_cursor(list(self.keys[0]), self.number - 1, backwards=True)
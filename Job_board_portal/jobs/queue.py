@@ -0,0 +1,55 @@
+from datetime import timedelta
+import uuid
+
+from django.db.models import Q
+from django.utils import timezone
+
+
+RETRY_BACKOFF = 60
+# A worker that dies mid-batch leaves its rows claimed; others take them
+# over once the claim is this old
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+
+def retry_delay(attempts):
+    """Exponential backoff: 1, 2, 4, 8... minutes after each failed attempt."""
+    return timedelta(seconds=RETRY_BACKOFF * 2 ** (attempts - 1))
+
+
+def claim_batch(model, batch_size):
+    """
+    Move up to `batch_size` due rows of a QueuedItem `model` to CLAIMED with
+    a conditional UPDATE that only matches rows still in the status they
+    were picked in, and return the ones this call won. Concurrent workers
+    never get the same row.
+    """
+    now = timezone.now()
+    due = model.objects.filter(
+        Q(status=model.QUEUED) | Q(status=model.CLAIMED),
+        next_attempt_at__lte=now,
+    )
+    candidates = list(due.order_by('next_attempt_at', 'id').values_list('id', flat=True)[:batch_size])
+    if not candidates:
+        return []
+
+    token = uuid.uuid4().hex
+    due.filter(id__in=candidates).update(
+        status=model.CLAIMED, claim_token=token, next_attempt_at=now + CLAIM_TIMEOUT,
+    )
+    return list(model.objects.filter(claim_token=token, status=model.CLAIMED).order_by('id'))
+
+
+def record_failure(item, error, max_attempts):
+    """
+    Release a claimed `item` after a failed attempt, queueing it again with
+    exponential backoff or marking it failed after `max_attempts`. The
+    caller saves it.
+    """
+    item.attempts += 1
+    item.claim_token = ''
+    item.last_error = str(error)
+    if item.attempts >= max_attempts:
+        item.status = item.FAILED
+    else:
+        item.status = item.QUEUED
+        item.next_attempt_at = timezone.now() + retry_delay(item.attempts)
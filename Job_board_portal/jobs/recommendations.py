@@ -0,0 +1,267 @@
+import hashlib
+import heapq
+import uuid
+from itertools import islice
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from .applied import exclude_applied
+from .models import (
+    JobApplication, JobPosting, JobSkill, RecommendationRefresh, RecommendationState, RecommendedJob, SeekerSkill,
+)
+from .scoring import DEFAULT_SCORER, SCORERS, score_jobs
+from .skills import get_seeker_skills
+
+
+RECOMMENDATIONS_TIMEOUT = 60 * 60
+RECOMMENDATIONS_CACHE_SIZE = 100
+
+
+def get_match_quality(percent_match):
+    if percent_match >= 80:
+        return "excellent"
+    elif percent_match >= 60:
+        return "good"
+    elif percent_match >= 40:
+        return "fair"
+    return "weak"
+
+
+def recommendations_cache_key(seeker_id, scorer=DEFAULT_SCORER):
+    return f'jobs:recommendations:{scorer}:{seeker_id}'
+
+
+def skill_version_key(skill):
+    return 'jobs:skill-version:' + hashlib.md5(skill.encode()).hexdigest()
+
+
+def bump_skill_versions(skills):
+    """Invalidate the cached recommendations of every seeker holding one of `skills`."""
+    token = uuid.uuid4().hex
+    cache.set_many({skill_version_key(skill): token for skill in skills}, None)
+
+
+def evict_recommendations(seeker_id):
+    cache.delete_many([recommendations_cache_key(seeker_id, scorer) for scorer in SCORERS])
+
+
+def recommendable_jobs(profile):
+    """Open jobs the seeker has not applied to yet."""
+    return exclude_applied(JobPosting.objects.filter(job_status='open'), profile)
+
+
+def top_k_jobs(profile, jobs, k, chunk_size=2000, scorer=DEFAULT_SCORER):
+    """
+    Return the best `k` jobs of `jobs` for the seeker as [(job_id, percent_match)],
+    ranked by one of scoring.SCORERS.
+
+    Candidates sharing a skill with the seeker are streamed from the database
+    in chunks, scored a chunk at a time and kept in a bounded min-heap of
+    (score, posted_date, id) tuples, so memory stays constant however many
+    jobs match.
+    """
+    seeker_skills = get_seeker_skills(profile)
+    if not seeker_skills or k <= 0:
+        return []
+
+    matching_ids = JobSkill.objects.filter(tag_id__in=seeker_skills.values()).values('content_object_id')
+    candidates = jobs.filter(id__in=matching_ids).order_by().values_list('id', 'posted_date').iterator(chunk_size=chunk_size)
+
+    heap = []
+    while True:
+        chunk = dict(islice(candidates, chunk_size))
+        if not chunk:
+            break
+
+        scores = score_jobs(profile, list(chunk), scorer)
+        percents = scores.percent_match
+        job_ids = scores.job_ids
+        if len(heap) == k:
+            # Skip everything that cannot beat the current k-th best
+            keep = percents >= heap[0][0]
+            percents, job_ids = percents[keep], job_ids[keep]
+
+        for job_id, percent_match in zip(job_ids.tolist(), percents.tolist()):
+            item = (percent_match, chunk[job_id], job_id)
+            if len(heap) < k:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+
+    return [(job_id, percent_match) for percent_match, _, job_id in sorted(heap, reverse=True)]
+
+
+def get_ranked_recommendations(profile, scorer=DEFAULT_SCORER):
+    """
+    The seeker's top RECOMMENDATIONS_CACHE_SIZE recommendable jobs under
+    `scorer`, cached.
+
+    Each entry remembers the seeker's skills and the version of every one of
+    those skills, and is read back together with the current versions in a
+    single get_many(). Job signals bump the versions of the skills they touch,
+    so only seekers sharing a skill with a changed job recompute.
+    """
+    seeker_skills = sorted(get_seeker_skills(profile))
+    if not seeker_skills:
+        return []
+
+    entry_key = recommendations_cache_key(profile.pk, scorer)
+    version_keys = [skill_version_key(skill) for skill in seeker_skills]
+    cached = cache.get_many([entry_key] + version_keys)
+    versions = [cached.get(key) for key in version_keys]
+
+    entry = cached.get(entry_key)
+    if entry and entry['skills'] == seeker_skills and entry['versions'] == versions:
+        return entry['ranked']
+
+    ranked = top_k_jobs(profile, recommendable_jobs(profile), RECOMMENDATIONS_CACHE_SIZE, scorer=scorer)
+    cache.set(entry_key, {'skills': seeker_skills, 'versions': versions, 'ranked': ranked}, RECOMMENDATIONS_TIMEOUT)
+    return ranked
+
+
+def attach_match_data(job, percent_match, seeker_skills):
+    # Jobs come with skill_tags prefetched
+    job_skills = [skill.name for skill in job.skill_tags.all()]
+    job.match_score = percent_match
+    job.match_quality = get_match_quality(percent_match)
+    job.matched_skills = [skill for skill in job_skills if skill in seeker_skills]
+    job.missing_skills = [skill for skill in job_skills if skill not in seeker_skills]
+    job.total_skills_required = len(job_skills)
+    return job
+
+
+def recommend_jobs(profile, jobs=None, limit=10, scorer=DEFAULT_SCORER):
+    """
+    Return the seeker's `limit` best matching jobs with match data attached.
+
+    Without `jobs` the cached ranking over recommendable_jobs() is used;
+    filtered views pass their queryset and get a fresh top-k over it. Only the
+    winning rows are fetched, and matched/missing skills are only worked out
+    for them.
+    """
+    if jobs is None:
+        jobs = recommendable_jobs(profile)
+        ranked = get_ranked_recommendations(profile, scorer)[:limit]
+    else:
+        ranked = top_k_jobs(profile, jobs, limit, scorer=scorer)
+    if not ranked:
+        return []
+
+    seeker_skills = set(get_seeker_skills(profile))
+    jobs_by_id = jobs.select_related('employer__user').prefetch_related('skill_tags').in_bulk(
+        [job_id for job_id, _ in ranked]
+    )
+
+    recommended_jobs = []
+    for job_id, percent_match in ranked:
+        job = jobs_by_id.get(job_id)
+        if job is not None:
+            recommended_jobs.append(attach_match_data(job, percent_match, seeker_skills))
+    return recommended_jobs
+
+
+# --- Materialized recommendations ---
+
+def materialized_recommendations(profile, limit=10):
+    """
+    Read the seeker's pre-ranked RecommendedJob rows in a single query. Empty
+    until the seeker has had a full refresh, so callers fall back to
+    recommend_jobs() instead of showing a partial list.
+    """
+    rows = RecommendedJob.objects.filter(
+        seeker=profile,
+        seeker__recommendation_state__isnull=False,
+        job__job_status='open',
+    ).select_related('job__employer__user').prefetch_related('job__skill_tags').order_by('-score', '-job__posted_date')[:limit]
+
+    seeker_skills = set(get_seeker_skills(profile))
+    return [attach_match_data(row.job, row.score, seeker_skills) for row in rows]
+
+
+def queue_refresh(job_ids=(), seeker_ids=()):
+    """
+    Queue jobs and seekers for the refresh_recommendations command, each at
+    most once. Queueing a pending one again moves its created_at forward,
+    so a drain that read the older row keeps it queued.
+    """
+    for field, ids in (('job', job_ids), ('seeker', seeker_ids)):
+        if ids:
+            RecommendationRefresh.objects.bulk_create(
+                [RecommendationRefresh(**{f'{field}_id': pk}) for pk in set(ids)],
+                update_conflicts=True, unique_fields=[field], update_fields=['created_at'],
+            )
+
+
+def refresh_seeker_recommendations(profile):
+    """Re-rank every recommendable job for one seeker."""
+    ranked = top_k_jobs(profile, recommendable_jobs(profile), RECOMMENDATIONS_CACHE_SIZE)
+    with transaction.atomic():
+        RecommendedJob.objects.filter(seeker=profile).delete()
+        RecommendedJob.objects.bulk_create(
+            RecommendedJob(seeker=profile, job_id=job_id, score=percent_match)
+            for job_id, percent_match in ranked
+        )
+        RecommendationState.objects.update_or_create(seeker=profile, defaults={'refreshed_at': timezone.now()})
+
+
+def trim_recommendations(seekers):
+    """
+    Keep the best RECOMMENDATIONS_CACHE_SIZE rows of each seeker in the
+    `seekers` queryset of ids, numbering them with a window function so all
+    seekers are trimmed by a single DELETE.
+    """
+    ranked = RecommendedJob.objects.filter(seeker_id__in=seekers).annotate(
+        position=Window(
+            RowNumber(),
+            partition_by=F('seeker_id'),
+            order_by=[F('score').desc(), F('job__posted_date').desc()],
+        ),
+    )
+    RecommendedJob.objects.filter(
+        id__in=ranked.filter(position__gt=RECOMMENDATIONS_CACHE_SIZE).values('id')
+    ).delete()
+
+
+def refresh_job_recommendations(job_ids):
+    """
+    Score the given jobs against the seekers sharing at least one skill with them.
+
+    Both sides are read from the skill link tables, the seekers through the
+    (tag, seeker) index, so only seekers who can match are looked at. Seekers
+    keep at most RECOMMENDATIONS_CACHE_SIZE rows; anything beyond that is
+    trimmed.
+    """
+    jobs = {}
+    for job_id, skill_id in JobSkill.objects.filter(
+        content_object_id__in=job_ids,
+        content_object__job_status='open',
+    ).values_list('content_object_id', 'tag_id'):
+        jobs.setdefault(job_id, set()).add(skill_id)
+
+    wanted_skills = set().union(*jobs.values())
+
+    seekers = {}
+    for seeker_id, skill_id in SeekerSkill.objects.filter(tag_id__in=wanted_skills).values_list(
+        'content_object_id', 'tag_id'
+    ).iterator(chunk_size=2000):
+        seekers.setdefault(seeker_id, set()).add(skill_id)
+
+    applied = set(JobApplication.objects.filter(job_id__in=jobs).values_list('job_id', 'applicant_id'))
+
+    rows = []
+    for seeker_id, seeker_skills in seekers.items():
+        for job_id, job_skills in jobs.items():
+            if (job_id, seeker_id) in applied:
+                continue
+            matched = len(job_skills & seeker_skills)
+            if matched:
+                rows.append(RecommendedJob(seeker_id=seeker_id, job_id=job_id, score=matched * 100 // len(job_skills)))
+
+    with transaction.atomic():
+        RecommendedJob.objects.filter(job_id__in=job_ids).delete()
+        RecommendedJob.objects.bulk_create(rows, batch_size=1000)
+        trim_recommendations(RecommendedJob.objects.filter(job_id__in=job_ids).values('seeker_id'))
@@ -0,0 +1,31 @@
+from django.core.cache import cache
+
+from .models import SavedJob
+
+
+SAVED_JOBS_TIMEOUT = 60 * 60 * 24
+
+
+def saved_jobs_cache_key(seeker_id):
+    return f'jobs:saved-jobs:{seeker_id}'
+
+
+def get_saved_job_ids(seeker_id):
+    """The ids of every job the seeker has saved, read from the cache after the first call."""
+    key = saved_jobs_cache_key(seeker_id)
+    job_ids = cache.get(key)
+    if job_ids is None:
+        job_ids = frozenset(SavedJob.objects.filter(job_saver_id=seeker_id).values_list('job_id', flat=True))
+        cache.set(key, job_ids, SAVED_JOBS_TIMEOUT)
+    return job_ids
+
+
+def update_saved_job_ids(seeker_id, saved=(), unsaved=()):
+    """
+    Apply a save or unsave to the cached set, if there is one. Ids of jobs
+    deleted since are left in place; they never match a rendered card.
+    """
+    key = saved_jobs_cache_key(seeker_id)
+    job_ids = cache.get(key)
+    if job_ids is not None:
+        cache.set(key, job_ids.union(saved).difference(unsaved), SAVED_JOBS_TIMEOUT)
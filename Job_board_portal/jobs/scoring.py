@@ -0,0 +1,277 @@
+from collections import namedtuple
+import random
+
+import numpy as np
+from django.core.cache import cache
+
+from .models import JobPosting, JobSkill, JobStatus, Skill
+from .skills import IDF_VERSION_KEY, get_seeker_skills
+
+
+MATRIX_VERSION_KEY = 'jobs:skill-matrix-version'
+MATRIX_CHANGES_TIMEOUT = 60 * 60 * 24
+# Processes further behind than this rebuild instead of replaying changes
+MATRIX_MAX_PATCHES = 100
+
+# Selectable ways of ranking jobs for a seeker. `match` is the share of the
+# job's skills the seeker has; `relevance` weights each skill by its inverse
+# document frequency over open jobs, so rare skills count for more than
+# generic ones.
+SCORERS = {
+    'match': 'Best match',
+    'relevance': 'Most relevant',
+}
+DEFAULT_SCORER = 'match'
+
+JobScores = namedtuple('JobScores', ['job_ids', 'percent_match', 'matched_counts', 'missing_counts'])
+
+
+def row_entries(starts, totals):
+    """Flat positions of every entry of the CSR rows given by `starts` and `totals`, row by row."""
+    offsets = np.repeat(starts - np.cumsum(totals) + totals, totals)
+    return offsets + np.arange(offsets.size)
+
+
+class SkillMatrix:
+    """
+    Sparse job x skill matrix in CSR form.
+
+    Row i holds the skills of job_ids[i] as integer ids in
+    indices[indptr[i]:indptr[i + 1]]; job_ids is kept sorted so candidate rows
+    can be located with a binary search. `vocabulary` maps skill keys (Skill
+    ids when built from the database) to those column ids.
+    """
+
+    def __init__(self, job_ids, indptr, indices, vocabulary):
+        self.job_ids = job_ids
+        self.indptr = indptr
+        self.indices = indices
+        self.vocabulary = vocabulary
+
+    @classmethod
+    def from_rows(cls, rows, vocabulary=None):
+        """
+        Build the matrix from (job_id, skill) pairs sorted by job_id. Skills
+        missing from `vocabulary` are added to it.
+        """
+        vocabulary = {} if vocabulary is None else vocabulary
+        job_ids = []
+        indptr = [0]
+        indices = []
+        for job_id, skill in rows:
+            if not job_ids or job_ids[-1] != job_id:
+                if job_ids:
+                    indptr.append(len(indices))
+                job_ids.append(job_id)
+            indices.append(vocabulary.setdefault(skill, len(vocabulary)))
+        if job_ids:
+            indptr.append(len(indices))
+
+        return cls(
+            np.asarray(job_ids, dtype=np.int64),
+            np.asarray(indptr, dtype=np.int64),
+            np.asarray(indices, dtype=np.int32),
+            vocabulary,
+        )
+
+    @classmethod
+    def from_index(cls):
+        rows = JobSkill.objects.order_by('content_object_id').values_list(
+            'content_object_id', 'tag_id'
+        ).iterator(chunk_size=10000)
+        return cls.from_rows(rows)
+
+    def replace_rows(self, job_ids, rows):
+        """
+        A copy of the matrix with the rows of `job_ids` replaced by `rows`,
+        (job_id, skill) pairs sorted by job_id. Jobs without pairs are
+        dropped. Only the changed rows are built in Python; the rest are
+        copied over with array operations.
+        """
+        patch = SkillMatrix.from_rows(rows, dict(self.vocabulary))
+        keep = ~np.isin(self.job_ids, np.fromiter(job_ids, dtype=np.int64))
+
+        merged_ids = np.concatenate([self.job_ids[keep], patch.job_ids])
+        starts = np.concatenate([self.indptr[:-1][keep], patch.indptr[:-1] + len(self.indices)])
+        totals = np.concatenate([np.diff(self.indptr)[keep], np.diff(patch.indptr)])
+        order = np.argsort(merged_ids, kind='stable')
+        starts, totals = starts[order], totals[order]
+
+        indices = np.concatenate([self.indices, patch.indices])[row_entries(starts, totals)]
+        indptr = np.concatenate([[0], np.cumsum(totals)])
+        return SkillMatrix(merged_ids[order], indptr, indices, patch.vocabulary)
+
+    def refresh_rows(self, job_ids):
+        """replace_rows() with the current skills of `job_ids` from the index."""
+        rows = JobSkill.objects.filter(content_object_id__in=job_ids).order_by('content_object_id').values_list(
+            'content_object_id', 'tag_id'
+        )
+        return self.replace_rows(job_ids, rows)
+
+    def idf_weights(self, open_job_counts, total_open_jobs):
+        """
+        BM25 inverse document frequency of every column, from the number of
+        open jobs listing each skill key.
+        """
+        weights = np.zeros(len(self.vocabulary) + 1)
+        if self.vocabulary:
+            columns = np.fromiter(self.vocabulary.values(), dtype=np.int64, count=len(self.vocabulary))
+            counts = np.fromiter(
+                (open_job_counts.get(skill, 0) for skill in self.vocabulary),
+                dtype=np.float64, count=len(self.vocabulary),
+            )
+            weights[columns] = np.log1p((total_open_jobs - counts + 0.5) / (counts + 0.5))
+        return weights
+
+    def score(self, skills, candidate_ids=None, weights=None):
+        """
+        Score every candidate job against `skills` in one vectorized pass.
+
+        Returns a JobScores of aligned arrays. Candidates without any indexed
+        skills are dropped since there is nothing to match them on. With
+        per-column `weights` the percentage is the weighted share of the
+        job's skills the seeker has instead of the plain share.
+        """
+        if candidate_ids is None:
+            rows = np.arange(len(self.job_ids))
+        else:
+            candidate_ids = np.asarray(candidate_ids, dtype=np.int64)
+            rows = np.searchsorted(self.job_ids, candidate_ids)
+            in_range = rows < len(self.job_ids)
+            rows, candidate_ids = rows[in_range], candidate_ids[in_range]
+            rows = rows[self.job_ids[rows] == candidate_ids]
+
+        starts = self.indptr[rows]
+        totals = self.indptr[rows + 1] - starts
+
+        # Flat positions of every (candidate, skill) entry, candidate by candidate
+        entries = row_entries(starts, totals)
+
+        seeker_mask = np.zeros(len(self.vocabulary) + 1, dtype=bool)
+        seeker_ids = [self.vocabulary[skill] for skill in skills if skill in self.vocabulary]
+        seeker_mask[seeker_ids] = True
+
+        columns = self.indices[entries]
+        hits = seeker_mask[columns]
+        owners = np.repeat(np.arange(rows.size), totals)
+        matched = np.bincount(owners[hits], minlength=rows.size)
+
+        percent = np.zeros(rows.size, dtype=np.int64)
+        nonempty = totals > 0
+        if weights is None:
+            percent[nonempty] = (matched[nonempty] * 100) // totals[nonempty]
+        else:
+            entry_weights = weights[columns]
+            matched_weight = np.bincount(owners[hits], weights=entry_weights[hits], minlength=rows.size)
+            total_weight = np.bincount(owners, weights=entry_weights, minlength=rows.size)
+            weighted = nonempty & (total_weight > 0)
+            percent[weighted] = (matched_weight[weighted] * 100 / total_weight[weighted]).astype(np.int64)
+
+        return JobScores(
+            job_ids=self.job_ids[rows][nonempty],
+            percent_match=percent[nonempty],
+            matched_counts=matched[nonempty],
+            missing_counts=(totals - matched)[nonempty],
+        )
+
+
+_matrix = None
+_matrix_version = None
+
+
+def matrix_changes_key(version):
+    return f'jobs:skill-matrix-changes:{version}'
+
+
+def invalidate_skill_matrix(job_ids=None):
+    """
+    Tell every process its matrix is stale. With `job_ids` the change is
+    logged under the new version so processes patch just those rows on their
+    next scoring call; without, they rebuild the whole matrix.
+    """
+    try:
+        version = cache.incr(MATRIX_VERSION_KEY)
+    except ValueError:
+        reset_matrix_version()
+        return
+    if job_ids is not None:
+        cache.set(matrix_changes_key(version), list(job_ids), MATRIX_CHANGES_TIMEOUT)
+
+
+def reset_matrix_version():
+    # Versions restart from a random point when the key is lost, so processes
+    # holding a matrix from before can't mistake new changes for their own
+    # next ones and replay the wrong log
+    cache.add(MATRIX_VERSION_KEY, random.getrandbits(48), None)
+    return cache.get(MATRIX_VERSION_KEY)
+
+
+def cache_version(key):
+    version = cache.get(key)
+    if version is None:
+        version = 0
+        cache.add(key, version, None)
+    return version
+
+
+def changed_jobs(since, version):
+    """
+    Ids of the jobs changed between two matrix versions, or None when the
+    log can't say, because a change was a full invalidation, has expired or
+    is too far back.
+    """
+    if not 0 < version - since <= MATRIX_MAX_PATCHES:
+        return None
+    keys = [matrix_changes_key(v) for v in range(since + 1, version + 1)]
+    changes = cache.get_many(keys)
+    if len(changes) != len(keys):
+        return None
+    return set().union(*changes.values())
+
+
+def get_skill_matrix():
+    """
+    This process's matrix at the current version. Jobs changed since it was
+    built are patched in from the change log; it is only rebuilt from the
+    whole index at start-up or when the log can't be replayed.
+    """
+    global _matrix, _matrix_version
+
+    version = cache.get(MATRIX_VERSION_KEY)
+    if version is None:
+        version = reset_matrix_version()
+    if _matrix is not None and _matrix_version != version:
+        job_ids = changed_jobs(_matrix_version, version)
+        _matrix = _matrix.refresh_rows(job_ids) if job_ids is not None else None
+        _matrix_version = version
+    if _matrix is None:
+        _matrix = SkillMatrix.from_index()
+        _matrix_version = version
+    return _matrix
+
+
+_idf = None
+_idf_version = None
+
+
+def get_idf_weights(matrix):
+    """
+    IDF weights for the columns of `matrix`, rebuilt from Skill.open_job_count
+    only when the counts or the matrix change.
+    """
+    global _idf, _idf_version
+
+    version = (cache_version(IDF_VERSION_KEY), matrix)
+    if _idf is None or _idf_version != version:
+        counts = dict(Skill.objects.filter(open_job_count__gt=0).values_list('id', 'open_job_count'))
+        total = JobPosting.objects.filter(job_status=JobStatus.open).count()
+        _idf = matrix.idf_weights(counts, total)
+        _idf_version = version
+    return _idf
+
+
+def score_jobs(seeker, candidate_ids=None, scorer=DEFAULT_SCORER):
+    """Score candidate jobs (all indexed jobs by default) for a seeker profile."""
+    matrix = get_skill_matrix()
+    weights = get_idf_weights(matrix) if scorer == 'relevance' else None
+    return matrix.score(get_seeker_skills(seeker).values(), candidate_ids, weights)
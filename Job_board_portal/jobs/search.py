@@ -0,0 +1,74 @@
+import re
+
+from django.db import connections, models
+from django.db.models import Lookup, Q
+
+
+SEARCH_FIELDS = ['title', 'qualifications', 'skills_required', 'location', 'employer__company_name']
+
+
+class FullTextDocumentField(models.TextField):
+    """
+    The hidden column FTS5 names after its own table. Filtering on it with
+    the `match` lookup searches every indexed column at once.
+    """
+
+
+@FullTextDocumentField.register_lookup
+class Match(Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
+
+
+class ContainsSearchBackend:
+    """Plain icontains search, used on databases without a full-text backend."""
+
+    def search(self, queryset, query, prefix=''):
+        condition = Q()
+        for field in SEARCH_FIELDS:
+            condition |= Q(**{f'{prefix}{field}__icontains': query})
+        return queryset.filter(condition)
+
+
+class SQLiteFTSSearchBackend(ContainsSearchBackend):
+    """
+    Searches the jobs_jobposting_fts FTS5 table (see migration 0012), which
+    triggers keep in sync with JobPosting and EmployerProfile.company_name.
+    Results come back ordered by BM25 relevance.
+    """
+
+    def build_query(self, query):
+        # Every word must appear somewhere, as a prefix so partially typed
+        # words still match. Words are quoted so FTS5 operators in user
+        # input are treated as plain text.
+        words = re.findall(r'\w+', query)
+        return ' '.join('"%s"*' % word for word in words)
+
+    def search(self, queryset, query, prefix=''):
+        match = self.build_query(query)
+        if not match:
+            return super().search(queryset, query, prefix)
+        return queryset.filter(
+            **{f'{prefix}search_document__document__match': match}
+        ).order_by(f'{prefix}search_document__rank')
+
+
+# A PostgreSQL backend can be registered here once the project moves off SQLite
+SEARCH_BACKENDS = {
+    'sqlite': SQLiteFTSSearchBackend(),
+}
+
+
+def search_jobs(queryset, query, prefix=''):
+    """
+    Filter `queryset` down to jobs matching `query` using the best search
+    backend for its database. `prefix` is the lookup path to JobPosting when
+    searching a related model, e.g. 'job__' for SavedJob.
+    """
+    vendor = connections[queryset.db].vendor
+    backend = SEARCH_BACKENDS.get(vendor, ContainsSearchBackend())
+    return backend.search(queryset, query, prefix)
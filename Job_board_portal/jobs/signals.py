@@ -0,0 +1,175 @@
+from django.db.models import Q, QuerySet
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from users.models import EmployerProfile, SeekerProfile
+from .models import JobApplication, JobPosting, JobSkill, JobStatus, Notification, SeekerSkill, SkillAlias, RecommendedJob, adjust_application_counts
+from .applications import score_applications
+from .applied import invalidate_applied_job_ids
+from .candidates import invalidate_candidates
+from .expiry import jobs_closed
+from .recommendations import bump_skill_versions, evict_recommendations, queue_refresh
+from .scoring import invalidate_skill_matrix
+from .skills import adjust_open_jobs, invalidate_skill_matcher, merge_skill_alias, normalize_skills, sync_job_skills, sync_seeker_skills
+from .stats import invalidate_employer_stats
+from .utils import invalidate_unread_notification_count, publish_notification, publish_unread_count
+
+
+def deleted_model(origin):
+    """The model a delete started from, whether `origin` is an instance or a queryset."""
+    return origin.model if isinstance(origin, QuerySet) else type(origin)
+
+
+def deleted_with_job(origin):
+    """Whether a delete cascading from `origin` removes the applications' jobs too."""
+    return origin is not None and issubclass(deleted_model(origin), (JobPosting, EmployerProfile))
+
+
+def index_job_skills(job, was_open=False):
+    skills, changed = sync_job_skills(job, was_open)
+    if changed:
+        invalidate_skill_matrix([job.pk])
+        invalidate_candidates(job.pk)
+        score_applications(JobApplication.objects.filter(job=job))
+    return skills, changed
+
+
+# Skill links are removed together with the job through the FK cascade,
+# so deletes only need to drop the job's row from the scoring matrix.
+@receiver(post_save, sender=JobPosting)
+def update_job_skill_index(sender, instance, created, update_fields=None, **kwargs):
+    was_open = getattr(instance, '_was_open', False)
+    is_open = instance.job_status == JobStatus.open
+    if update_fields is not None and 'skills_required' not in update_fields:
+        # Status or deadline changes still affect who sees the job
+        if was_open != is_open:
+            adjust_open_jobs([instance.pk], 1 if is_open else -1)
+        skills, changed = normalize_skills(instance.skills_required), False
+    else:
+        skills, changed = index_job_skills(instance, was_open)
+    bump_skill_versions(skills)
+    # Materialized rankings only depend on the skills and the status
+    if changed or was_open != is_open:
+        queue_refresh(job_ids=[instance.pk])
+
+
+@receiver(pre_delete, sender=JobPosting)
+def uncount_open_job(sender, instance, **kwargs):
+    # Before the cascade takes the skill links with it
+    if instance.job_status == JobStatus.open:
+        adjust_open_jobs([instance.pk], -1)
+
+
+@receiver(post_delete, sender=JobPosting)
+def drop_job_skill_index(sender, instance, **kwargs):
+    invalidate_skill_matrix([instance.pk])
+    bump_skill_versions(normalize_skills(instance.skills_required))
+
+
+@receiver(post_save, sender=SkillAlias)
+def apply_skill_alias(sender, instance, **kwargs):
+    invalidate_skill_matcher()
+    merged, job_ids = merge_skill_alias(instance)
+    if merged:
+        invalidate_skill_matrix(job_ids)
+        bump_skill_versions(merged | {instance.skill.name})
+        queue_refresh(job_ids=job_ids)
+        score_applications(JobApplication.objects.filter(
+            Q(job__in=JobSkill.objects.filter(tag=instance.skill_id).values('content_object'))
+            | Q(applicant__in=SeekerSkill.objects.filter(tag=instance.skill_id).values('content_object'))
+        ))
+
+
+@receiver(post_delete, sender=SkillAlias)
+def drop_skill_alias(sender, instance, **kwargs):
+    invalidate_skill_matcher()
+
+
+@receiver(post_save, sender=JobApplication)
+def evict_applicant_recommendations(sender, instance, created, **kwargs):
+    if created:
+        evict_recommendations(instance.applicant_id)
+        RecommendedJob.objects.filter(seeker_id=instance.applicant_id, job_id=instance.job_id).delete()
+
+
+@receiver(post_save, sender=JobApplication)
+@receiver(post_delete, sender=JobApplication)
+def evict_applied_job_ids(sender, instance, **kwargs):
+    invalidate_applied_job_ids(instance.applicant_id)
+
+
+# Applicants are left out of a job's candidates
+@receiver(post_save, sender=JobApplication)
+@receiver(post_delete, sender=JobApplication)
+def evict_job_candidates(sender, instance, created=None, origin=None, **kwargs):
+    # Updates don't change who applied
+    if created is False or deleted_with_job(origin):
+        return
+    invalidate_candidates(instance.job_id)
+
+
+@receiver(post_save, sender=SeekerProfile)
+def evict_seeker_recommendations(sender, instance, **kwargs):
+    skills, changed = sync_seeker_skills(instance)
+    if changed:
+        score_applications(JobApplication.objects.filter(applicant=instance))
+        queue_refresh(seeker_ids=[instance.pk])
+    evict_recommendations(instance.pk)
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def push_notification_change(sender, instance, created=False, **kwargs):
+    invalidate_unread_notification_count(instance.recipient_id)
+    if created:
+        publish_notification(instance)
+    else:
+        publish_unread_count(instance.recipient_id)
+
+
+@receiver(post_save, sender=JobPosting)
+@receiver(post_delete, sender=JobPosting)
+def evict_job_stats(sender, instance, **kwargs):
+    invalidate_employer_stats(instance.employer_id, instance.pk)
+
+
+# Job deletes evict through evict_job_stats(); other deletes touching many
+# applications evict each job once, remembered on the delete's origin.
+@receiver(post_save, sender=JobApplication)
+@receiver(post_delete, sender=JobApplication)
+def evict_application_stats(sender, instance, origin=None, **kwargs):
+    if deleted_with_job(origin):
+        return
+    if origin is not None:
+        evicted = origin.__dict__.setdefault('_evicted_stats_job_ids', set())
+        if instance.job_id in evicted:
+            return
+        evicted.add(instance.job_id)
+
+    if JobApplication.job.is_cached(instance):
+        employer_id = instance.job.employer_id
+    else:
+        employer_id = JobPosting.objects.filter(pk=instance.job_id).values_list('employer_id', flat=True).first()
+        if employer_id is None:
+            return
+    invalidate_employer_stats(employer_id, instance.job_id)
+
+
+# Saves adjust the counters in JobApplication.save() and queryset deletes in
+# JobApplicationQuerySet.delete(); single deletes and cascades from seekers
+# go through here. Counters of jobs deleted in the same cascade are left
+# alone since they go with the job.
+@receiver(post_delete, sender=JobApplication)
+def decrement_application_counts(sender, instance, origin=None, **kwargs):
+    if deleted_with_job(origin):
+        return
+    if isinstance(origin, QuerySet) and issubclass(origin.model, JobApplication):
+        return
+    adjust_application_counts(instance.job_id, instance.status, -1)
+
+
+@receiver(jobs_closed)
+def evict_closed_jobs(sender, job_ids, employer_ids, **kwargs):
+    for employer_id in employer_ids:
+        invalidate_employer_stats(employer_id)
+    bump_skill_versions(set(JobSkill.objects.filter(content_object_id__in=job_ids).values_list('tag__name', flat=True)))
+    RecommendedJob.objects.filter(job_id__in=job_ids).delete()
@@ -0,0 +1,192 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Replace
+
+from .models import JobSkill, JobStatus, SeekerSkill, Skill, SkillAlias
+from .utils import parse_skills
+
+
+MAX_SKILL_LENGTH = Skill._meta.get_field('name').max_length
+ALIAS_VERSION_KEY = 'jobs:skill-alias-version'
+IDF_VERSION_KEY = 'jobs:skill-idf-version'
+
+_matcher = None
+_matcher_version = None
+
+
+def compile_skill_matcher():
+    """
+    Map SkillAlias keys to canonical skill names. The canonical names of
+    aliased skills are added under their own key, so "Java Script" finds
+    "javascript" once any alias points at it.
+    """
+    aliases = list(SkillAlias.objects.values_list('alias', 'skill__name'))
+    matcher = {SkillAlias.key_for(name): name for _, name in aliases}
+    matcher.update(aliases)
+    return matcher
+
+
+def invalidate_skill_matcher():
+    """Tell every process to recompile its matcher on the next lookup."""
+    try:
+        cache.incr(ALIAS_VERSION_KEY)
+    except ValueError:
+        cache.set(ALIAS_VERSION_KEY, 1, None)
+
+
+def get_skill_matcher():
+    global _matcher, _matcher_version
+
+    version = cache.get(ALIAS_VERSION_KEY)
+    if version is None:
+        version = 0
+        cache.add(ALIAS_VERSION_KEY, version, None)
+
+    if _matcher is None or _matcher_version != version:
+        _matcher = compile_skill_matcher()
+        _matcher_version = version
+    return _matcher
+
+
+def normalize_skills(skill_data):
+    """
+    parse_skills() with aliases replaced by their canonical skill, minus
+    anything too long to be a skill name.
+    """
+    matcher = get_skill_matcher()
+    skills = []
+    for skill in parse_skills(skill_data):
+        skill = matcher.get(SkillAlias.key_for(skill), skill)
+        if len(skill) <= MAX_SKILL_LENGTH and skill not in skills:
+            skills.append(skill)
+    return skills
+
+
+def merge_skill_alias(alias):
+    """
+    Fold the skills spelled like `alias` (or like its canonical skill) into
+    the canonical skill, moving their job and seeker links across. Returns
+    the merged skill names and the ids of the jobs whose links moved.
+    """
+    keys = {alias.alias, SkillAlias.key_for(alias.skill.name)}
+    key = Replace(Replace(Replace('name', Value(' ')), Value('-')), Value('_'))
+    duplicates = dict(
+        Skill.objects.exclude(pk=alias.skill_id).annotate(key=key).filter(key__in=keys).values_list('pk', 'name')
+    )
+    if not duplicates:
+        return set(), set()
+
+    with transaction.atomic():
+        job_ids = set(JobSkill.objects.filter(tag_id__in=duplicates).values_list('content_object_id', flat=True))
+        seeker_ids = set(SeekerSkill.objects.filter(tag_id__in=duplicates).values_list('content_object_id', flat=True))
+        for through, object_ids in ((JobSkill, job_ids), (SeekerSkill, seeker_ids)):
+            through.objects.bulk_create(
+                [through(content_object_id=object_id, tag_id=alias.skill_id) for object_id in object_ids],
+                ignore_conflicts=True,
+            )
+        # Deleting the duplicates drops their links through the cascade
+        Skill.objects.filter(pk__in=duplicates).delete()
+        recount_open_jobs([alias.skill_id])
+    return set(duplicates.values()), job_ids
+
+
+def get_or_create_skills(names):
+    """Map skill names to Skill ids, creating the ones not seen before."""
+    skill_ids = dict(Skill.objects.filter(name__in=names).values_list('name', 'id'))
+    for name in names:
+        if name not in skill_ids:
+            # One at a time so TagBase.save() can pick a free slug
+            skill_ids[name] = Skill.objects.get_or_create(name=name)[0].pk
+    return skill_ids
+
+
+def sync_skills(through, obj, skill_data):
+    """
+    Point the skill links of `obj` at the skills in `skill_data`, touching
+    only the links that changed. Returns (skills, added, removed): the names
+    of its skills before and after, and the ids of the skills linked and
+    unlinked.
+    """
+    names = normalize_skills(skill_data)
+    current = dict(through.objects.filter(content_object=obj).values_list('tag__name', 'tag_id'))
+
+    removed = [current[name] for name in current if name not in names]
+    if removed:
+        through.objects.filter(content_object=obj, tag_id__in=removed).delete()
+
+    added = [name for name in names if name not in current]
+    if added:
+        skill_ids = get_or_create_skills(added)
+        added = [skill_ids[name] for name in added]
+        through.objects.bulk_create(
+            [through(content_object=obj, tag_id=skill_id) for skill_id in added],
+            ignore_conflicts=True,
+        )
+    return set(current).union(names), added, removed
+
+
+# --- Open job counts (skill document frequencies) ---
+
+def invalidate_skill_idf():
+    """Tell every process to reload the open job counts on the next relevance scoring call."""
+    try:
+        cache.incr(IDF_VERSION_KEY)
+    except ValueError:
+        cache.set(IDF_VERSION_KEY, 1, None)
+
+
+def adjust_open_jobs(job_ids, delta):
+    """Add `delta` to the open job count of every skill of `job_ids`, once per job."""
+    links = JobSkill.objects.filter(content_object_id__in=job_ids)
+    per_skill = links.filter(tag=OuterRef('pk')).order_by().values('tag').annotate(n=Count('id')).values('n')
+    if Skill.objects.filter(pk__in=links.values('tag_id')).update(
+        open_job_count=F('open_job_count') + Subquery(per_skill, output_field=IntegerField()) * delta
+    ):
+        invalidate_skill_idf()
+
+
+def recount_open_jobs(skill_ids=None):
+    """Recompute open job counts from the links, for `skill_ids` or every skill."""
+    per_skill = JobSkill.objects.filter(
+        tag=OuterRef('pk'), content_object__job_status=JobStatus.open,
+    ).order_by().values('tag').annotate(n=Count('id')).values('n')
+    skills = Skill.objects.all() if skill_ids is None else Skill.objects.filter(pk__in=skill_ids)
+    skills.update(open_job_count=Coalesce(Subquery(per_skill, output_field=IntegerField()), Value(0)))
+    invalidate_skill_idf()
+
+
+def sync_job_skills(job, was_open=False):
+    """
+    Sync the job's skill links, and the open job counts of its skills with
+    its links and status. `was_open` is the status before the save.
+    Returns (skills, changed) like sync_skills().
+    """
+    is_open = job.job_status == JobStatus.open
+    if was_open and not is_open:
+        adjust_open_jobs([job.pk], -1)
+
+    skills, added, removed = sync_skills(JobSkill, job, job.skills_required)
+
+    if was_open and is_open and (added or removed):
+        Skill.objects.filter(pk__in=added).update(open_job_count=F('open_job_count') + 1)
+        Skill.objects.filter(pk__in=removed).update(open_job_count=F('open_job_count') - 1)
+        invalidate_skill_idf()
+    elif is_open and not was_open:
+        adjust_open_jobs([job.pk], 1)
+    return skills, bool(added or removed)
+
+
+def sync_seeker_skills(profile):
+    profile.__dict__.pop('_skill_ids', None)
+    skills, added, removed = sync_skills(SeekerSkill, profile, profile.skills)
+    return skills, bool(added or removed)
+
+
+def get_seeker_skills(profile):
+    """The seeker's skills as {name: skill id}, read once per profile instance."""
+    if '_skill_ids' not in profile.__dict__:
+        profile._skill_ids = dict(
+            SeekerSkill.objects.filter(content_object=profile).values_list('tag__name', 'tag_id')
+        )
+    return profile._skill_ids
@@ -0,0 +1,67 @@
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+
+from .models import JobApplication, JobPosting
+
+
+STATS_TIMEOUT = 60 * 10
+
+# The employer templates show counters for these, including statuses the
+# review flow does not set yet
+APPLICATION_STATUSES = ['pending', 'shortlisted', 'interview', 'offer', 'hired', 'rejected']
+
+
+def employer_stats_cache_key(employer_id):
+    return f'jobs:employer-stats:{employer_id}'
+
+
+def job_stats_cache_key(job_id):
+    return f'jobs:job-stats:{job_id}'
+
+
+def get_employer_stats(employer):
+    """
+    Dashboard counters for an employer from a single aggregate over their
+    jobs, cached until a job or application changes. Application totals are
+    summed from the jobs' denormalized counters.
+    """
+    key = employer_stats_cache_key(employer.pk)
+    stats = cache.get(key)
+    if stats is not None:
+        return stats
+
+    stats = JobPosting.objects.filter(employer=employer).aggregate(
+        total_jobs_posted=Count('id'),
+        active_jobs=Count('id', filter=Q(job_status='open')),
+        closed_jobs=Count('id', filter=Q(job_status='closed')),
+        total_applications=Coalesce(Sum('application_count'), 0),
+        pending_applications=Coalesce(Sum('pending_count'), 0),
+    )
+    cache.set(key, stats, STATS_TIMEOUT)
+    return stats
+
+
+def get_job_application_stats(job):
+    """Application counts for one job, in total and per status, from a single query."""
+    key = job_stats_cache_key(job.pk)
+    stats = cache.get(key)
+    if stats is not None:
+        return stats
+
+    stats = JobApplication.objects.filter(job=job).aggregate(
+        total_applications=Count('id'),
+        **{
+            f'{status}_count': Count('id', filter=Q(status=status))
+            for status in APPLICATION_STATUSES
+        },
+    )
+    cache.set(key, stats, STATS_TIMEOUT)
+    return stats
+
+
+def invalidate_employer_stats(employer_id, job_id=None):
+    keys = [employer_stats_cache_key(employer_id)]
+    if job_id is not None:
+        keys.append(job_stats_cache_key(job_id))
+    cache.delete_many(keys)
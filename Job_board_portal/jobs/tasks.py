@@ -0,0 +1,51 @@
+import logging
+
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from .models import DeferredTask
+from .queue import claim_batch, record_failure
+
+
+logger = logging.getLogger(__name__)
+
+# Tasks fan out notifications and the like, so a task that keeps failing is
+# given up on quickly rather than retried for hours
+MAX_ATTEMPTS = 3
+
+
+def defer(func, *args, **kwargs):
+    """
+    Queue `func(*args, **kwargs)` for the run_deferred_tasks worker instead of
+    running it inside the request. The task row is written in the current
+    transaction, so it is only queued if that transaction commits. `func`
+    must be a module-level function and the arguments JSON serializable.
+    """
+    return DeferredTask.objects.create(
+        func=f'{func.__module__}.{func.__qualname__}',
+        args=list(args),
+        kwargs=kwargs,
+    )
+
+
+def run_deferred_tasks(batch_size=100):
+    """
+    Claim one batch of due tasks and run each in its own transaction, which
+    also deletes the task so a crash can't run it twice. Failed tasks are
+    rolled back and retried with exponential backoff until MAX_ATTEMPTS,
+    then marked failed. Returns (succeeded, failed) counts.
+    """
+    succeeded = failed = 0
+    for task in claim_batch(DeferredTask, batch_size):
+        try:
+            with transaction.atomic():
+                import_string(task.func)(*task.args, **task.kwargs)
+                task.delete()
+        except Exception as e:
+            logger.exception('Deferred task %s failed', task.func)
+            record_failure(task, e, MAX_ATTEMPTS)
+            task.save(update_fields=['status', 'attempts', 'next_attempt_at', 'claim_token', 'last_error'])
+            failed += 1
+        else:
+            succeeded += 1
+    return succeeded, failed
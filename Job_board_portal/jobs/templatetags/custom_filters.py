@@ -13,47 +13,10 @@ def trim(value):
 
 
 from django import template
-import json
-import ast
+from jobs.saved import get_saved_job_ids
 
 register = template.Library()
 
-@register.filter
-def display_skills(skill_data):
-    """
-    Handles all possible skill data formats:
-    - List of dicts: [{'value': 'Python'}, {'value': 'Django'}]
-    - JSON string: '[{"value": "Python"}]'
-    - List of strings: ['Python', 'Django']
-    - String: "Python, Django"
-    """
-    if not skill_data:
-        return []
-    
-    # If it's already a list
-    if isinstance(skill_data, list):
-        skills = []
-        for item in skill_data:
-            if isinstance(item, dict) and 'value' in item:
-                skills.append(str(item['value']))
-            else:
-                skills.append(str(item))
-        return skills
-    
-    # If it's a string that might be JSON
-    if isinstance(skill_data, str):
-        try:
-            # Try to parse as JSON
-            parsed = json.loads(skill_data)
-            if isinstance(parsed, list):
-                return display_skills(parsed)  # Recursive call
-        except json.JSONDecodeError:
-            # If not JSON, try to split by commas
-            return [s.strip() for s in skill_data.split(',') if s.strip()]
-    
-    return []
-
-
 @register.filter
 def get_item(dictionary, key):
     return dictionary.get(key)
@@ -64,4 +27,19 @@ def param_replace(request, **kwargs):
     params = request.GET.copy()
     for key, value in kwargs.items():
         params[key] = value
-    return params.urlencode()
\ No newline at end of file
+    return params.urlencode()
+
+
+@register.simple_tag(takes_context=True)
+def is_saved(context, job):
+    """
+    Whether the seeker viewing the page saved `job`, e.g.
+    {% is_saved job as saved %}. The seeker's saved ids are read from the
+    cache once per request, so any number of job cards cost no queries.
+    """
+    request = context.get('request')
+    if request is None or getattr(request, 'profile_type', None) != 'seeker':
+        return False
+    if not hasattr(request, '_saved_job_ids'):
+        request._saved_job_ids = get_saved_job_ids(request.profile.pk)
+    return job.pk in request._saved_job_ids
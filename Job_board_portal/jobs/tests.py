@@ -1,3 +1,1583 @@
-from django.test import TestCase
+from datetime import timedelta
+import random
+import tempfile
+from io import StringIO
+from unittest import mock
+
+import numpy as np
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import AnonymousUser, User
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.db.models import F
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .applications import score_applications
+from .applied import exclude_applied, get_applied_job_ids
+from .checks import check_channel_layer, check_shared_cache
+from .candidates import rank_candidates, unapplied_candidates
+from .consumers import NotificationConsumer
+from .context_processors import NOTIFICATION_PREVIEW_SIZE
+from .expiry import close_expired_jobs, jobs_closed
+from .forms import PostJobForm
+from .mail import MAX_ATTEMPTS, enqueue_mail, send_queued_mail
+from .management.commands.benchmark_scoring import legacy_scores
+from .models import DeferredTask, JobApplication, JobPosting, JobSkill, MailStatus, Notification, OutboundEmail, RecommendationRefresh, RecommendedJob, SavedJob, SeekerSkill, Skill, SkillAlias, TaskStatus
+from .pagination import CursorPaginator, ListPaginator, encode_cursor
+from .queue import claim_batch
+from .recommendations import (
+    get_ranked_recommendations, materialized_recommendations, queue_refresh, recommend_jobs,
+    refresh_job_recommendations, refresh_seeker_recommendations, top_k_jobs,
+)
+from .saved import get_saved_job_ids
+from .scoring import SkillMatrix, get_skill_matrix, invalidate_skill_matrix
+from .search import search_jobs
+from .stats import get_employer_stats, get_job_application_stats
+from .tasks import MAX_ATTEMPTS as TASK_MAX_ATTEMPTS, defer, run_deferred_tasks
+from .utils import create_notification, get_unread_notification_count, get_user_profile, notification_group_name, notify_job_applicants, notify_users
+from users.models import EmployerProfile, SeekerProfile
 
 # Create your tests here.
+
+
+class CountingEmailBackend(EmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingEmailBackend.opened += 1
+        return super().open()
+
+
+class FailingEmailBackend(EmailBackend):
+    def send_messages(self, messages):
+        raise ConnectionError('SMTP unavailable')
+
+
+class JobBoardTestCase(TestCase):
+    """
+    Clears the cache before each test and creates employers, jobs and seekers
+    with every required field filled in. create_job() posts for `cls.employer`
+    unless another employer is passed.
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    @classmethod
+    def create_employer(cls, username='employer'):
+        return EmployerProfile.objects.create(
+            user=User.objects.create_user(username, f'{username}@example.com', 'password'),
+            account_type='employer', company_name='Acme',
+            company_website='https://acme.example.com', industry='Software', company_size='1-10',
+            about_company='About', job_posting_preference='open',
+        )
+
+    @classmethod
+    def create_job(cls, title='Developer', skills='Python', employer=None, **fields):
+        return JobPosting.objects.create(**{
+            'employer': employer or cls.employer, 'title': title, 'location': 'Lagos', 'salary': 100,
+            'experience_required': 1, 'qualifications': 'Degree', 'deadline': timezone.now().date() + timedelta(days=5),
+            'job_category': 'Engineering', 'skills_required': skills, **fields,
+        })
+
+    @classmethod
+    def create_seeker(cls, username='seeker', skills='Python', job_type='remote', full_name=None):
+        return SeekerProfile.objects.create(
+            user=User.objects.create_user(username, f'{username}@example.com', 'password'),
+            account_type='seeker', full_name=full_name or username, job_type=job_type,
+            bio='Bio', skills=skills, experience='Some', education='Some',
+        )
+
+
+class NotificationPushTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('seeker', 'seeker@example.com', 'password')
+        self.channel_layer = get_channel_layer()
+        self.channel_name = async_to_sync(self.channel_layer.new_channel)()
+        async_to_sync(self.channel_layer.group_add)(notification_group_name(self.user.pk), self.channel_name)
+
+    def receive(self):
+        return async_to_sync(self.channel_layer.receive)(self.channel_name)
+
+    def test_create_notification_publishes_to_user_group(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            create_notification(self.user, 'Your application was accepted', url='/jobs/1/')
+
+        event = self.receive()
+        self.assertEqual(event['type'], 'notification.created')
+        self.assertEqual(event['notification']['message'], 'Your application was accepted')
+        self.assertEqual(event['unread_count'], 1)
+
+    def test_marking_read_publishes_unread_count(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            create_notification(self.user, 'Hello')
+        self.receive()
+
+        self.client.force_login(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('jobs:mark_all_as_read'))
+
+        event = self.receive()
+        self.assertEqual(event['type'], 'notification.unread_count')
+        self.assertEqual(event['unread_count'], 0)
+
+    def test_bulk_notifications_publish_per_recipient(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            notify_users([self.user.pk], 'Job removed')
+
+        event = self.receive()
+        self.assertEqual(event['notification']['message'], 'Job removed')
+        self.assertEqual(event['unread_count'], 1)
+
+
+class NotificationConsumerTests(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('seeker', 'seeker@example.com', 'password')
+
+    async def connect(self, user):
+        communicator = WebsocketCommunicator(NotificationConsumer.as_asgi(), '/ws/notifications/')
+        communicator.scope['user'] = user
+        connected, _ = await communicator.connect()
+        return communicator, connected
+
+    async def test_anonymous_users_are_rejected(self):
+        _, connected = await self.connect(AnonymousUser())
+        self.assertFalse(connected)
+
+    async def test_pushes_notifications_to_connected_user(self):
+        communicator, connected = await self.connect(self.user)
+        self.assertTrue(connected)
+        self.assertEqual(await communicator.receive_json_from(), {'type': 'unread_count', 'unread_count': 0})
+
+        await database_sync_to_async(create_notification)(self.user, 'New applicant')
+
+        message = await communicator.receive_json_from()
+        self.assertEqual(message['type'], 'notification')
+        self.assertEqual(message['notification']['message'], 'New applicant')
+        self.assertEqual(message['unread_count'], 1)
+        await communicator.disconnect()
+
+class ChannelLayerCheckTests(TestCase):
+
+    def test_in_memory_layer_is_flagged_for_deploys(self):
+        self.assertEqual([warning.id for warning in check_channel_layer(None)], ['jobs.W002'])
+
+        redis = {'BACKEND': 'channels_redis.core.RedisChannelLayer', 'CONFIG': {'hosts': ['redis://localhost:6379/0']}}
+        with override_settings(CHANNEL_LAYERS={'default': redis}):
+            self.assertEqual(check_channel_layer(None), [])
+
+
+class QueryPlanTests(JobBoardTestCase):
+    """
+    Runs the list views and fails if SQLite plans a full table scan for any
+    query they issue. Index scans, subquery scans and the FTS virtual table
+    are fine.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = cls.create_employer()
+        cls.employer_user = cls.employer.user
+        cls.seeker = cls.create_seeker(skills='[{"value":"Python"}]', full_name='Ada Seeker')
+        cls.seeker_user = cls.seeker.user
+        cls.jobs = [cls.create_job(f'Python Developer {i}', 'Python, Django') for i in range(3)]
+        JobApplication.objects.create(job=cls.jobs[0], applicant=cls.seeker, cover_letter='Hi', resume='resumes/cv.pdf')
+        SavedJob.objects.create(job=cls.jobs[1], job_saver=cls.seeker)
+        Notification.objects.create(recipient=cls.seeker_user, message='Hello')
+
+    def capture_queries(self, url):
+        queries = []
+
+        def collect(execute, sql, params, many, context):
+            if sql.lstrip().upper().startswith('SELECT'):
+                queries.append((sql, params))
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(collect):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return queries
+
+    def full_scans(self, sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            plan = [row[3] for row in cursor.fetchall()]
+        return [
+            detail for detail in plan
+            if detail.startswith('SCAN ')
+            and ' USING ' not in detail
+            and 'VIRTUAL TABLE' not in detail
+            and not detail.startswith(('SCAN subquery', 'SCAN CONSTANT ROW'))
+        ]
+
+    def assertNoFullScans(self, user, url):
+        self.client.force_login(user)
+        for sql, params in self.capture_queries(url):
+            scans = self.full_scans(sql, params)
+            if scans:
+                self.fail(f'{url} runs a full scan ({", ".join(scans)}):\n{sql}')
+
+    def test_seeker_views(self):
+        for url in [
+            reverse('jobs:dashboard'),
+            reverse('jobs:dashboard') + '?q=python',
+            reverse('jobs:all_jobs'),
+            reverse('jobs:all_jobs') + '?q=python',
+            reverse('jobs:all_applications'),
+            reverse('jobs:saved_jobs'),
+            reverse('jobs:notifications'),
+        ]:
+            with self.subTest(url=url):
+                self.assertNoFullScans(self.seeker_user, url)
+
+    def test_employer_views(self):
+        for url in [
+            reverse('jobs:dashboard'),
+            reverse('jobs:all_jobs'),
+            reverse('jobs:all_applications'),
+            reverse('jobs:view_applications', args=[self.jobs[0].id]),
+            reverse('jobs:matching_candidates', args=[self.jobs[0].id]) + '?job_type=remote',
+        ]:
+            with self.subTest(url=url):
+                self.assertNoFullScans(self.employer_user, url)
+
+
+class JobSearchTests(JobBoardTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = cls.create_employer()
+
+    def search(self, query):
+        return list(search_jobs(JobPosting.objects.all(), query).values_list('pk', flat=True))
+
+    def test_results_are_ranked_by_bm25(self):
+        passing = self.create_job('Backend developer', qualifications='Degree, some Django exposure is a plus for this role')
+        focused = self.create_job('Django developer', 'Django, Python')
+        self.create_job('Frontend developer', 'React')
+
+        self.assertEqual(self.search('django'), [focused.pk, passing.pk])
+
+    def test_words_match_as_prefixes_across_columns(self):
+        job = self.create_job('Data engineer', 'PostgreSQL')
+
+        self.assertEqual(self.search('engin postgres lagos'), [job.pk])
+        self.assertEqual(self.search('acme'), [job.pk])
+        self.assertEqual(self.search('engineer rust'), [])
+
+    def test_fts_syntax_in_queries_is_plain_text(self):
+        job = self.create_job('C developer', 'C')
+
+        self.assertEqual(self.search('developer OR "NEAR(x'), [])
+        self.assertEqual(self.search('developer AND'), [])
+        self.assertEqual(self.search('"developer"'), [job.pk])
+        # Nothing searchable falls back to a plain substring filter
+        self.assertEqual(self.search('++'), [])
+
+    def test_index_follows_job_and_company_edits(self):
+        job = self.create_job('Backend developer')
+
+        job.title = 'Site reliability engineer'
+        job.save()
+        self.assertEqual(self.search('reliability'), [job.pk])
+        self.assertEqual(self.search('backend'), [])
+
+        self.employer.company_name = 'Globex'
+        self.employer.save()
+        self.assertEqual(self.search('globex'), [job.pk])
+        self.assertEqual(self.search('acme'), [])
+
+        job.delete()
+        self.assertEqual(self.search('reliability'), [])
+
+    def test_saved_job_search_keeps_relevance_order_unless_sorted(self):
+        seeker = self.create_seeker()
+        self.client.force_login(seeker.user)
+        loose = self.create_job('Engineer, platform engineer')
+        long_title = self.create_job('Lead engineer for data, platform and Python tooling')
+        now = timezone.now()
+        SavedJob.objects.create(job=loose, job_saver=seeker)
+        SavedJob.objects.create(job=long_title, job_saver=seeker)
+        SavedJob.objects.filter(job=long_title).update(timestamp=now + timedelta(minutes=1))
+
+        def saved(**params):
+            response = self.client.get(reverse('jobs:saved_jobs'), params)
+            return [saved_job.job_id for saved_job in response.context['saved_jobs']]
+
+        self.assertEqual(saved(search='engineer'), [loose.pk, long_title.pk])
+        self.assertEqual(saved(search='engineer', sort='-timestamp'), [long_title.pk, loose.pk])
+        self.assertEqual(saved()[0], long_title.pk)
+
+
+class CursorPaginatorTests(JobBoardTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = cls.create_employer()
+        cls.jobs = [cls.create_job(f'Developer {i}') for i in range(25)]
+        # Ties on the ordering field are broken by the primary key
+        JobPosting.objects.filter(pk__in=[job.pk for job in cls.jobs[5:15]]).update(posted_date=timezone.now())
+        cls.expected = list(JobPosting.objects.order_by('-posted_date', '-pk').values_list('pk', flat=True))
+
+    def paginator(self, **kwargs):
+        return CursorPaginator(JobPosting.objects.order_by('-posted_date'), 10, **kwargs)
+
+    def ids(self, page):
+        return [job.pk for job in page]
+
+    def test_walks_forward_and_back(self):
+        paginator = self.paginator()
+        first = paginator.get_page()
+        second = paginator.get_page(first.next_page_number())
+        third = paginator.get_page(second.next_page_number())
+
+        self.assertEqual(self.ids(first) + self.ids(second) + self.ids(third), self.expected)
+        self.assertEqual((first.number, second.number, third.number), (1, 2, 3))
+        self.assertEqual((first.has_previous(), first.has_next()), (False, True))
+        self.assertEqual((third.has_previous(), third.has_next()), (True, False))
+
+        back = paginator.get_page(third.previous_page_number())
+        self.assertEqual((self.ids(back), back.number), (self.ids(second), 2))
+        self.assertTrue(back.has_next())
+        # Page 2 links back to the first page without a token
+        self.assertEqual(back.previous_page_number(), '')
+
+    def test_malformed_tokens_give_the_first_page(self):
+        paginator = self.paginator()
+        first = self.ids(paginator.get_page())
+        for token in ['garbage', '!!!', encode_cursor([1, 2, 3], 4), 'eyJ2IjoxfQ']:
+            with self.subTest(token=token):
+                page = paginator.get_page(token)
+                self.assertEqual((self.ids(page), page.number), (first, 1))
+
+    def test_count_is_optional(self):
+        with self.assertNumQueries(1):
+            paginator = self.paginator(count=False)
+            paginator.get_page()
+            self.assertIsNone(paginator.count)
+            self.assertIsNone(paginator.num_pages)
+
+        paginator = self.paginator()
+        with self.assertNumQueries(1):
+            self.assertEqual((paginator.count, paginator.num_pages), (25, 3))
+
+    def test_rejects_expression_orderings(self):
+        with self.assertRaises(ValueError):
+            CursorPaginator(JobPosting.objects.order_by(F('salary').desc()), 10)
+
+    def test_list_views_count_the_total_once(self):
+        self.client.force_login(self.create_seeker().user)
+        for url in [reverse('jobs:all_jobs'), reverse('jobs:all_applications'), reverse('jobs:saved_jobs')]:
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as queries:
+                    self.client.get(url)
+                counts = [
+                    query['sql'] for query in queries.captured_queries
+                    if query['sql'].startswith('SELECT COUNT(') and 'jobs_notification' not in query['sql']
+                ]
+                self.assertEqual(len(counts), 1)
+
+        self.assertContains(self.client.get(reverse('jobs:all_jobs')), 'Found 25 matching jobs')
+
+
+class UnreadCountTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('seeker', 'seeker@example.com', 'password')
+        self.client.force_login(self.user)
+
+    def test_count_is_cached_until_a_notification_changes(self):
+        create_notification(self.user, 'First')
+        create_notification(self.user, 'Second')
+
+        with self.assertNumQueries(1):
+            self.assertEqual(get_unread_notification_count(self.user.pk), 2)
+            self.assertEqual(get_unread_notification_count(self.user.pk), 2)
+
+        notification = Notification.objects.filter(recipient=self.user).first()
+        response = self.client.post(reverse('jobs:mark_notification_as_read', args=[notification.pk]))
+        self.assertEqual(response.json()['unread_count'], 1)
+
+        notification.delete()
+        self.assertEqual(get_unread_notification_count(self.user.pk), 1)
+
+    def test_mark_all_and_bulk_notifications_refresh_the_count(self):
+        notify_users([self.user.pk], 'Job removed')
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_notification_count(self.user.pk), 1)
+
+        self.assertEqual(self.client.post(reverse('jobs:mark_all_as_read')).json()['unread_count'], 0)
+        self.assertEqual(get_unread_notification_count(self.user.pk), 0)
+
+    def test_header_lists_a_slice_of_the_latest(self):
+        for i in range(NOTIFICATION_PREVIEW_SIZE + 2):
+            create_notification(self.user, f'Message {i}')
+
+        response = self.client.get(reverse('jobs:home'))
+        self.assertEqual(response.context['unread_count'], NOTIFICATION_PREVIEW_SIZE + 2)
+        self.assertEqual(
+            [n.message for n in response.context['notifications']],
+            [f'Message {i}' for i in reversed(range(2, NOTIFICATION_PREVIEW_SIZE + 2))],
+        )
+
+
+class OutboundEmailTests(TestCase):
+
+    def test_enqueue_does_not_send(self):
+        email = enqueue_mail('Subject', 'Body', ['seeker@example.com'])
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(email.status, MailStatus.queued)
+        self.assertEqual(email.to, ['seeker@example.com'])
+
+    def test_worker_sends_and_records_delivery(self):
+        enqueue_mail('First', 'Body', ['a@example.com'])
+        enqueue_mail('Second', 'Body', ['b@example.com'])
+
+        self.assertEqual(send_queued_mail(), (2, 0))
+        self.assertEqual([m.subject for m in mail.outbox], ['First', 'Second'])
+        self.assertFalse(OutboundEmail.objects.exclude(status=MailStatus.sent).exists())
+        self.assertFalse(OutboundEmail.objects.filter(sent_at__isnull=True).exists())
+        self.assertEqual(send_queued_mail(), (0, 0))
+
+    def test_sent_bodies_are_cleared(self):
+        email = enqueue_mail('Your code', 'OTP 123456', ['a@example.com'])
+
+        send_queued_mail()
+        email.refresh_from_db()
+        self.assertEqual(mail.outbox[0].body, 'OTP 123456')
+        self.assertEqual(email.body, '')
+
+    def test_rows_claimed_by_another_worker_are_skipped_until_the_claim_lapses(self):
+        email = enqueue_mail('Subject', 'Body', ['a@example.com'])
+        self.assertEqual([claimed.pk for claimed in claim_batch(OutboundEmail, 10)], [email.pk])
+
+        self.assertEqual(claim_batch(OutboundEmail, 10), [])
+        self.assertEqual(send_queued_mail(), (0, 0))
+
+        OutboundEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(send_queued_mail(), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(EMAIL_BACKEND='jobs.tests.CountingEmailBackend')
+    def test_one_connection_per_batch(self):
+        for i in range(5):
+            enqueue_mail(f'Mail {i}', 'Body', ['a@example.com'])
+
+        CountingEmailBackend.opened = 0
+        send_queued_mail(batch_size=5)
+        self.assertEqual(CountingEmailBackend.opened, 1)
+        self.assertEqual(len(mail.outbox), 5)
+
+    @override_settings(EMAIL_BACKEND='jobs.tests.FailingEmailBackend')
+    def test_failed_send_backs_off_then_gives_up(self):
+        email = enqueue_mail('Subject', 'Body', ['a@example.com'])
+
+        self.assertEqual(send_queued_mail(), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.status, MailStatus.queued)
+        self.assertEqual(email.attempts, 1)
+        self.assertIn('SMTP unavailable', email.last_error)
+        self.assertGreater(email.next_attempt_at, timezone.now())
+
+        # Not due yet
+        self.assertEqual(send_queued_mail(), (0, 0))
+
+        for attempt in range(2, MAX_ATTEMPTS + 1):
+            OutboundEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+            send_queued_mail()
+            email.refresh_from_db()
+            self.assertEqual(email.attempts, attempt)
+
+        self.assertEqual(email.status, MailStatus.failed)
+
+    def test_backoff_grows_exponentially(self):
+        email = enqueue_mail('Subject', 'Body', ['a@example.com'])
+        email.attempts = 2
+        email.save()
+
+        with override_settings(EMAIL_BACKEND='jobs.tests.FailingEmailBackend'):
+            before = timezone.now()
+            send_queued_mail()
+
+        email.refresh_from_db()
+        self.assertGreaterEqual(email.next_attempt_at - before, timedelta(minutes=4))
+
+    def test_command_drains_outbox(self):
+        for i in range(3):
+            enqueue_mail(f'Mail {i}', 'Body', ['a@example.com'])
+
+        call_command('send_queued_mail', batch_size=2, stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_contact_form_queues_mail(self):
+        response = self.client.post(reverse('jobs:contact_us'), {
+            'name': 'Ada', 'email': 'ada@example.com', 'subject': 'Hi', 'message': 'Hello',
+        })
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertTrue(OutboundEmail.objects.filter(subject='Contact Form: Hi').exists())
+
+
+def fail_task(message):
+    raise ValueError(message)
+
+
+class DeferredTaskTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('seeker', 'seeker@example.com', 'password')
+
+    def test_defer_queues_until_the_worker_runs(self):
+        defer(notify_users, [self.user.pk], 'Job removed')
+
+        self.assertFalse(Notification.objects.exists())
+        task = DeferredTask.objects.get()
+        self.assertEqual(task.func, 'jobs.utils.notify_users')
+
+        self.assertEqual(run_deferred_tasks(), (1, 0))
+        self.assertEqual(list(Notification.objects.values_list('recipient', 'message')), [(self.user.pk, 'Job removed')])
+        self.assertFalse(DeferredTask.objects.exists())
+
+    def test_rolled_back_transactions_queue_nothing(self):
+        with self.assertRaises(ValueError), transaction.atomic():
+            defer(notify_users, [self.user.pk], 'Job removed')
+            raise ValueError
+        self.assertFalse(DeferredTask.objects.exists())
+
+    def test_rows_claimed_by_another_worker_are_skipped_until_the_claim_lapses(self):
+        task = defer(notify_users, [self.user.pk], 'Job removed')
+        self.assertEqual([claimed.pk for claimed in claim_batch(DeferredTask, 10)], [task.pk])
+
+        self.assertEqual(claim_batch(DeferredTask, 10), [])
+        self.assertEqual(run_deferred_tasks(), (0, 0))
+
+        DeferredTask.objects.filter(pk=task.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(run_deferred_tasks(), (1, 0))
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_failed_task_backs_off_then_gives_up(self):
+        self.enterContext(self.assertLogs('jobs.tasks', 'ERROR'))
+        task = defer(fail_task, 'boom')
+
+        self.assertEqual(run_deferred_tasks(), (0, 1))
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts, task.last_error), (TaskStatus.queued, 1, 'boom'))
+        self.assertEqual(run_deferred_tasks(), (0, 0))
+
+        for _ in range(2, TASK_MAX_ATTEMPTS + 1):
+            DeferredTask.objects.filter(pk=task.pk).update(next_attempt_at=timezone.now())
+            run_deferred_tasks()
+        task.refresh_from_db()
+        self.assertEqual(task.status, TaskStatus.failed)
+
+    def test_command_drains_queue(self):
+        for i in range(3):
+            defer(notify_users, [self.user.pk], f'Message {i}')
+
+        with mock.patch('jobs.management.commands.run_deferred_tasks.process_local_backends', return_value=[]):
+            call_command('run_deferred_tasks', batch_size=2, stdout=StringIO())
+        self.assertEqual(Notification.objects.count(), 3)
+
+    def test_command_refuses_process_local_backends(self):
+        defer(notify_users, [self.user.pk], 'Message')
+
+        # The test settings run without REDIS_URL
+        with self.assertRaisesMessage(CommandError, 'The cache and channel layer only reach this process'):
+            call_command('run_deferred_tasks', stdout=StringIO())
+        self.assertFalse(Notification.objects.exists())
+
+
+class NotifyApplicantsTests(JobBoardTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = cls.create_employer()
+        cls.job = cls.create_job()
+        cls.applications = [
+            JobApplication.objects.create(job=cls.job, applicant=cls.create_seeker(f'seeker{i}'), cover_letter='Hi')
+            for i in range(5)
+        ]
+
+    def test_notifications_are_written_in_batches(self):
+        with CaptureQueriesContext(connection) as queries:
+            created = notify_job_applicants(self.job.pk, 'Job updated', url_name='jobs:update_application', batch_size=2)
+
+        self.assertEqual(created, 5)
+        inserts = [q for q in queries.captured_queries if q['sql'].startswith('INSERT INTO "jobs_notification"')]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(
+            set(Notification.objects.values_list('recipient', 'url')),
+            {
+                (application.applicant.user_id, reverse('jobs:update_application', args=[application.pk]))
+                for application in self.applications
+            },
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_notification_count(self.applications[0].applicant.user_id), 1)
+
+    def test_job_update_defers_the_fan_out(self):
+        self.client.force_login(self.employer.user)
+        response = self.client.post(reverse('jobs:update_job_details', args=[self.job.pk]), {
+            'title': 'Senior Developer', 'job_type': 'FT', 'location': 'Lagos', 'salary': 100,
+            'experience_required': 1, 'qualifications': 'Degree',
+            'deadline': timezone.now().date() + timedelta(days=5), 'job_category': 'Engineering',
+            'job_status': 'open', 'skills_required': 'Python',
+        })
+
+        self.assertRedirects(response, reverse('jobs:dashboard'), fetch_redirect_response=False)
+        self.assertFalse(Notification.objects.exclude(recipient=self.employer.user).exists())
+
+        self.assertEqual(run_deferred_tasks(), (1, 0))
+        self.assertEqual(Notification.objects.exclude(recipient=self.employer.user).count(), 5)
+
+
+class ProfileMiddlewareTests(JobBoardTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = cls.create_employer()
+        cls.user = cls.employer.user
+
+    def test_profile_is_attached_to_request(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('jobs:notifications'))
+
+        self.assertEqual(response.wsgi_request.profile, self.employer)
+        self.assertEqual(response.wsgi_request.profile_type, 'employer')
+
+    def test_sessions_from_the_model_backend_stay_logged_in(self):
+        self.client.force_login(self.user, backend='django.contrib.auth.backends.ModelBackend')
+        response = self.client.get(reverse('jobs:notifications'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.wsgi_request.profile, self.employer)
+
+    def test_anonymous_request_has_no_profile(self):
+        response = self.client.get(reverse('jobs:home'))
+
+        self.assertIsNone(response.wsgi_request.profile)
+        self.assertIsNone(response.wsgi_request.profile_type)
+
+    def test_profile_resolves_in_one_query_and_is_cached_on_user(self):
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(1):
+            profile, profile_type = get_user_profile(user)
+            self.assertEqual(user.employerprofile, profile)
+            self.assertFalse(hasattr(user, 'seekerprofile'))
+        self.assertEqual(profile_type, 'employer')
+
+    def test_session_user_is_loaded_with_profile(self):
+        self.client.force_login(self.user)
+        request = self.client.get(reverse('jobs:home')).wsgi_request
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_user_profile(request.user), (self.employer, 'employer'))
+
+
+class EmployerStatsTests(JobBoardTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = cls.create_employer()
+        today = timezone.now().date()
+        cls.jobs = [
+            cls.create_job(f'Developer {i}', deadline=deadline, job_status=status)
+            for i, (deadline, status) in enumerate([
+                (today + timedelta(days=5), 'open'),
+                (today + timedelta(days=5), 'open'),
+                (today - timedelta(days=1), 'closed'),
+            ])
+        ]
+        cls.seekers = [cls.create_seeker(f'seeker{i}') for i in range(3)]
+        for seeker, status in zip(cls.seekers, ['pending', 'pending', 'rejected']):
+            JobApplication.objects.create(job=cls.jobs[0], applicant=seeker, cover_letter='Hi', status=status)
+
+    def test_employer_stats_use_one_query_and_are_cached(self):
+        with self.assertNumQueries(1):
+            stats = get_employer_stats(self.employer)
+        self.assertEqual(stats, {
+            'total_jobs_posted': 3, 'active_jobs': 2, 'closed_jobs': 1,
+            'total_applications': 3, 'pending_applications': 2,
+        })
+        with self.assertNumQueries(0):
+            get_employer_stats(self.employer)
+
+    def test_job_stats_count_every_status_in_one_query(self):
+        with self.assertNumQueries(1):
+            stats = get_job_application_stats(self.jobs[0])
+        self.assertEqual(stats['total_applications'], 3)
+        self.assertEqual(stats['pending_count'], 2)
+        self.assertEqual(stats['rejected_count'], 1)
+        self.assertEqual(stats['hired_count'], 0)
+
+    def test_stats_are_invalidated_by_application_changes(self):
+        get_employer_stats(self.employer)
+        get_job_application_stats(self.jobs[0])
+
+        application = JobApplication.objects.filter(status='pending').first()
+        application.status = 'accepted'
+        application.save()
+
+        self.assertEqual(get_employer_stats(self.employer)['pending_applications'], 1)
+        self.assertEqual(get_job_application_stats(self.jobs[0])['pending_count'], 1)
+
+        application.delete()
+        self.assertEqual(get_employer_stats(self.employer)['total_applications'], 2)
+
+    def test_bulk_delete_evicts_stats_without_loading_jobs(self):
+        get_employer_stats(self.employer)
+        get_job_application_stats(self.jobs[0])
+
+        with CaptureQueriesContext(connection) as queries:
+            JobApplication.objects.filter(job=self.jobs[0]).delete()
+        job_loads = [q for q in queries.captured_queries if q['sql'].startswith('SELECT "jobs_jobposting"."id"')]
+        self.assertFalse(job_loads)
+
+        self.assertEqual(get_employer_stats(self.employer)['total_applications'], 0)
+        self.assertEqual(get_job_application_stats(self.jobs[0])['total_applications'], 0)
+
+    def test_stats_are_invalidated_by_job_changes(self):
+        get_employer_stats(self.employer)
+
+        self.jobs[1].job_status = 'closed'
+        self.jobs[1].save()
+
+        self.assertEqual(get_employer_stats(self.employer)['active_jobs'], 1)
+
+
+class ApplicationCounterTests(JobBoardTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = cls.create_employer()
+        cls.job = cls.create_job()
+        cls.seekers = [cls.create_seeker(f'seeker{i}') for i in range(2)]
+
+    def assertCounts(self, total, pending, accepted, rejected):
+        self.job.refresh_from_db()
+        self.assertEqual(
+            (self.job.application_count, self.job.pending_count, self.job.accepted_count, self.job.rejected_count),
+            (total, pending, accepted, rejected),
+        )
+
+    def test_counters_follow_application_lifecycle(self):
+        first = JobApplication.objects.create(job=self.job, applicant=self.seekers[0], cover_letter='Hi')
+        JobApplication.objects.create(job=self.job, applicant=self.seekers[1], cover_letter='Hi')
+        self.assertCounts(2, 2, 0, 0)
+
+        application = JobApplication.objects.get(pk=first.pk)
+        application.status = 'accepted'
+        application.save()
+        application.save()
+        self.assertCounts(2, 1, 1, 0)
+
+        JobApplication.objects.filter(status='pending').delete()
+        self.assertCounts(1, 0, 1, 0)
+
+    def test_bulk_delete_updates_counters_once_per_status(self):
+        JobApplication.objects.create(job=self.job, applicant=self.seekers[0], cover_letter='Hi')
+        JobApplication.objects.create(job=self.job, applicant=self.seekers[1], cover_letter='Hi', status='accepted')
+
+        with CaptureQueriesContext(connection) as queries:
+            JobApplication.objects.all().delete()
+        updates = [q for q in queries.captured_queries if q['sql'].startswith('UPDATE "jobs_jobposting"')]
+        self.assertEqual(len(updates), 2)
+        self.assertCounts(0, 0, 0, 0)
+
+    def test_seeker_delete_decrements_counters(self):
+        JobApplication.objects.create(job=self.job, applicant=self.seekers[0], cover_letter='Hi')
+        JobApplication.objects.create(job=self.job, applicant=self.seekers[1], cover_letter='Hi')
+
+        self.seekers[0].delete()
+        self.assertCounts(1, 1, 0, 0)
+
+    def test_job_delete_skips_counter_updates(self):
+        for seeker in self.seekers:
+            JobApplication.objects.create(job=self.job, applicant=seeker, cover_letter='Hi')
+
+        with CaptureQueriesContext(connection) as queries:
+            JobPosting.objects.get(pk=self.job.pk).delete()
+        self.assertFalse([q for q in queries.captured_queries if q['sql'].startswith('UPDATE "jobs_jobposting"')])
+        self.assertFalse(JobApplication.objects.exists())
+
+    def test_saving_a_stale_job_keeps_counters(self):
+        stale = JobPosting.objects.get(pk=self.job.pk)
+        JobApplication.objects.create(job=self.job, applicant=self.seekers[0], cover_letter='Hi')
+
+        stale.title = 'Senior Developer'
+        stale.save()
+        self.assertCounts(1, 1, 0, 0)
+
+    def test_rebuild_command_recounts(self):
+        JobApplication.objects.create(job=self.job, applicant=self.seekers[0], cover_letter='Hi', status='rejected')
+        JobPosting.objects.update(application_count=0, rejected_count=0)
+
+        call_command('rebuild_application_counts', stdout=StringIO())
+        self.assertCounts(1, 0, 0, 1)
+
+
+class AppliedJobFilterTests(JobBoardTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = cls.create_employer()
+        cls.jobs = [cls.create_job(f'Developer {i}') for i in range(3)]
+        cls.seeker = cls.create_seeker()
+
+    def test_applied_jobs_are_excluded_and_cache_follows_applications(self):
+        self.assertEqual(exclude_applied(JobPosting.objects.all(), self.seeker).count(), 3)
+
+        application = JobApplication.objects.create(job=self.jobs[0], applicant=self.seeker, cover_letter='Hi')
+        self.assertEqual(get_applied_job_ids(self.seeker.pk), {self.jobs[0].pk})
+        self.assertNotIn(self.jobs[0], exclude_applied(JobPosting.objects.all(), self.seeker))
+
+        application.delete()
+        with self.assertNumQueries(1):
+            self.assertEqual(get_applied_job_ids(self.seeker.pk), frozenset())
+            get_applied_job_ids(self.seeker.pk)
+
+    @mock.patch('jobs.applied.APPLIED_IDS_INLINE_LIMIT', 1)
+    def test_heavy_seekers_use_not_exists(self):
+        JobApplication.objects.create(job=self.jobs[0], applicant=self.seeker, cover_letter='Hi')
+        JobApplication.objects.create(job=self.jobs[1], applicant=self.seeker, cover_letter='Hi')
+
+        queryset = exclude_applied(JobPosting.objects.all(), self.seeker)
+        self.assertIn('NOT EXISTS', str(queryset.query))
+        self.assertEqual(list(queryset), [self.jobs[2]])
+
+
+class SavedJobCacheTests(JobBoardTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = cls.create_employer()
+        cls.jobs = [cls.create_job(f'Developer {i}') for i in range(3)]
+        cls.seeker = cls.create_seeker(skills='')
+        cls.seeker_user = cls.seeker.user
+        SavedJob.objects.create(job=cls.jobs[0], job_saver=cls.seeker)
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.seeker_user)
+
+    def test_save_and_unsave_update_cached_ids(self):
+        self.assertEqual(get_saved_job_ids(self.seeker.pk), {self.jobs[0].pk})
+
+        self.client.post(reverse('jobs:save_job', args=[self.jobs[1].pk]), headers={'x-requested-with': 'XMLHttpRequest'})
+        self.client.post(reverse('jobs:unsave_job', args=[self.jobs[0].pk]), headers={'x-requested-with': 'XMLHttpRequest'})
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_saved_job_ids(self.seeker.pk), {self.jobs[1].pk})
+
+    def test_job_cards_render_save_state_without_saved_job_queries(self):
+        get_saved_job_ids(self.seeker.pk)
+        queries = []
+
+        def collect(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(collect):
+            response = self.client.get(reverse('jobs:all_jobs'))
+
+        self.assertContains(response, reverse('jobs:unsave_job', args=[self.jobs[0].pk]))
+        self.assertContains(response, reverse('jobs:save_job', args=[self.jobs[1].pk]))
+        self.assertFalse([sql for sql in queries if 'jobs_savedjob' in sql])
+
+    def test_toggles_are_idempotent_single_statements(self):
+        ajax = {'x-requested-with': 'XMLHttpRequest'}
+        queries = []
+
+        def collect(execute, sql, params, many, context):
+            if 'jobs_savedjob' in sql:
+                queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(collect):
+            for _ in range(2):
+                response = self.client.post(reverse('jobs:save_job', args=[self.jobs[1].pk]), headers=ajax)
+                self.assertEqual(response.json()['saved'], True)
+            self.assertEqual(SavedJob.objects.filter(job=self.jobs[1], job_saver=self.seeker).count(), 1)
+            queries.clear()
+
+            for _ in range(2):
+                response = self.client.post(reverse('jobs:unsave_job', args=[self.jobs[1].pk]), headers=ajax)
+                self.assertEqual(response.json()['saved'], False)
+
+        self.assertEqual(len(queries), 2)
+        self.assertTrue(all(sql.startswith('DELETE') for sql in queries))
+        self.assertFalse(SavedJob.objects.filter(job=self.jobs[1]).exists())
+
+    def test_toggles_require_post(self):
+        response = self.client.get(reverse('jobs:save_job', args=[self.jobs[1].pk]))
+        self.assertEqual(response.status_code, 405)
+
+
+class ApplyForJobTests(JobBoardTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = cls.create_employer()
+        cls.employer_user = cls.employer.user
+        cls.job = cls.create_job()
+        cls.seeker = cls.create_seeker(full_name='Ada Seeker')
+        cls.seeker_user = cls.seeker.user
+
+    def setUp(self):
+        super().setUp()
+        self.enterContext(override_settings(MEDIA_ROOT=self.enterContext(tempfile.TemporaryDirectory())))
+        self.client.force_login(self.seeker_user)
+
+    def apply(self, token):
+        return self.client.post(reverse('jobs:apply_for_job', args=[self.job.pk]), {
+            'cover_letter': 'Hi',
+            'resume': SimpleUploadedFile('cv.pdf', b'%PDF'),
+            'idempotency_key': token,
+        })
+
+    def test_application_is_scored_at_apply_time(self):
+        self.apply('token-1')
+        self.assertEqual(JobApplication.objects.get(job=self.job, applicant=self.seeker).skill_match, 100)
+
+    def test_double_submit_with_same_token_applies_once(self):
+        first = self.apply('token-1')
+        second = self.apply('token-1')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(run_deferred_tasks(), (1, 0))
+
+        self.assertRedirects(first, reverse('jobs:dashboard'), fetch_redirect_response=False)
+        self.assertRedirects(second, reverse('jobs:dashboard'), fetch_redirect_response=False)
+        self.assertEqual(JobApplication.objects.filter(job=self.job, applicant=self.seeker).count(), 1)
+        self.assertEqual(
+            set(Notification.objects.values_list('recipient', flat=True)),
+            {self.seeker_user.pk, self.employer_user.pk},
+        )
+
+    def test_second_application_hits_the_unique_constraint(self):
+        self.apply('token-1')
+        response = self.apply('token-2')
+
+        self.assertRedirects(response, reverse('jobs:view_job_detail', args=[self.job.pk]), fetch_redirect_response=False)
+        self.assertEqual(JobApplication.objects.filter(job=self.job).count(), 1)
+
+    def test_form_carries_a_fresh_token(self):
+        response = self.client.get(reverse('jobs:apply_for_job', args=[self.job.pk]))
+        token = response.context['form']['idempotency_key'].value()
+        self.assertEqual(len(token), 32)
+
+    def test_closed_job_is_rejected(self):
+        JobPosting.objects.filter(pk=self.job.pk).update(job_status='closed')
+        response = self.apply('token-1')
+
+        self.assertContains(response, 'Job application has closed.')
+        self.assertFalse(JobApplication.objects.exists())
+
+
+class ExpirySweeperTests(JobBoardTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = cls.create_employer()
+        today = timezone.now().date()
+        cls.jobs = [
+            cls.create_job(f'Developer {i}', deadline=today + timedelta(days=days))
+            for i, days in enumerate([-3, -2, -1, 0, 5])
+        ]
+
+    def test_expired_jobs_are_closed_in_batches_with_one_event_each(self):
+        events = []
+
+        def receiver(sender, job_ids, employer_ids, **kwargs):
+            events.append((sorted(job_ids), employer_ids))
+
+        jobs_closed.connect(receiver)
+        self.addCleanup(jobs_closed.disconnect, receiver)
+
+        get_employer_stats(self.employer)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(close_expired_jobs(batch_size=2), 3)
+
+        self.assertEqual([len(job_ids) for job_ids, _ in events], [2, 1])
+        self.assertEqual(sorted(sum((job_ids for job_ids, _ in events), [])), [job.pk for job in self.jobs[:3]])
+        self.assertEqual(
+            list(JobPosting.objects.order_by('deadline').values_list('job_status', flat=True)),
+            ['closed', 'closed', 'closed', 'open', 'open'],
+        )
+        self.assertEqual(get_employer_stats(self.employer)['closed_jobs'], 3)
+
+    def test_listings_follow_the_swept_status(self):
+        seeker = self.create_seeker()
+        self.client.force_login(seeker.user)
+        JobPosting.objects.filter(pk=self.jobs[4].pk).update(job_status='closed')
+        close_expired_jobs()
+
+        response = self.client.get(reverse('jobs:all_jobs'))
+
+        self.assertEqual([job.pk for job in response.context['jobs']], [self.jobs[3].pk])
+        self.jobs[0].refresh_from_db()
+        self.assertFalse(self.jobs[0].is_active())
+
+    def test_command_is_a_no_op_when_nothing_expired(self):
+        close_expired_jobs()
+        out = StringIO()
+        call_command('close_expired_jobs', stdout=out)
+        self.assertEqual(out.getvalue(), '')
+
+
+class SkillTestCase(JobBoardTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = cls.create_employer()
+        cls.seeker = cls.create_seeker(skills='[{"value": "Python"}, {"value": "SQL"}]')
+
+
+class SkillLinkTests(SkillTestCase):
+
+    def test_saves_link_every_spelling_to_one_skill(self):
+        job = self.create_job('Backend', 'Python, Django , python')
+
+        self.assertEqual(sorted(job.skill_tags.names()), ['django', 'python'])
+        self.assertEqual(sorted(self.seeker.skill_tags.names()), ['python', 'sql'])
+        self.assertEqual(Skill.objects.filter(name='python').count(), 1)
+
+        job.skills_required = 'Django, Go'
+        job.save()
+        self.assertEqual(sorted(job.skill_tags.names()), ['django', 'go'])
+
+    def test_recommendations_match_through_the_links(self):
+        backend = self.create_job('Backend', 'Python, Django')
+        self.create_job('Frontend', 'React')
+
+        recommended = recommend_jobs(self.seeker)
+
+        self.assertEqual([job.pk for job in recommended], [backend.pk])
+        self.assertEqual(recommended[0].match_score, 50)
+        self.assertEqual(recommended[0].matched_skills, ['python'])
+        self.assertEqual(recommended[0].missing_skills, ['django'])
+
+    def test_rebuild_command_relinks_from_the_strings(self):
+        job = self.create_job('Backend', 'Python, Django')
+        JobSkill.objects.all().delete()
+        SeekerSkill.objects.all().delete()
+
+        call_command('rebuild_skill_index', stdout=StringIO())
+
+        self.assertEqual(sorted(job.skill_tags.names()), ['django', 'python'])
+        self.assertEqual(sorted(self.seeker.skill_tags.names()), ['python', 'sql'])
+
+
+class SkillAliasTests(SkillTestCase):
+
+    def test_form_stores_canonical_skills(self):
+        SkillAlias.objects.create(alias='JS', skill=Skill.objects.create(name='javascript'))
+
+        form = PostJobForm(data={
+            'title': 'Frontend', 'job_type': 'FT', 'location': 'Lagos', 'salary': 100,
+            'experience_required': 1, 'qualifications': 'Degree',
+            'deadline': timezone.now().date() + timedelta(days=5), 'job_category': 'Engineering',
+            'job_status': 'open', 'skills_required': '[{"value": "JS"}, {"value": "Java Script"}, {"value": "CSS"}]',
+        })
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data['skills_required'], 'javascript, css')
+
+    def test_new_alias_merges_existing_links(self):
+        job = self.create_job('Database', 'Postgres, Python')
+        postgresql = Skill.objects.create(name='postgresql')
+        self.seeker.skills = 'postgresql'
+        self.seeker.save()
+        self.assertEqual(recommend_jobs(SeekerProfile.objects.get(pk=self.seeker.pk)), [])
+
+        SkillAlias.objects.create(alias='postgres', skill=postgresql)
+
+        self.assertFalse(Skill.objects.filter(name='postgres').exists())
+        self.assertEqual(sorted(job.skill_tags.names()), ['postgresql', 'python'])
+        recommended = recommend_jobs(SeekerProfile.objects.get(pk=self.seeker.pk))
+        self.assertEqual([(job.pk, job.match_score) for job in recommended], [(job.pk, 50)])
+
+
+class SkillRelevanceTests(SkillTestCase):
+
+    def open_job_counts(self):
+        return dict(Skill.objects.filter(open_job_count__gt=0).values_list('name', 'open_job_count'))
+
+    def test_open_job_counts_follow_jobs_opening_and_closing(self):
+        first = self.create_job('Backend', 'Python, SQL')
+        second = self.create_job('Data', 'Python')
+        self.assertEqual(self.open_job_counts(), {'python': 2, 'sql': 1})
+
+        first.skills_required = 'Python, Go'
+        first.save()
+        self.assertEqual(self.open_job_counts(), {'python': 2, 'go': 1})
+
+        second.job_status = 'closed'
+        second.save(update_fields=['job_status'])
+        self.assertEqual(self.open_job_counts(), {'python': 1, 'go': 1})
+
+        second = JobPosting.objects.get(pk=second.pk)
+        second.job_status = 'open'
+        second.save()
+        self.assertEqual(self.open_job_counts(), {'python': 2, 'go': 1})
+
+        JobPosting.objects.filter(pk=second.pk).update(deadline=timezone.now().date() - timedelta(days=1))
+        close_expired_jobs()
+        self.assertEqual(self.open_job_counts(), {'python': 1, 'go': 1})
+
+        first.delete()
+        self.assertEqual(self.open_job_counts(), {})
+
+    def test_relevance_scorer_discounts_common_skills(self):
+        self.seeker.skills = 'python, communication'
+        self.seeker.save()
+        seeker = SeekerProfile.objects.get(pk=self.seeker.pk)
+        generic = self.create_job('Support', 'Communication, Excel')
+        specific = self.create_job('Backend', 'Python, Rust')
+        for i in range(3):
+            self.create_job(f'Sales {i}', 'Communication, Sales')
+
+        by_match = recommend_jobs(seeker)
+        self.assertEqual({job.match_score for job in by_match}, {50})
+
+        by_relevance = recommend_jobs(seeker, scorer='relevance')
+        self.assertEqual([by_relevance[0].pk, by_relevance[-1].pk], [specific.pk, generic.pk])
+        self.assertEqual(by_relevance[0].match_score, 50)
+        self.assertLess(by_relevance[-1].match_score, 50)
+
+        self.client.force_login(self.seeker.user)
+        response = self.client.get(reverse('jobs:dashboard'), {'rank': 'relevance'})
+        self.assertEqual(response.context['recommended_jobs'][0].pk, specific.pk)
+
+
+class RecommendJobsTests(SkillTestCase):
+
+    def test_only_open_unapplied_jobs_sharing_a_skill_are_recommended(self):
+        full = self.create_job('Data engineer', 'Python, SQL')
+        half = self.create_job('Backend', 'Python, Django')
+        self.create_job('Frontend', 'React')
+        closed = self.create_job('Analyst', 'SQL', job_status='closed')
+        applied = self.create_job('Platform', 'Python')
+        JobApplication.objects.create(job=applied, applicant=self.seeker, cover_letter='Hi')
+
+        recommended = recommend_jobs(SeekerProfile.objects.get(pk=self.seeker.pk))
+
+        self.assertEqual([(job.pk, job.match_score) for job in recommended], [(full.pk, 100), (half.pk, 50)])
+        self.assertNotIn(closed.pk, [job.pk for job in recommended])
+        self.assertEqual(recommended[0].match_quality, 'excellent')
+        self.assertEqual(recommended[1].total_skills_required, 2)
+
+    def test_candidates_come_from_the_skill_index(self):
+        job = self.create_job('Backend', 'Python')
+        JobSkill.objects.filter(content_object=job).delete()
+        invalidate_skill_matrix()
+
+        # The strings still match but the job has no index rows
+        self.assertEqual(recommend_jobs(self.seeker), [])
+
+    def test_filtered_queryset_and_limit(self):
+        jobs = [self.create_job(f'Backend {i}', 'Python') for i in range(3)]
+        self.create_job('Lagos only', 'Python', location='Abuja')
+
+        recommended = recommend_jobs(self.seeker, jobs=JobPosting.objects.filter(location='Lagos'), limit=2)
+        self.assertEqual(len(recommended), 2)
+        self.assertTrue({job.pk for job in recommended} <= {job.pk for job in jobs})
+
+    def test_seekers_without_skills_get_nothing(self):
+        self.create_job('Backend', 'Python')
+        seeker = self.create_seeker('blank', '')
+
+        self.assertEqual(recommend_jobs(seeker), [])
+
+
+class TopKJobsTests(SkillTestCase):
+
+    def test_ranked_by_score_then_newest_then_id(self):
+        posted = timezone.now()
+        old_full = self.create_job('Old full', 'Python, SQL')
+        half_a = self.create_job('Half A', 'Python, Go')
+        half_b = self.create_job('Half B', 'SQL, Go')
+        new_full = self.create_job('New full', 'SQL')
+        older_half = self.create_job('Older half', 'Python, Rust')
+        JobPosting.objects.filter(pk__in=[half_a.pk, half_b.pk, old_full.pk]).update(posted_date=posted)
+        JobPosting.objects.filter(pk=new_full.pk).update(posted_date=posted + timedelta(days=1))
+        JobPosting.objects.filter(pk=older_half.pk).update(posted_date=posted - timedelta(days=1))
+
+        expected = [(new_full.pk, 100), (old_full.pk, 100), (half_b.pk, 50), (half_a.pk, 50), (older_half.pk, 50)]
+        # Small chunks exercise pruning against the heap across chunks
+        for chunk_size in (1, 2, 2000):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(top_k_jobs(self.seeker, JobPosting.objects.all(), 10, chunk_size=chunk_size), expected)
+                self.assertEqual(top_k_jobs(self.seeker, JobPosting.objects.all(), 3, chunk_size=chunk_size), expected[:3])
+
+    def test_non_positive_k_and_unmatched_jobs(self):
+        self.create_job('Frontend', 'React')
+        self.assertEqual(top_k_jobs(self.seeker, JobPosting.objects.all(), 5), [])
+        self.create_job('Backend', 'Python')
+        self.assertEqual(top_k_jobs(self.seeker, JobPosting.objects.all(), 0), [])
+
+
+class RecommendationCacheTests(SkillTestCase):
+
+    def ranked_ids(self, seeker=None):
+        seeker = SeekerProfile.objects.get(pk=(seeker or self.seeker).pk)
+        return [job_id for job_id, _ in get_ranked_recommendations(seeker)]
+
+    def test_ranking_is_cached(self):
+        job = self.create_job('Backend', 'Python')
+        self.assertEqual(self.ranked_ids(), [job.pk])
+
+        with mock.patch('jobs.recommendations.top_k_jobs') as top_k_jobs:
+            self.assertEqual(self.ranked_ids(), [job.pk])
+        top_k_jobs.assert_not_called()
+
+    def test_job_edits_evict_seekers_sharing_a_skill(self):
+        job = self.create_job('Backend', 'Python')
+        other = self.create_seeker('other', 'react')
+        self.ranked_ids()
+        self.ranked_ids(other)
+
+        job.skills_required = 'Python, React'
+        job.save()
+        self.assertEqual(get_ranked_recommendations(self.seeker), [(job.pk, 50)])
+        self.assertEqual(get_ranked_recommendations(other), [(job.pk, 50)])
+
+        job.job_status = 'closed'
+        job.save(update_fields=['job_status'])
+        self.assertEqual(self.ranked_ids(), [])
+
+    def test_new_and_deleted_jobs_evict(self):
+        self.assertEqual(self.ranked_ids(), [])
+
+        job = self.create_job('Backend', 'Python')
+        self.assertEqual(self.ranked_ids(), [job.pk])
+
+        job.delete()
+        self.assertEqual(self.ranked_ids(), [])
+
+    def test_applying_evicts_the_applicant(self):
+        job = self.create_job('Backend', 'Python')
+        self.assertEqual(self.ranked_ids(), [job.pk])
+
+        JobApplication.objects.create(job=job, applicant=self.seeker, cover_letter='Hi')
+        self.assertEqual(self.ranked_ids(), [])
+
+    def test_seeker_skill_edits_recompute(self):
+        python = self.create_job('Backend', 'Python')
+        go = self.create_job('Infra', 'Go')
+        self.assertEqual(self.ranked_ids(), [python.pk])
+
+        self.seeker.skills = 'Go'
+        self.seeker.save()
+        self.assertEqual(self.ranked_ids(), [go.pk])
+
+
+class SkillMatrixTests(SkillTestCase):
+
+    def matrix_rows(self, matrix):
+        skills = {column: skill for skill, column in matrix.vocabulary.items()}
+        return {
+            job_id: sorted(skills[column] for column in matrix.indices[start:end])
+            for job_id, start, end in zip(matrix.job_ids.tolist(), matrix.indptr[:-1], matrix.indptr[1:])
+        }
+
+    def test_scores_match_the_per_job_loop(self):
+        rng = random.Random(7)
+        vocabulary = [f'skill{i}' for i in range(30)]
+        postings = [(job_id, ', '.join(rng.sample(vocabulary, rng.randint(1, 6)))) for job_id in range(1, 301)]
+        seeker_skills = rng.sample(vocabulary, 6)
+        matrix = SkillMatrix.from_rows(
+            (job_id, skill.strip()) for job_id, skills in postings for skill in skills.split(',')
+        )
+
+        # Unknown ids are skipped and the order of candidates doesn't matter
+        candidate_ids = [job_id for job_id, _ in reversed(postings)] + [1000]
+        scores = matrix.score(seeker_skills, candidate_ids)
+
+        expected = {
+            job_id: (percent, matched, missing)
+            for job_id, percent, matched, missing in legacy_scores(', '.join(seeker_skills), postings)
+        }
+        self.assertEqual(
+            dict(zip(scores.job_ids.tolist(), zip(
+                scores.percent_match.tolist(), scores.matched_counts.tolist(), scores.missing_counts.tolist(),
+            ))),
+            expected,
+        )
+
+    def test_weighted_scores_are_the_weighted_share(self):
+        matrix = SkillMatrix.from_rows([(1, 'common'), (1, 'rare'), (2, 'common'), (2, 'other')])
+        weights = np.zeros(len(matrix.vocabulary) + 1)
+        for skill, weight in {'common': 1, 'rare': 3, 'other': 1}.items():
+            weights[matrix.vocabulary[skill]] = weight
+
+        scores = matrix.score(['rare', 'common'], weights=weights)
+        self.assertEqual(dict(zip(scores.job_ids.tolist(), scores.percent_match.tolist())), {1: 100, 2: 50})
+        scores = matrix.score(['rare'], weights=weights)
+        self.assertEqual(dict(zip(scores.job_ids.tolist(), scores.percent_match.tolist())), {1: 75, 2: 0})
+
+    def test_job_changes_patch_only_their_rows(self):
+        backend = self.create_job('Backend', 'Python, Django')
+        data = self.create_job('Data', 'SQL')
+        self.create_job('Frontend', 'React')
+        get_skill_matrix()
+
+        backend.skills_required = 'Go, Python'
+        backend.save()
+        data.delete()
+        ops = self.create_job('Ops', 'Docker')
+
+        with CaptureQueriesContext(connection) as queries:
+            matrix = get_skill_matrix()
+        index_reads = [q['sql'] for q in queries.captured_queries if 'FROM "jobs_jobskill"' in q['sql']]
+        self.assertEqual(len(index_reads), 1)
+        self.assertIn(' IN (', index_reads[0])
+
+        self.assertEqual(self.matrix_rows(matrix), self.matrix_rows(SkillMatrix.from_index()))
+        self.assertIn(ops.pk, matrix.job_ids)
+        self.assertNotIn(data.pk, matrix.job_ids)
+
+    def test_losing_the_version_key_rebuilds(self):
+        old = self.create_job('Backend', 'Python')
+        get_skill_matrix()
+
+        # Versions counted again from scratch must not be replayed onto the old matrix
+        cache.clear()
+        JobSkill.objects.filter(content_object=old).delete()
+        invalidate_skill_matrix([old.pk])
+        self.create_job('Data', 'SQL')
+
+        self.assertEqual(self.matrix_rows(get_skill_matrix()), self.matrix_rows(SkillMatrix.from_index()))
+
+    def test_full_invalidation_rebuilds(self):
+        job = self.create_job('Backend', 'Python')
+        matrix = get_skill_matrix()
+
+        invalidate_skill_matrix()
+        self.assertIsNot(get_skill_matrix(), matrix)
+        self.assertEqual(self.matrix_rows(get_skill_matrix()), self.matrix_rows(SkillMatrix.from_index()))
+        self.assertIn(job.pk, get_skill_matrix().job_ids)
+
+
+class SharedCacheCheckTests(TestCase):
+
+    def test_locmem_cache_is_flagged_for_deploys(self):
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            self.assertEqual([warning.id for warning in check_shared_cache(None)], ['jobs.W001'])
+
+        redis = {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://localhost:6379/0'}
+        with override_settings(CACHES={'default': redis}):
+            self.assertEqual(check_shared_cache(None), [])
+
+
+class MaterializedRecommendationTests(SkillTestCase):
+
+    def test_partial_rows_are_not_served_before_a_full_refresh(self):
+        backend = self.create_job('Backend', 'Python')
+        data = self.create_job('Data', 'SQL')
+        refresh_job_recommendations([backend.pk])
+
+        self.assertEqual(RecommendedJob.objects.filter(seeker=self.seeker).count(), 1)
+        self.assertEqual(materialized_recommendations(self.seeker), [])
+
+        refresh_seeker_recommendations(self.seeker)
+        self.assertEqual({job.pk for job in materialized_recommendations(self.seeker)}, {backend.pk, data.pk})
+
+    def test_command_drains_the_refresh_queue(self):
+        backend = self.create_job('Backend', 'Python')
+        other = self.create_seeker('other', 'python')
+        self.assertTrue(RecommendationRefresh.objects.exists())
+
+        call_command('refresh_recommendations', stdout=StringIO())
+
+        self.assertFalse(RecommendationRefresh.objects.exists())
+        for seeker in (self.seeker, other):
+            self.assertEqual([job.pk for job in materialized_recommendations(seeker)], [backend.pk])
+
+        # Later jobs are added to seekers already refreshed
+        data = self.create_job('Data', 'SQL')
+        call_command('refresh_recommendations', stdout=StringIO())
+        self.assertEqual([job.pk for job in materialized_recommendations(self.seeker)], [data.pk, backend.pk])
+        self.assertEqual([job.pk for job in materialized_recommendations(other)], [backend.pk])
+
+    def test_only_saves_changing_skills_or_status_queue_a_refresh(self):
+        job = self.create_job('Backend', 'Python')
+        RecommendationRefresh.objects.all().delete()
+
+        job.title = 'Backend engineer'
+        job.save()
+        self.seeker.bio = 'Updated'
+        self.seeker.save()
+        self.assertFalse(RecommendationRefresh.objects.exists())
+
+        job.skills_required = 'Python, Go'
+        job.save()
+        job.job_status = 'closed'
+        job.save(update_fields=['job_status'])
+        self.seeker.skills = 'Go'
+        self.seeker.save()
+        self.assertEqual(
+            sorted(RecommendationRefresh.objects.values_list('job', 'seeker'), key=str),
+            sorted([(job.pk, None), (None, self.seeker.pk)], key=str),
+        )
+
+    def test_rows_queued_again_during_a_drain_are_kept(self):
+        job = self.create_job('Backend', 'Python')
+        calls = []
+
+        def refresh(job_ids):
+            calls.append(job_ids)
+            if len(calls) == 1:
+                queue_refresh(job_ids=job_ids)
+
+        with mock.patch('jobs.management.commands.refresh_recommendations.refresh_job_recommendations', refresh):
+            call_command('refresh_recommendations', stdout=StringIO())
+
+        self.assertEqual(calls, [{job.pk}, {job.pk}])
+        self.assertFalse(RecommendationRefresh.objects.exists())
+
+    def test_command_all_recomputes_every_seeker(self):
+        backend = self.create_job('Backend', 'Python')
+        RecommendationRefresh.objects.all().delete()
+        RecommendedJob.objects.all().delete()
+
+        out = StringIO()
+        call_command('refresh_recommendations', all=True, stdout=out)
+        self.assertIn('Recomputed recommendations for all seekers', out.getvalue())
+        self.assertEqual([job.pk for job in materialized_recommendations(self.seeker)], [backend.pk])
+
+    @mock.patch('jobs.recommendations.RECOMMENDATIONS_CACHE_SIZE', 2)
+    def test_job_refresh_trims_every_seeker_with_one_delete(self):
+        other = self.create_seeker('other', 'python, sql')
+        jobs = [self.create_job('Backend', 'Python'), self.create_job('Data', 'SQL'), self.create_job('Full stack', 'Python, Go')]
+
+        with CaptureQueriesContext(connection) as queries:
+            refresh_job_recommendations([job.pk for job in jobs])
+        deletes = [q for q in queries.captured_queries if q['sql'].startswith('DELETE FROM "jobs_recommendedjob"')]
+        self.assertEqual(len(deletes), 2)
+
+        for seeker in (self.seeker, other):
+            self.assertEqual(
+                set(RecommendedJob.objects.filter(seeker=seeker).values_list('job_id', flat=True)),
+                {jobs[0].pk, jobs[1].pk},
+            )
+
+
+class MatchingCandidatesTests(SkillTestCase):
+
+    def test_seekers_are_ranked_by_shared_skills(self):
+        job = self.create_job('Backend', 'Python, Django, SQL, Go')
+        best = self.create_seeker('best', 'python, django, go')
+        onsite = self.create_seeker('onsite', 'django', job_type='onsite')
+        self.create_seeker('unrelated', 'react')
+        JobApplication.objects.create(job=job, applicant=self.seeker, cover_letter='Hi')
+
+        self.assertEqual(
+            [(c.seeker_id, c.match_score) for c in unapplied_candidates(job)],
+            [(best.pk, 75), (onsite.pk, 25)],
+        )
+        self.assertEqual([c.seeker_id for c in unapplied_candidates(job, 'onsite')], [onsite.pk])
+        self.assertEqual(rank_candidates(job, k=1), [(best.pk, 75)])
+
+        self.client.force_login(self.employer.user)
+        response = self.client.get(reverse('jobs:matching_candidates', args=[job.pk]), {'job_type': 'remote'})
+        self.assertEqual([seeker.pk for seeker in response.context['candidates']], [best.pk])
+        self.assertEqual(response.context['candidates'][0].match_score, 75)
+
+    def test_cached_ranking_follows_the_job_skills_and_applicants(self):
+        job = self.create_job('Backend', 'Python')
+        self.assertEqual([c.seeker_id for c in unapplied_candidates(job)], [self.seeker.pk])
+        self.assertEqual([c.seeker_id for c in unapplied_candidates(job, 'remote')], [self.seeker.pk])
+
+        application = JobApplication.objects.create(job=job, applicant=self.seeker, cover_letter='Hi')
+        self.assertEqual(unapplied_candidates(job), [])
+        self.assertEqual(unapplied_candidates(job, 'remote'), [])
+
+        application.delete()
+        self.assertEqual([c.seeker_id for c in unapplied_candidates(job, 'remote')], [self.seeker.pk])
+
+        job.skills_required = 'Rust'
+        job.save()
+        self.assertEqual(unapplied_candidates(job), [])
+        self.assertEqual(unapplied_candidates(job, 'remote'), [])
+
+    def test_applied_exclusion_and_job_type_run_in_the_ranking_query(self):
+        job = self.create_job('Backend', 'Python')
+        with self.assertNumQueries(2):
+            unapplied_candidates(job, 'remote')
+        with self.assertNumQueries(0):
+            unapplied_candidates(job, 'remote')
+
+    def test_list_paginator_pages_by_key(self):
+        items = list(range(0, 50, 2))
+        paginator = ListPaginator(items, 10, key=lambda item: (item,))
+
+        first = paginator.get_page()
+        second = paginator.get_page(first.next_page_number())
+        self.assertEqual(list(second), list(range(20, 40, 2)))
+        self.assertEqual(list(paginator.get_page(second.previous_page_number())), list(first))
+
+        # New items ahead of the cursor don't shift the next page
+        items = sorted(items + [1, 3])
+        self.assertEqual(list(ListPaginator(items, 10, key=lambda item: (item,)).get_page(first.next_page_number())), list(second))
+
+
+class ApplicantRankingTests(SkillTestCase):
+
+    def test_applicants_are_ranked_and_filtered_by_skill_match(self):
+        job = self.create_job('Backend', 'Python, Django, SQL, Go')
+        partial = self.create_seeker('partial', 'django')
+        strong = self.create_seeker('strong', 'python, django, sql')
+        for seeker in (partial, strong, self.seeker):
+            JobApplication.objects.create(job=job, applicant=seeker, cover_letter='Hi')
+        score_applications(job.applications.all())
+
+        self.client.force_login(self.employer.user)
+        url = reverse('jobs:view_applications', args=[job.pk])
+        response = self.client.get(url)
+        self.assertEqual(
+            [(app.applicant_id, app.skill_match) for app in response.context['applications']],
+            [(strong.pk, 75), (self.seeker.pk, 50), (partial.pk, 25)],
+        )
+        response = self.client.get(url, {'min_match': 70})
+        self.assertEqual([app.applicant_id for app in response.context['applications']], [strong.pk])
+
+    def test_scores_follow_skill_changes(self):
+        job = self.create_job('Backend', 'Python, Django')
+        application = JobApplication.objects.create(job=job, applicant=self.seeker, cover_letter='Hi')
+        score_applications(JobApplication.objects.filter(pk=application.pk))
+        application.refresh_from_db()
+        self.assertEqual(application.skill_match, 50)
+
+        job.skills_required = 'Python'
+        job.save()
+        application.refresh_from_db()
+        self.assertEqual(application.skill_match, 100)
+
+        self.seeker.skills = 'SQL'
+        self.seeker.save()
+        application.refresh_from_db()
+        self.assertEqual(application.skill_match, 0)
+
+        # Saving the application doesn't write back the score it was read with
+        application.skill_match = 100
+        application.status = 'accepted'
+        application.save()
+        application.refresh_from_db()
+        self.assertEqual(application.skill_match, 0)
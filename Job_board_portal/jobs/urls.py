@@ -20,6 +20,7 @@ urlpatterns = [
     path('update-job/<int:job_id>/', views.update_job_details, name='update_job_details'),
     path('delete-job/<int:job_id>/', views.delete_job, name='delete_job'),
     path('view-applications/<int:job_id>/', views.view_applications, name='view_applications'),
+    path('matching-candidates/<int:job_id>/', views.matching_candidates, name='matching_candidates'),
     
     # Seekers url
     path('apply-for-job/<int:job_id>/', views.apply_for_job, name='apply_for_job'),
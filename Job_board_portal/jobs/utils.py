@@ -1,22 +1,214 @@
-from users.models import EmployerProfile, SeekerProfile
-from .models import Notification
+import json
+import logging
+from itertools import islice
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.urls import reverse
+from users.models import EmployerProfile, SeekerProfile, User
+from .models import JobApplication, Notification
+
+logger = logging.getLogger(__name__)
+
+
+PROFILE_RELATIONS = [('seekerprofile', 'seeker'), ('employerprofile', 'employer')]
+
 
 def get_user_profile(user):
-    try:
-        return SeekerProfile.objects.get(user=user), 'seeker'
-    except SeekerProfile.DoesNotExist:
+    """
+    Return (profile, profile_type) for a user, or (None, None).
+
+    Both profile relations are loaded in a single query unless they are
+    already cached on the user (see users.backends.ProfileModelBackend), and
+    are cached on `user` afterwards, so user.seekerprofile and friends stop
+    querying too. Views should read request.profile instead of calling this.
+    """
+    if user is None or not user.is_authenticated:
+        return None, None
+
+    relations = [(getattr(User, name).related, profile_type) for name, profile_type in PROFILE_RELATIONS]
+    if not all(relation.is_cached(user) for relation, _ in relations):
+        loaded = User.objects.select_related(
+            *(name for name, _ in PROFILE_RELATIONS)
+        ).get(pk=user.pk)
+        for relation, _ in relations:
+            relation.set_cached_value(user, relation.get_cached_value(loaded))
+
+    for relation, profile_type in relations:
+        profile = relation.get_cached_value(user)
+        if profile is not None:
+            return profile, profile_type
+    return None, None
+
+
+def parse_skills(skill_data):
+    """
+    Normalise a skills field into a list of unique, lower-cased skill names.
+    Accepts the tagify JSON format ('[{"value": "Python"}]') as well as plain
+    comma separated strings ("Python, Django").
+    """
+    if not skill_data:
+        return []
+
+    if isinstance(skill_data, str):
         try:
-            return EmployerProfile.objects.get(user=user), 'employer'
-        except EmployerProfile.DoesNotExist:
-            return None, None
+            parsed = json.loads(skill_data)
+        except json.JSONDecodeError:
+            parsed = skill_data.split(',')
+        if not isinstance(parsed, list):
+            parsed = skill_data.split(',')
+    else:
+        parsed = skill_data
+
+    skills = []
+    for item in parsed:
+        if isinstance(item, dict):
+            item = item.get('value', '')
+        skill = str(item).strip().lower()
+        if skill and skill not in skills:
+            skills.append(skill)
+    return skills
+
 
 # 
 def create_notification(recipient, message, url=None):
+    # Pushed to the recipient's open pages by the post_save signal
     Notification.objects.create(
         recipient=recipient,
         message=message,
         url=url
     )
+
+
+UNREAD_COUNT_TIMEOUT = 60 * 60
+
+
+def unread_count_cache_key(user_id):
+    return f'jobs:unread-notifications:{user_id}'
+
+
+def get_unread_notification_count(user_id):
+    """The user's unread notification count, cached until a notification changes."""
+    key = unread_count_cache_key(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(recipient_id=user_id, is_read=False).count()
+        cache.set(key, count, UNREAD_COUNT_TIMEOUT)
+    return count
+
+
+def invalidate_unread_notification_count(user_id):
+    cache.delete(unread_count_cache_key(user_id))
+
+
+# --- Real-time push ---
+
+def notification_group_name(user_id):
+    return f'notifications_{user_id}'
+
+
+def _group_send(user_id, event):
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    try:
+        async_to_sync(channel_layer.group_send)(notification_group_name(user_id), event)
+    except Exception:
+        # Pushing is best effort; the page render still shows everything
+        logger.exception('Could not push notification event to user %s', user_id)
+
+
+def publish_notification(notification, unread_count=None):
+    """Push a new notification to the recipient's open pages once the transaction commits."""
+    def send():
+        _group_send(notification.recipient_id, {
+            'type': 'notification.created',
+            'notification': {
+                'id': notification.pk,
+                'message': notification.message,
+                'url': notification.url,
+                'created_at': notification.created_at.isoformat(),
+            },
+            'unread_count': (
+                get_unread_notification_count(notification.recipient_id)
+                if unread_count is None else unread_count
+            ),
+        })
+    transaction.on_commit(send)
+
+
+def publish_unread_count(user_id):
+    def send():
+        _group_send(user_id, {
+            'type': 'notification.unread_count',
+            'unread_count': get_unread_notification_count(user_id),
+        })
+    transaction.on_commit(send)
+
+
+# --- Bulk notifications ---
+
+NOTIFICATION_BATCH_SIZE = 1000
+
+
+def bulk_create_notifications(rows, batch_size=NOTIFICATION_BATCH_SIZE):
+    """
+    Write (recipient_id, message, url) rows with bulk_create, one batch at a
+    time so memory stays flat for large fan-outs. Returns the number created.
+    """
+    rows = iter(rows)
+    created = 0
+    while True:
+        batch = [
+            Notification(recipient_id=recipient_id, message=message, url=url)
+            for recipient_id, message, url in islice(rows, batch_size)
+        ]
+        if not batch:
+            break
+        # bulk_create skips post_save, so refresh the cached counts and push
+        # to open pages here, with one COUNT query for the whole batch
+        Notification.objects.bulk_create(batch)
+        recipient_ids = {n.recipient_id for n in batch}
+        counts = dict.fromkeys(recipient_ids, 0)
+        counts.update(
+            Notification.objects.filter(recipient_id__in=recipient_ids, is_read=False)
+            .values_list('recipient')
+            .annotate(unread=Count('id'))
+        )
+        cache.set_many(
+            {unread_count_cache_key(user_id): count for user_id, count in counts.items()},
+            UNREAD_COUNT_TIMEOUT,
+        )
+        for notification in batch:
+            publish_notification(notification, counts[notification.recipient_id])
+        created += len(batch)
+    return created
+
+
+def notify_users(user_ids, message, url=None, batch_size=NOTIFICATION_BATCH_SIZE):
+    return bulk_create_notifications(
+        ((user_id, message, url) for user_id in user_ids), batch_size
+    )
+
+
+def notify_job_applicants(job_id, message, url_name=None, batch_size=NOTIFICATION_BATCH_SIZE):
+    """
+    Notify everyone who applied to a job, reading the applicants' user ids in
+    one joined query. With `url_name` each notification links to that URL
+    for the recipient's own application.
+    """
+    applications = JobApplication.objects.filter(job_id=job_id).values_list(
+        'id', 'applicant__user_id'
+    ).iterator(chunk_size=batch_size)
+    return bulk_create_notifications(
+        (
+            (user_id, message, reverse(url_name, args=[application_id]) if url_name else None)
+            for application_id, user_id in applications
+        ),
+        batch_size,
+    )
     
 
 def calculate_profile_completion(profile, profile_type):
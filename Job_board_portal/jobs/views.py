@@ -1,27 +1,36 @@
+import uuid
 from datetime import datetime
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
 from django.db import IntegrityError
-from django.template import engines
 
-from django.db.models import Q, Count, Case, When, IntegerField, Value
+from django.db.models import Q
 from django.utils import timezone
 
-from django.template.loader import render_to_string
-from django.core.paginator import Paginator
-from django.contrib.auth.decorators import login_required, permission_required
+from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.mail import send_mail
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.http import Http404, HttpResponseNotFound, HttpResponseForbidden
+from django.http import Http404
 from .models import JobApplication, JobPosting, Notification, JobType, Status, SavedJob, JobStatus, ApplicationReview
 from .forms import PostJobForm, ApplyForJobForm
-from django.utils import timezone
-from users.models import EmployerProfile, SeekerProfile
-from .utils import get_user_profile, create_notification
+from .utils import (
+    create_notification, get_unread_notification_count,
+    invalidate_unread_notification_count, notify_job_applicants, notify_users, publish_unread_count,
+)
+from .pagination import CursorPaginator, ListPaginator
+from .recommendations import recommend_jobs, materialized_recommendations
+from .applications import AlreadyApplied, submit_application
+from .applied import exclude_applied, get_applied_job_ids
+from .candidates import SEEKER_JOB_TYPES, candidate_sort_key, load_candidates, unapplied_candidates
+from .saved import update_saved_job_ids
+from .scoring import DEFAULT_SCORER, SCORERS
+from .search import search_jobs
+from .stats import get_employer_stats, get_job_application_stats
+from .tasks import defer
+from .mail import enqueue_mail
 from django.http import JsonResponse
-from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 
 
 
@@ -53,17 +62,12 @@ def contact_us(request):
         {message}
         """
         
-        try:
-            send_mail(
-                subject=f"Contact Form: {subject}",
-                message=full_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[admin_email],
-                fail_silently=False,
-            )
-            messages.success(request, 'Thank you! Your message has been sent.')
-        except Exception as e:
-            messages.error(request, 'Sorry, there was an error sending your message.')
+        enqueue_mail(
+            subject=f"Contact Form: {subject}",
+            message=full_message,
+            recipient_list=[admin_email],
+        )
+        messages.success(request, 'Thank you! Your message has been sent.')
         
         return redirect('jobs:contact_us')
     
@@ -80,7 +84,7 @@ def support(request):
 @login_required
 def dashboard(request):
     user = request.user
-    profile, profile_type = get_user_profile(user)
+    profile, profile_type = request.profile, request.profile_type
 
     if profile is None:
         messages.error(request, "No profile found. Please complete your profile setup.")
@@ -92,7 +96,6 @@ def dashboard(request):
         # Active jobs (not expired)
         active_jobs = JobPosting.objects.filter(
             employer=profile,
-            deadline__gte=timezone.now().date(),
             job_status='open'
         ).order_by('-posted_date')
         
@@ -101,51 +104,42 @@ def dashboard(request):
         recent_applications = JobApplication.objects.filter(
             job__employer=profile,
             application_date__gte=one_week_ago
-        ).select_related('applicant', 'job').order_by('-application_date')[:5]
+        ).select_related('applicant__user', 'job').order_by('-application_date')[:5]
         
-        # Dashboard statistics
-        total_jobs_posted = JobPosting.objects.filter(employer=profile).count()
-        total_applications = JobApplication.objects.filter(job__employer=profile).count()
-        closed_jobs = JobPosting.objects.filter(
-            employer=profile,
-            deadline__lt=timezone.now().date()
-        ).count()
+        # Dashboard statistics, one aggregate query per table (cached)
+        stats = get_employer_stats(profile)
         
         # Popular jobs (most applications)
         popular_jobs = JobPosting.objects.filter(
             employer=profile
-        ).annotate(
-            application_count=Count('applications')
         ).order_by('-application_count')[:3]
         
         context.update({
             'active_jobs': active_jobs,
+            'active_jobs_count': stats['active_jobs'],
             'recent_applications': recent_applications,
-            'total_jobs_posted': total_jobs_posted,
-            'total_applications': total_applications,
-            'closed_jobs': closed_jobs,
+            'total_jobs_posted': stats['total_jobs_posted'],
+            'total_applications': stats['total_applications'],
+            'closed_jobs': stats['closed_jobs'],
             'popular_jobs': popular_jobs,
         })
 
     elif profile_type == 'seeker':
         # Base queryset - all active jobs not applied to by this seeker
-        jobs = JobPosting.objects.filter(
-            deadline__gte=timezone.now().date(),
+        jobs = exclude_applied(JobPosting.objects.filter(
             job_status='open'
-        ).exclude(applications__applicant=profile)
+        ), profile).order_by('-posted_date')
 
         # --- Search & Filter Functionality ---
         search_query = request.GET.get('q')
         job_type = request.GET.get('job_type')
         location = request.GET.get('location')
+        rank = request.GET.get('rank')
+        if rank not in SCORERS:
+            rank = DEFAULT_SCORER
         
         if search_query:
-            jobs = jobs.filter(
-                Q(title__icontains=search_query) |
-                Q(qualifications__icontains=search_query) |
-                Q(skills_required__icontains=search_query) |
-                Q(employer__company_name__icontains=search_query)
-            )
+            jobs = search_jobs(jobs, search_query)
         
         if job_type:
             jobs = jobs.filter(job_type=job_type)
@@ -157,80 +151,35 @@ def dashboard(request):
         context['search_query'] = search_query
         context['selected_job_type'] = job_type
         context['selected_location'] = location
-
-        # --- DEBUG: Check what we have before recommendations ---
-        print(f"Total jobs after filters: {jobs.count()}")
-        print(f"Seeker skills: {profile.skills}")
+        context['selected_rank'] = rank
 
         # --- Recommended Jobs ---
-        recommended_jobs = []
-        
-        # In your dashboard view, update the recommendation logic:
-        if profile.skills and jobs.exists():
-            seeker_skills = [s.strip().lower() for s in profile.skills.split(",") if s.strip()]
-            
-            jobs_with_scores = []
-            for job in jobs:
-                if job.skills_required:
-                    job_skills = [s.strip().lower() for s in job.skills_required.split(",") if s.strip()]
-                    
-                    # Calculate matches
-                    matched_skills = list(set(seeker_skills) & set(job_skills))
-                    missing_skills = list(set(job_skills) - set(seeker_skills))
-                    match_count = len(matched_skills)
-                    
-                    # Calculate percentage match
-                    if job_skills:
-                        percent_match = int((match_count / len(job_skills)) * 100)
-                    else:
-                        percent_match = 0
-                    
-                    # Determine match quality
-                    if percent_match >= 80:
-                        match_quality = "excellent"
-                    elif percent_match >= 60:
-                        match_quality = "good"
-                    elif percent_match >= 40:
-                        match_quality = "fair"
-                    else:
-                        match_quality = "weak"
-                    
-                    # Attach all match data to job object
-                    job.match_score = percent_match
-                    job.match_quality = match_quality
-                    job.matched_skills = matched_skills
-                    job.missing_skills = missing_skills
-                    job.total_skills_required = len(job_skills)
-                    
-                    jobs_with_scores.append((job, percent_match))
-            
-            # Sort by match score
-            jobs_with_scores.sort(key=lambda x: (x[1], x[0].posted_date), reverse=True)
-            recommended_jobs = [job for job, score in jobs_with_scores]
+        # Unfiltered visits read the materialized rankings, falling back to
+        # the seeker's cached ranking until the worker has filled them. Only
+        # the default scorer is materialized.
+        if search_query or job_type or location:
+            recommended_jobs = recommend_jobs(profile, jobs, limit=10, scorer=rank)
+        elif rank != DEFAULT_SCORER:
+            recommended_jobs = recommend_jobs(profile, limit=10, scorer=rank)
+        else:
+            recommended_jobs = materialized_recommendations(profile, limit=10)
+            if not recommended_jobs:
+                recommended_jobs = recommend_jobs(profile, limit=10)
         
         # Fallback: if no skills or no matches, show popular jobs
         if not recommended_jobs:
-            print("Using fallback: popular jobs")
-            recommended_jobs = jobs.annotate(
-                application_count=Count('applications')
-            ).order_by('-application_count', '-posted_date')[:10]
-        
-        # Check saved status for all recommended jobs
-        saved_job_ids = SavedJob.objects.filter(
-            job_saver=profile,
-            job__in=recommended_jobs
-        ).values_list('job_id', flat=True)
-        context['saved_job_ids'] = list(saved_job_ids)
+            recommended_jobs = jobs.order_by('-application_count', '-posted_date')[:10]
 
         # Pagination for search results
-        paginator = Paginator(jobs, 10)
+        paginator = CursorPaginator(jobs, 10)
         page_number = request.GET.get('page')
         page_obj = paginator.get_page(page_number)
 
         context.update({
-            'recommended_jobs': recommended_jobs[:10],  # Limit to 10 recommendations
+            'recommended_jobs': recommended_jobs,
             'latest_jobs': page_obj,
             'job_types': JobType.choices,
+            'rank_choices': SCORERS.items(),
             'job_applications': JobApplication.objects.filter(
                 applicant=profile
             ).select_related('job', 'job__employer').order_by('-application_date')[:5]
@@ -245,9 +194,8 @@ def dashboard(request):
 def add_job(request):
     user = request.user
 
-    try:
-        profile = user.employerprofile
-    except EmployerProfile.DoesNotExist:
+    profile = request.profile
+    if request.profile_type != 'employer':
         messages.error(request, 'This action is only allowed for employer accounts.')
         return redirect('jobs:forbidden')
 
@@ -281,7 +229,7 @@ def view_job_detail(request, job_id):
         job = get_object_or_404(JobPosting, id=job_id)
 
         # Optional: Ensure only the employer who posted the job can view its detail
-        if hasattr(user, 'employerprofile') and job.employer != user.employerprofile:
+        if request.profile_type == 'employer' and job.employer != request.profile:
             messages.error(request, 'Access denied: You are not authorized to view this job.')
             return redirect('jobs:dashboard')
 
@@ -305,9 +253,8 @@ def update_job_details(request, job_id):
         return redirect('users:login')
 
     job = get_object_or_404(JobPosting, id=job_id)
-    applications = JobApplication.objects.filter(job=job)
 
-    if job.employer != user.employerprofile:
+    if job.employer != request.profile:
         messages.error(request, 'You are not authorized to edit this job.')
         return redirect('jobs:dashboard')
 
@@ -324,19 +271,15 @@ def update_job_details(request, job_id):
                 )
 
                 # Notify each applicant
-                for application in applications:
-                    try:
-                        link = reverse('jobs:update_application', args=[application.id])
-                        create_notification(
-                            recipient=application.applicant.user,
-                            message=(
-                                f"The job '{job.title}' you applied for at {job.employer} has been updated. "
-                                "Please review and update your application if needed."
-                            ),
-                            url=link,
-                        )
-                    except Exception as e:
-                        messages.error(request, f"Notification error for applicant {application.applicant}: {e}")
+                defer(
+                    notify_job_applicants,
+                    job.id,
+                    (
+                        f"The job '{job.title}' you applied for at {job.employer} has been updated. "
+                        "Please review and update your application if needed."
+                    ),
+                    url_name='jobs:update_application',
+                )
 
                 messages.success(request, 'Job details updated successfully.')
                 return redirect('jobs:dashboard')
@@ -366,7 +309,7 @@ def delete_job(request, job_id):
     job = get_object_or_404(JobPosting, id=job_id)
 
     # Check permission
-    if job.employer != user.employerprofile:
+    if job.employer != request.profile:
         messages.error(request, 'You do not have permission to delete this job.')
         return redirect('jobs:dashboard')
 
@@ -374,10 +317,9 @@ def delete_job(request, job_id):
     job_title = job.title
     employer_name = str(job.employer)
 
-    # Get all applications before job is deleted
-    applications = job.applications.select_related('applicant__user').all()
-        # Delete the job
     if request.method == 'POST':
+        # Collect the applicants before the cascade removes their applications
+        applicant_user_ids = list(job.applications.values_list('applicant__user_id', flat=True))
         job.delete()
 
         # Notify employer
@@ -387,15 +329,11 @@ def delete_job(request, job_id):
         )
 
         # Notify all applicants
-        for application in applications:
-            print(f"Sending to {application.applicant.user} for job {job_title}")
-            try:
-                create_notification(
-                    recipient=application.applicant.user,
-                    message=f'The job "{job_title}" at {employer_name} you applied for has been removed by the employer.'
-                )
-            except Exception as e:
-                messages.error(request, f"Notification error for applicant {application.applicant}: {e}")
+        defer(
+            notify_users,
+            applicant_user_ids,
+            f'The job "{job_title}" at {employer_name} you applied for has been removed by the employer.',
+        )
 
         messages.success(request, 'Job successfully deleted.')
         return redirect('jobs:dashboard')
@@ -407,51 +345,31 @@ def delete_job(request, job_id):
 
 @login_required
 def apply_for_job(request, job_id):
-    user = request.user
-
-    if not user:
-        messages.error(request, 'Session has expired. Try logging in again.')
-        return redirect('users:login')
-
-    job = get_object_or_404(JobPosting, id=job_id)
-
-    try:
-        seeker = user.seekerprofile
-    except SeekerProfile.DoesNotExist:
+    seeker = request.profile
+    if request.profile_type != 'seeker':
         messages.error(request, 'You must have a seeker profile to apply for jobs.')
         return redirect('jobs:dashboard')
 
-    # Check if already applied
-    if JobApplication.objects.filter(job=job, applicant=seeker).exists():
-        messages.warning(request, 'You have already applied for this job.')
-        return redirect('jobs:view_job_detail', job_id=job_id)
-
-    form = ApplyForJobForm(request.POST or None, request.FILES or None)
+    job = get_object_or_404(JobPosting.objects.select_related('employer__user'), id=job_id)
 
     if request.method == 'POST':
+        form = ApplyForJobForm(request.POST, request.FILES)
+        form.instance.job = job
         if form.is_valid():
-            application = form.save(commit=False)
-            application.job = job
-            application.applicant = seeker
-            application.save()
-
-            create_notification(
-                recipient=application.applicant.user,
-                message=f"Your application for the role {application.job.title} at {application.job.employer.company_name} has been submtted succesfully",
-                url=reverse('jobs:view_application_detail', args=[application.id])
-            )
             try:
-                create_notification(
-                    recipient=application.job.employer.user,
-                    message=f"{application.applicant.full_name} has applied for the job {application.job.title}",
-                    url=reverse("jobs:view_application_detail", args=[application.id])
-                )
-            except Exception as e:
-                messages.error(request, str(e))
-                
+                submit_application(job, seeker, form, token=form.cleaned_data['idempotency_key'])
+            except AlreadyApplied:
+                messages.warning(request, 'You have already applied for this job.')
+                return redirect('jobs:view_job_detail', job_id=job_id)
+
             messages.success(request, 'Application submitted successfully.')
             return redirect('jobs:dashboard')
-        
+    else:
+        # Check if already applied
+        if job.pk in get_applied_job_ids(seeker.pk):
+            messages.warning(request, 'You have already applied for this job.')
+            return redirect('jobs:view_job_detail', job_id=job_id)
+        form = ApplyForJobForm(initial={'idempotency_key': uuid.uuid4().hex})
 
     context = {
         'job': job,
@@ -466,8 +384,8 @@ def view_application_detail(request, application_id):
     user = request.user
     application = get_object_or_404(JobApplication.objects.select_related('job', 'applicant__user', 'job__employer'), id=application_id)
 
-    is_seeker = hasattr(user, 'seekerprofile') and application.applicant == user.seekerprofile
-    is_employer = hasattr(user, 'employerprofile') and application.job.employer == user.employerprofile
+    is_seeker = request.profile_type == 'seeker' and application.applicant == request.profile
+    is_employer = request.profile_type == 'employer' and application.job.employer == request.profile
 
     if not (is_seeker or is_employer):
         messages.error(request, 'You are not authorized to access this application.')
@@ -485,7 +403,7 @@ def view_application_detail(request, application_id):
 def review_application(request, application_id):
     application = get_object_or_404(JobApplication, id=application_id)
     
-    if application.job.employer != request.user.employerprofile:
+    if application.job.employer != request.profile:
         messages.error(request, "Not authorized.")
         return redirect('jobs:dashboard')
 
@@ -512,7 +430,7 @@ def review_application(request, application_id):
 def compose_acceptance_email(request, application_id):
     application = get_object_or_404(JobApplication, id=application_id)
     
-    if application.job.employer != request.user.employerprofile:
+    if application.job.employer != request.profile:
         messages.error(request, "Not authorized.")
         return redirect('jobs:dashboard')
     
@@ -547,14 +465,8 @@ def compose_acceptance_email(request, application_id):
             final_message = final_message.replace('{job_title}', context['job_title'])
             final_message = final_message.replace('{company_name}', context['company_name'])
 
-            # Send email
-            send_mail(
-                final_subject,
-                final_message,
-                settings.DEFAULT_FROM_EMAIL,
-                [application.applicant.user.email],
-                fail_silently=False,
-            )
+            # Queue email
+            enqueue_mail(final_subject, final_message, [application.applicant.user.email])
 
             # Update application status to 'accepted'
             application.status = 'accepted'
@@ -573,7 +485,7 @@ def compose_acceptance_email(request, application_id):
                 url=reverse("jobs:view_application_detail", args=[application.id]),
             )
 
-            messages.success(request, 'Acceptance email sent successfully!')
+            messages.success(request, 'Acceptance email queued for sending.')
             return redirect('jobs:view_applications', job_id=application.job.id)
 
         except Exception as e:
@@ -604,22 +516,12 @@ def send_acceptance_email(application):
         'Best regards,\n'
         f'{application.job.employer.company_name}'
     )
-    try:
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [application.applicant.user.email],
-            fail_silently=False,
-        )
-        return True
-    except Exception as e:
-        print(f'Error sending acceptance email: {e}')
-        return False
+    enqueue_mail(subject, message, [application.applicant.user.email])
+    return True
 
 @login_required
 def view_applications(request, job_id):
-    job = get_object_or_404(JobPosting, id=job_id, employer=request.user.employerprofile)
+    job = get_object_or_404(JobPosting, id=job_id, employer__user=request.user)
     applications = job.applications.select_related('applicant__user').all()
     return render(request, 'app/employer/view-applications.html', {
         'job': job,
@@ -628,28 +530,51 @@ def view_applications(request, job_id):
 
 @login_required
 def view_applications(request, job_id):
-    job = get_object_or_404(JobPosting, id=job_id, employer=request.user.employerprofile)
-    applications = job.applications.select_related('applicant__user').all()
+    job = get_object_or_404(JobPosting, id=job_id, employer__user=request.user)
+
+    # Best skill match first, filtered in SQL on the stored scores
+    applications = job.applications.select_related('applicant__user').order_by('-skill_match', '-application_date')
+    try:
+        min_match = max(0, min(100, int(request.GET.get('min_match', 0))))
+    except ValueError:
+        min_match = 0
+    if min_match:
+        applications = applications.filter(skill_match__gte=min_match)
+
+    paginator = CursorPaginator(applications, 20)
+    page_obj = paginator.get_page(request.GET.get('page'))
     
-    # Calculate real statistics
-    total_applications = applications.count()
-    pending_count = applications.filter(status='pending').count()
-    shortlisted_count = applications.filter(status='shortlisted').count()
-    interview_count = applications.filter(status='interview').count()
-    offer_count = applications.filter(status='offer').count()
-    hired_count = applications.filter(status='hired').count()
-    rejected_count = applications.filter(status='rejected').count()
+    # Calculate real statistics in one query (cached)
+    stats = get_job_application_stats(job)
     
     return render(request, 'app/employer/view-applications.html', {
         'job': job,
-        'applications': applications,
-        'total_applications': total_applications,
-        'pending_count': pending_count,
-        'shortlisted_count': shortlisted_count,
-        'interview_count': interview_count,
-        'offer_count': offer_count,
-        'hired_count': hired_count,
-        'rejected_count': rejected_count,
+        'applications': page_obj,
+        'min_match': min_match,
+        'min_match_choices': [50, 70, 90],
+        **stats,
+    })
+
+
+@login_required
+def matching_candidates(request, job_id):
+    job = get_object_or_404(JobPosting, id=job_id, employer__user=request.user)
+
+    job_type = request.GET.get('job_type', '')
+    if job_type not in dict(SEEKER_JOB_TYPES):
+        job_type = ''
+
+    paginator = ListPaginator(
+        unapplied_candidates(job, job_type), 10, key=candidate_sort_key, load=load_candidates,
+    )
+    candidates = paginator.get_page(request.GET.get('page'))
+
+    return render(request, 'app/employer/matching-candidates.html', {
+        'job': job,
+        'candidates': candidates,
+        'job_skills': set(job.skill_tags.names()),
+        'job_type': job_type,
+        'job_type_choices': SEEKER_JOB_TYPES,
     })
 
 
@@ -750,7 +675,7 @@ def forbidden(request):
 @login_required
 def notifications_view(request):
     notifications = Notification.objects.filter(recipient=request.user).order_by('-created_at')
-    unread_count = notifications.filter(is_read=False).count()
+    unread_count = get_unread_notification_count(request.user.pk)
     return render(request, 'app/notifications.html', {
         'notifications': notifications,
         'unread_count': unread_count
@@ -764,7 +689,7 @@ def mark_notification_as_read(request, notification_id):
         if not notification.is_read:
             notification.is_read = True
             notification.save()
-        unread_count = Notification.objects.filter(recipient=request.user, is_read=False).count()
+        unread_count = get_unread_notification_count(request.user.pk)
         return JsonResponse({'success': True, 'unread_count': unread_count})
     return JsonResponse({'success': False}, status=400)
 
@@ -773,6 +698,8 @@ def mark_notification_as_read(request, notification_id):
 def mark_all_as_read(request):
     if request.method == 'POST':
         Notification.objects.filter(recipient=request.user, is_read=False).update(is_read=True)
+        invalidate_unread_notification_count(request.user.pk)
+        publish_unread_count(request.user.pk)
         return JsonResponse({'success': True, 'unread_count': 0})
     return JsonResponse({'success': False}, status=400)
 
@@ -784,7 +711,7 @@ def all_jobs(request):
         messages.error(request, 'Session expired. Please log in again.')
         return redirect('users:login')
 
-    profile, profile_type = get_user_profile(user)
+    profile, profile_type = request.profile, request.profile_type
     if profile is None:
         messages.error(request, 'Profile not found. Please complete your profile.')
         return redirect('users:profile_setup')
@@ -793,8 +720,7 @@ def all_jobs(request):
     
     if profile_type == 'employer':
         # Existing employer logic (unchanged)
-        all_jobs = JobPosting.objects.filter(employer=user.employerprofile).order_by('-posted_date')
-        all_jobs = JobPosting.objects.filter(employer=user.employerprofile).order_by('-posted_date')
+        all_jobs = JobPosting.objects.filter(employer=profile).order_by('-posted_date')
         
         # Get search query
         search_query = request.GET.get('q', '')
@@ -807,11 +733,7 @@ def all_jobs(request):
         
         # Apply filters
         if search_query:
-            all_jobs = all_jobs.filter(
-                Q(title__icontains=search_query) |
-                Q(location__icontains=search_query) |
-                Q(skills_required__icontains=search_query)
-            )
+            all_jobs = search_jobs(all_jobs, search_query)
         
         if location:
             all_jobs = all_jobs.filter(location__icontains=location)
@@ -826,7 +748,7 @@ def all_jobs(request):
             all_jobs = all_jobs.filter(salary__lte=salary_max)
         
         # Pagination
-        paginator = Paginator(all_jobs, 10)  # Show 10 jobs per page
+        paginator = CursorPaginator(all_jobs, 10)  # Show 10 jobs per page
         page_number = request.GET.get('page')
         page_obj = paginator.get_page(page_number)
         
@@ -843,9 +765,9 @@ def all_jobs(request):
 
     elif profile_type == 'seeker':
         # Base queryset: active jobs not applied to by seeker
-        all_jobs = JobPosting.objects.filter(
-            deadline__gte=timezone.now().date()
-        ).exclude(applications__applicant=profile).order_by('-posted_date')
+        all_jobs = exclude_applied(JobPosting.objects.filter(
+            job_status=JobStatus.open
+        ), profile).order_by('-posted_date')
 
 
         # --- Search & Filters ---
@@ -856,12 +778,7 @@ def all_jobs(request):
         salary_max = request.GET.get('salary_max', '')
 
         if search_query:
-            all_jobs = all_jobs.filter(
-                Q(title__icontains=search_query) |
-                Q(location__icontains=search_query) |
-                Q(skills_required__icontains=search_query) |
-                Q(employer__company_name__icontains=search_query)
-            )
+            all_jobs = search_jobs(all_jobs, search_query)
 
         if location:
             all_jobs = all_jobs.filter(location__icontains=location)
@@ -878,36 +795,18 @@ def all_jobs(request):
         # --- Skill-Based Recommendations
         recommended_jobs = None
         if profile.skills:
-            seeker_skills = set(s.strip().lower() for s in profile.skills.split(",") if s.strip())
-            jobs_with_scores = []
-            for job in all_jobs:
-                job_skills = set(s.strip().lower() for s in job.skills_required.split(",") if s.strip())
-                matches = seeker_skills & job_skills
-                match_score = len(matches)
-                # Calculate percent match (avoid division by zero)
-                percent_match = int(100 * match_score / max(len(job_skills), 1))
-                job.match_score = percent_match  # Attach to job object
-                jobs_with_scores.append((job, percent_match))
-            # Sort jobs by percent_match and posted_date
-            jobs_with_scores.sort(key=lambda x: (x[1], x[0].posted_date), reverse=True)
-            recommended_jobs = [job for job, score in jobs_with_scores if score > 0]
+            if search_query or location or job_type or salary_min or salary_max:
+                recommended_jobs = recommend_jobs(profile, all_jobs, limit=10)
+            else:
+                recommended_jobs = recommend_jobs(profile, limit=10)
         else:
-            recommended_jobs = all_jobs.annotate(
-            application_count=Count('applications')
-            ).order_by('-application_count', '-posted_date')
-
-
-
-        saved_job_ids = SavedJob.objects.filter(
-            job_saver=profile,
-            job__in=recommended_jobs
-            ).values_list('job_id', flat=True)
+            recommended_jobs = all_jobs.order_by('-application_count', '-posted_date')[:10]
 
 
 
 
         # Pagination
-        paginator = Paginator(all_jobs, 10)
+        paginator = CursorPaginator(all_jobs.prefetch_related('skill_tags'), 10)
         page_number = request.GET.get('page')
         page_obj = paginator.get_page(page_number)
 
@@ -922,7 +821,6 @@ def all_jobs(request):
             'salary_max': salary_max,
             'job_types': JobType.choices,
             'profile_type': profile_type,
-            'saved_job_ids': list(saved_job_ids) if recommended_jobs else [],
         }
 
     else:
@@ -940,8 +838,8 @@ def all_applications(request):
     if not user or user is None:
         messages.error(request, 'Sesion expired, Please try to log in again')
         return redirect('users:login')
-    job = JobPosting.objects.filter(employer=user.employerprofile)
-    applications = JobApplication.objects.get(job.employer==user.employerprofile)
+    job = JobPosting.objects.filter(employer=request.profile)
+    applications = JobApplication.objects.get(job.employer==request.profile)
     
  
 
@@ -953,14 +851,14 @@ def all_applications(request):
         messages.error(request, 'Session expired. Please log in again.')
         return redirect('users:login')
 
-    profile, profile_type = get_user_profile(user)
+    profile, profile_type = request.profile, request.profile_type
 
     applications = JobApplication.objects.all()
 
     context = {}
 
     if profile_type == 'employer':
-        applications = applications.filter(job__employer=user.employerprofile).order_by('-application_date')
+        applications = applications.filter(job__employer=profile).order_by('-application_date')
 
         # Employer-specific filters
         search_query = request.GET.get('q', '')
@@ -1002,7 +900,7 @@ def all_applications(request):
         })
 
     elif profile_type == 'seeker':
-        applications = applications.filter(applicant=user.seekerprofile).select_related('job').order_by('-application_date')
+        applications = applications.filter(applicant=profile).select_related('job').order_by('-application_date')
 
         # Filters
         search_query = request.GET.get('q', '')
@@ -1015,7 +913,7 @@ def all_applications(request):
             applications = applications.filter(
                 Q(job__title__icontains=search_query) |
                 Q(job__location__icontains=search_query) |
-                Q(job__skills_required__icontains=search_query)
+                Q(job__skill_tags__name=search_query.strip().lower())
             )
 
         if job_title:
@@ -1044,7 +942,7 @@ def all_applications(request):
         })
 
     # Pagination
-    paginator = Paginator(applications, 10)
+    paginator = CursorPaginator(applications.prefetch_related('job__skill_tags'), 10)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
 
@@ -1061,62 +959,51 @@ def all_applications(request):
 
 
 
+def saved_job_response(request, job_id, saved, message):
+    """JSON for the AJAX toggle, otherwise a flash message and a redirect back."""
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        return JsonResponse({'status': 'success', 'message': message, 'job_id': job_id, 'saved': saved})
+
+    messages.success(request, message)
+    return redirect(request.META.get('HTTP_REFERER') or reverse('jobs:view_job_detail', args=[job_id]))
+
+
+def seeker_only_response(request, job_id, message):
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        return JsonResponse({'status': 'error', 'message': message}, status=403)
+    messages.error(request, message)
+    return redirect('jobs:view_job_detail', job_id=job_id)
+
+
+# Save and unsave are idempotent and touch the database with a single
+# statement keyed on (job_id, job_saver_id); the profile comes from the
+# request and the saved-id cache is updated in place.
 @login_required
+@require_POST
 def save_job(request, job_id):
-    job = get_object_or_404(JobPosting, id=job_id)
-    profile, profile_type = get_user_profile(request.user)
-    
-    if profile_type != 'seeker':
-        if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-            return JsonResponse({'status': 'error', 'message': 'Only job seekers can save jobs'}, status=403)
-        messages.error(request, 'Only job seekers can save jobs')
-        return redirect('jobs:job_detail', job_id=job.id)
-    
-    if SavedJob.objects.filter(job=job, job_saver=profile).exists():
-        message = 'This job is already in your saved list'
-        status = 'info'
-        html = render_to_string('partials/unsave_button.html', {'job': job}, request=request)
-    else:
-        SavedJob.objects.create(job=job, job_saver=profile)
-        message = 'Job saved successfully'
-        status = 'success'
-        html = render_to_string('partials/unsave-job.html', {'job': job}, request=request)
+    if request.profile_type != 'seeker':
+        return seeker_only_response(request, job_id, 'Only job seekers can save jobs')
+
+    profile = request.profile
+    try:
+        SavedJob.objects.bulk_create([SavedJob(job_id=job_id, job_saver=profile)], ignore_conflicts=True)
+    except IntegrityError:
+        # The job does not exist
+        raise Http404('No JobPosting matches the given query.')
+    update_saved_job_ids(profile.pk, saved=[job_id])
+    return saved_job_response(request, job_id, True, 'Job saved successfully')
 
-    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-        return JsonResponse({
-            'status': status,
-            'message': message,
-            'html': html
-        })
-    
-    messages.success(request, message)
-    return redirect(request.META.get('HTTP_REFERER', 'jobs:job_detail'))
 
 @login_required
+@require_POST
 def unsave_job(request, job_id):
-    job = get_object_or_404(JobPosting, id=job_id)
-    profile, profile_type = get_user_profile(request.user)
-    
-    if profile_type != 'seeker':
-        if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-            return JsonResponse({'status': 'error', 'message': 'Only job seekers can unsave jobs'}, status=403)
-        messages.error(request, 'Only job seekers can unsave jobs')
-        return redirect('jobs:job_detail', job_id=job.id)
-    
-    saved_job = get_object_or_404(SavedJob, job=job, job_saver=profile)
-    saved_job.delete()
-    message = 'Job removed from your saved list'
-    html = render_to_string('partials/save-job.html', {'job': job}, request=request)
-    
-    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-        return JsonResponse({
-            'status': 'success',
-            'message': message,
-            'html': html
-        })
-    
-    messages.success(request, message)
-    return redirect(request.META.get('HTTP_REFERER', 'jobs:saved_jobs'))
+    if request.profile_type != 'seeker':
+        return seeker_only_response(request, job_id, 'Only job seekers can unsave jobs')
+
+    profile = request.profile
+    SavedJob.objects.filter(job_id=job_id, job_saver=profile).delete()
+    update_saved_job_ids(profile.pk, unsaved=[job_id])
+    return saved_job_response(request, job_id, False, 'Job removed from your saved list')
 
 
 
@@ -1128,7 +1015,7 @@ def saved_jobs(request):
         messages.error(request, 'Session expired. Please try logging in again')
         return redirect('users:login')
     
-    profile, profile_type = get_user_profile(user)
+    profile, profile_type = request.profile, request.profile_type
     if profile is None:
         messages.error(request, 'Profile not found. Please complete your profile setup.')
         return redirect('users:profile_setup')
@@ -1138,16 +1025,12 @@ def saved_jobs(request):
         return redirect('jobs:dashboard')
 
     # Base queryset
-    saved_jobs = SavedJob.objects.filter(job_saver=profile).select_related('job').order_by('-timestamp')
+    saved_jobs = SavedJob.objects.filter(job_saver=profile).select_related('job').prefetch_related('job__skill_tags').order_by('-timestamp')
 
     # Search functionality
     search_query = request.GET.get('search', '')
     if search_query:
-        saved_jobs = saved_jobs.filter(
-            Q(job__title__icontains=search_query) |
-            Q(job__employer__company_name__icontains=search_query) |
-            Q(job__skills_required__icontains=search_query)
-        )
+        saved_jobs = search_jobs(saved_jobs, search_query, prefix='job__')
 
     # Filtering
     status_filter = request.GET.get('status')
@@ -1162,13 +1045,14 @@ def saved_jobs(request):
     if date_to:
         saved_jobs = saved_jobs.filter(timestamp__lte=date_to)
 
-    sort_option = request.GET.get('sort', '-timestamp')
+    # Searches keep their relevance order unless a sort was picked
+    sort_option = request.GET.get('sort')
     if sort_option in ['timestamp', '-timestamp']:
         saved_jobs = saved_jobs.order_by(sort_option)
 
 
     # Pagination
-    paginator = Paginator(saved_jobs, 10)  # Show 10 jobs per page
+    paginator = CursorPaginator(saved_jobs, 10)  # Show 10 jobs per page
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
 
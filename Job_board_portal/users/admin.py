@@ -3,7 +3,13 @@ from .models import Profile, SeekerProfile, EmployerProfile, KnownDevice, Securi
 # Register your models here.
 # class SeekerprofileField(admin.ModelAdmin):
 
-admin.site.register(SeekerProfile)
+
+class SeekerProfileAdmin(admin.ModelAdmin):
+    # Synced from skills on save
+    exclude = ('skill_tags',)
+
+
+admin.site.register(SeekerProfile, SeekerProfileAdmin)
 admin.site.register(EmployerProfile)
 admin.site.register(KnownDevice)
 admin.site.register(SecurityLog)
\ No newline at end of file
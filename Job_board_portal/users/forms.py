@@ -6,6 +6,7 @@ from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from .models import Country, State, COMPANY_SIZE_CHOICES
 from .models import OTP
+from jobs.skills import normalize_skills
 
 User = get_user_model()
 
@@ -227,6 +228,13 @@ class SeekerAccountForm(forms.ModelForm):
             'portfolio': forms.URLInput(attrs={'class': 'form-control', 'placeholder': 'https://yourportfolio.com'}),
         }
 
+    def clean_skills(self):
+        # Stored in canonical form so saving only has to link known skills
+        skills = normalize_skills(self.cleaned_data['skills'])
+        if not skills:
+            raise forms.ValidationError('Enter at least one skill.')
+        return ', '.join(skills)
+
 
 class LoginForm(forms.Form):
     # email = forms.EmailField(widget=forms.EmailInput(attrs={'placeholder': 'Email'}))
@@ -0,0 +1,20 @@
+# Generated by Django 5.2 on 2026-10-17 06:27
+
+import taggit.managers
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0018_skills'),
+        ('users', '0005_remove_employerprofile_linked_accounts_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='seekerprofile',
+            name='skill_tags',
+            field=taggit.managers.TaggableManager(blank=True, help_text='A comma-separated list of tags.', through='jobs.SeekerSkill', to='jobs.Skill', verbose_name='skills'),
+        ),
+    ]
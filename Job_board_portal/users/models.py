@@ -2,6 +2,7 @@ from django.core.files.images import get_image_dimensions
 from django.core.validators import FileExtensionValidator
 from django.core.exceptions import ValidationError
 from django.db import models
+from taggit.managers import TaggableManager
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from datetime import timedelta
@@ -106,6 +107,8 @@ class SeekerProfile(Profile):
     phone_number = models.CharField(max_length=15, blank=True)
     bio = models.TextField()
     skills = models.CharField(blank=True, help_text='Add skills related to your profession. You can add multiple skills.')
+    # Normalized from skills on save, see jobs.skills
+    skill_tags = TaggableManager(verbose_name='skills', through='jobs.SeekerSkill', blank=True, related_name='seekers')
     experience = models.TextField()
     education = models.TextField()
     certifications = models.TextField(blank=True, null=True)
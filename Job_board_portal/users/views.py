@@ -1,12 +1,11 @@
 import random
-from django.conf import settings
 from django.utils import timezone
 from django.urls import reverse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
-from django.core.mail import send_mail
 from django.contrib.auth import authenticate, login, logout, get_user_model
 from django.contrib.auth.decorators import login_required
+from jobs.mail import enqueue_mail
 from jobs.utils import get_user_profile, calculate_profile_completion, create_notification
 from .models import OTP, Profile, EmployerProfile, SeekerProfile, KnownDevice, SecurityLog
 from django.core.exceptions import ObjectDoesNotExist
@@ -53,17 +52,11 @@ def email_signup_view(request):
             request.session['signup_form_data'] = form.cleaned_data
 
             # Send OTP
-            try:
-                send_mail(
-                    subject='Email OTP Verification',
-                    message=f"Hello,\n\nYour OTP for account creation is: {otp}\n\n- Jobsphere",
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[email],
-                    fail_silently=False,
-                )
-            except Exception as e:
-                messages.error(request, f"Failed to send OTP: {str(e)}")
-                return redirect('users:email_sign_up')
+            enqueue_mail(
+                subject='Email OTP Verification',
+                message=f"Hello,\n\nYour OTP for account creation is: {otp}\n\n- Jobsphere",
+                recipient_list=[email],
+            )
 
             messages.success(request, f'OTP sent to {email}')
             return redirect('users:validate_otp', user_email=email)
@@ -124,13 +117,11 @@ def resend_otp(request, user_email):
             defaults={'otp': otp, 'created_at': timezone.now()}
         )
 
-        send_mail(
-                subject='Email OTP Verification',
-                message=f"Hello,\n\nYour OTP for account creation is: {otp}\n\n- Jobsphere",
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[user_email],
-                fail_silently=False
-            )
+        enqueue_mail(
+            subject='Email OTP Verification',
+            message=f"Hello,\n\nYour OTP for account creation is: {otp}\n\n- Jobsphere",
+            recipient_list=[user_email],
+        )
 
         messages.info(request, f'OTP sent to {user_email}')
         return redirect('users:validate_otp', user_email=user_email)
@@ -400,12 +391,10 @@ def forgot_password(request):
                 defaults={'otp': otp, 'created_at': timezone.now()}
             )
 
-            send_mail(
+            enqueue_mail(
                 subject='Password Reset OTP',
                 message=f"Hello,\n\nYour OTP for resetting your password is: {otp}\n\n- Jobsphere",
-                from_email=settings.DEFAULT_FROM_EMAIL,
                 recipient_list=[user_email],
-                fail_silently=False
             )
 
             request.session['user_email'] = user_email
@@ -474,17 +463,11 @@ def resend_reset_otp(request, user_email):
         defaults={'otp': new_otp, 'created_at': timezone.now()}
     )
 
-    try:
-        send_mail(
-            subject='Password Reset Verification',
-            message=f"Hello,\n\nYour OTP for password reset is: {new_otp}\n\n- Jobsphere",
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user_email],
-            fail_silently=False
-        )
-    except Exception as e:
-        messages.error(request, 'There was a problem sending the OTP. Please try again.')
-        return redirect('users:forgot_password')
+    enqueue_mail(
+        subject='Password Reset Verification',
+        message=f"Hello,\n\nYour OTP for password reset is: {new_otp}\n\n- Jobsphere",
+        recipient_list=[user_email],
+    )
 
     messages.success(request, f'A new OTP has been sent to {user_email}')
     return redirect('users:validate_reset_otp', user_email=user_email)
@@ -551,7 +534,7 @@ def load_states(request):
 @login_required
 def profile(request):
     user = request.user
-    profile, profile_type = get_user_profile(user)
+    profile, profile_type = request.profile, request.profile_type
 
     if not profile:
         messages.error(request, "Profile not found.")
@@ -581,7 +564,7 @@ def update_profile(request):
 @login_required
 def update_basic_info(request):
     user = request.user
-    profile, profile_type = get_user_profile(user)
+    profile, profile_type = request.profile, request.profile_type
     
     # Get all countries and states
     countries = Country.objects.all()
@@ -659,23 +642,15 @@ def update_basic_info(request):
 @login_required
 def update_account_info(request):
     user = request.user
-    profile, profile_type = get_user_profile(user)
+    profile, profile_type = request.profile, request.profile_type
 
     # Dynamically choose form and profile model
-    if profile_type == 'employer':
-        try:
-            profile_instance = user.employerprofile
-        except EmployerProfile.DoesNotExist:
-            messages.error(request, 'Employer profile does not exist.')
-            return redirect('jobs:dashboard')
-        FormClass = EmployerAccountForm
-    else:
-        try:
-            profile_instance = user.seekerprofile
-        except SeekerProfile.DoesNotExist:
-            messages.error(request, 'Seeker profile does not exist.')
-            return redirect('jobs:dashboard')
-        FormClass = SeekerAccountForm
+    if profile is None:
+        messages.error(request, 'Profile does not exist.')
+        return redirect('jobs:dashboard')
+
+    profile_instance = profile
+    FormClass = EmployerAccountForm if profile_type == 'employer' else SeekerAccountForm
 
     # Handle form submission
     if request.method == 'POST':
@@ -705,12 +680,11 @@ def update_account_info(request):
 def update_profile_picture(request):
     user = request.user
     if request.method == 'POST' and request.FILES.get('profile_picture'):
-        if hasattr(user, 'seekerprofile'):
-            profile = user.seekerprofile
+        profile = request.profile
+        if request.profile_type == 'seeker':
             profile.profile_picture = request.FILES['profile_picture']
             profile.save()
-        elif hasattr(user, 'employerprofile'):
-            profile = user.employerprofile
+        elif request.profile_type == 'employer':
             profile.company_logo = request.FILES['profile_picture']
             profile.save()
         messages.success(request, "Profile picture updated.")
@@ -722,15 +696,7 @@ def public_profile(request, username):
     user = get_object_or_404(User, username=username)
 
     # Try to get related profile
-    profile_type = None
-    profile = None
-
-    if hasattr(user, 'seekerprofile'):
-        profile = user.seekerprofile
-        profile_type = 'seeker'
-    elif hasattr(user, 'employerprofile'):
-        profile = user.employerprofile
-        profile_type = 'employer'
+    profile, profile_type = get_user_profile(user)
 
     if not profile:
         return render(request, '404.html', status=404)
@@ -755,7 +721,7 @@ def account_settings(request):
         messages.error(request, "Session expired. Please log in again")
         return redirect('users:login')
     
-    profile, profile_type = get_user_profile(user)
+    profile, profile_type = request.profile, request.profile_type
     context = {
         'profile_type': profile_type,
     }